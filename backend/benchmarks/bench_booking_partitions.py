@@ -0,0 +1,164 @@
+"""Overlap check benchmark, `booking` as a single table versus partitioned by check-in month.
+
+Seeds the same bookings (one night each, ~3% still open, spread over ~5.5 years) into two tables of a scratch
+``bench_booking`` schema and times the overlap check `POST /booking` runs on each:
+
+- ``plain``: the single table with its partial index, queried without a check-in lower bound (before).
+- ``partitioned``: monthly partitions with the same index and their exclusion constraints, queried with the
+  ``BOOKING_MAX_NIGHTS`` lower bound of `open_overlap_filters` so older partitions are pruned (after).
+
+Needs the Postgres database of the settings (with ``btree_gist`` available). Seeding 10M rows takes a few minutes;
+the schema is dropped at the end unless ``--keep`` is given.
+
+Usage (from the ``backend`` directory)::
+
+    python -m benchmarks.bench_booking_partitions --rows 10000000
+"""
+
+import argparse
+import random
+import statistics
+import time
+from datetime import UTC, date, datetime, timedelta
+
+from sqlalchemy import Connection, create_engine, text
+
+from src.app.core.config import settings
+from src.app.core.db.partitions import add_months
+
+SCHEMA = "bench_booking"
+ROOMS = 5000
+MAX_NIGHTS = settings.BOOKING_MAX_NIGHTS
+START = date(2020, 1, 1)
+
+COLUMNS = """
+    id bigint NOT NULL,
+    room_id integer NOT NULL,
+    check_in timestamp with time zone NOT NULL,
+    check_out timestamp with time zone NOT NULL,
+    status varchar NOT NULL,
+    is_deleted boolean NOT NULL DEFAULT false
+"""
+OPEN = "status IN ('booked', 'checked_in') AND NOT is_deleted"
+
+# each room is booked night after night, so no two open stays of a room overlap
+SEED = f"""
+INSERT INTO {SCHEMA}.{{table}} (id, room_id, check_in, check_out, status)
+SELECT i, i % {ROOMS} + 1, stay.check_in, stay.check_in + interval '1 day',
+       CASE WHEN i % 33 = 0 THEN 'booked' ELSE 'checked_out' END
+FROM generate_series(0, :rows - 1) AS i
+CROSS JOIN LATERAL (
+    SELECT timestamptz '{START} 00:00:00+00' + (i / {ROOMS}) * interval '1 day' AS check_in
+) AS stay
+"""
+
+OVERLAP_BEFORE = f"""
+SELECT 1 FROM {SCHEMA}.plain
+WHERE room_id = :room_id AND check_in <= :check_out AND check_out >= :check_in AND {OPEN}
+LIMIT 1
+"""
+OVERLAP_AFTER = f"""
+SELECT 1 FROM {SCHEMA}.partitioned
+WHERE room_id = :room_id AND check_in >= :lower AND check_in <= :check_out AND check_out >= :check_in AND {OPEN}
+LIMIT 1
+"""
+
+
+def setup(conn: Connection, rows: int) -> int:
+    days = rows // ROOMS + 1
+    conn.execute(text("CREATE EXTENSION IF NOT EXISTS btree_gist"))
+    conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+    conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+
+    conn.execute(text(f"CREATE TABLE {SCHEMA}.plain ({COLUMNS}, PRIMARY KEY (id))"))
+    conn.execute(
+        text(f"CREATE TABLE {SCHEMA}.partitioned ({COLUMNS}, PRIMARY KEY (id, check_in)) PARTITION BY RANGE (check_in)")
+    )
+    month, last = START, START + timedelta(days=days + 31)
+    partitions = 0
+    while month <= last:
+        name = f"{SCHEMA}.partitioned_p{month:%Y_%m}"
+        conn.execute(
+            text(
+                f"""
+                CREATE TABLE {name} PARTITION OF {SCHEMA}.partitioned (
+                    EXCLUDE USING gist (room_id WITH =, tstzrange(check_in, check_out) WITH &&) WHERE ({OPEN})
+                ) FOR VALUES FROM ('{month} 00:00:00+00') TO ('{add_months(month, 1)} 00:00:00+00')
+                """
+            )
+        )
+        month, partitions = add_months(month, 1), partitions + 1
+
+    for table in ("plain", "partitioned"):
+        started = time.perf_counter()
+        conn.execute(text(SEED.format(table=table)), {"rows": rows})
+        conn.execute(text(f"CREATE INDEX ON {SCHEMA}.{table} (room_id, check_in, check_out) WHERE {OPEN}"))
+        conn.execute(text(f"ANALYZE {SCHEMA}.{table}"))
+        print(f"seeded {table:<12} {rows:>11,} rows in {time.perf_counter() - started:.1f} s")
+    return partitions
+
+
+def run(conn: Connection, sql: str, stays: list[dict]) -> list[float]:
+    stmt = text(sql)
+    timings = []
+    for params in stays:
+        started = time.perf_counter()
+        conn.execute(stmt, params).first()
+        timings.append((time.perf_counter() - started) * 1e6)
+    return timings
+
+
+def scanned_partitions(conn: Connection, sql: str, params: dict) -> int:
+    plan = conn.execute(text(f"EXPLAIN (FORMAT JSON) {sql}"), params).scalar_one()[0]["Plan"]
+    relations, nodes = set(), [plan]
+    while nodes:
+        node = nodes.pop()
+        relations.add(node.get("Relation Name"))
+        nodes.extend(node.get("Plans", []))
+    return len(relations - {None})
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--checks", type=int, default=2000)
+    parser.add_argument("--keep", action="store_true", help="keep the seeded schema")
+    args = parser.parse_args()
+
+    engine = create_engine(settings.POSTGRES_SYNC_PREFIX + settings.POSTGRES_URI)
+    with engine.connect() as conn:
+        conn.execution_options(isolation_level="AUTOCOMMIT")
+        partitions = setup(conn, args.rows)
+
+        rng = random.Random(0)
+        days = args.rows // ROOMS
+        stays = []
+        for _ in range(args.checks):
+            check_in = datetime.combine(START, datetime.min.time(), UTC) + timedelta(days=rng.randrange(days))
+            check_in += timedelta(hours=14)
+            check_out = check_in + timedelta(days=rng.randint(1, 7), hours=-3)
+            stays.append(
+                {
+                    "room_id": rng.randint(1, ROOMS),
+                    "check_in": check_in,
+                    "check_out": check_out,
+                    "lower": check_in - timedelta(days=MAX_NIGHTS + 1),
+                }
+            )
+
+        print(f"\n{args.checks} overlap checks, {ROOMS} rooms, {partitions} monthly partitions")
+        print(f"{'table':<12} {'p50 µs':>9} {'p95 µs':>9} {'mean µs':>9} {'relations':>10}")
+        for label, sql in (("plain", OVERLAP_BEFORE), ("partitioned", OVERLAP_AFTER)):
+            run(conn, sql, stays[:100])  # warm up
+            timings = sorted(run(conn, sql, stays))
+            print(
+                f"{label:<12} {statistics.median(timings):>9.1f} {timings[int(len(timings) * 0.95)]:>9.1f} "
+                f"{statistics.fmean(timings):>9.1f} {scanned_partitions(conn, sql, stays[0]):>10}"
+            )
+
+        if not args.keep:
+            conn.execute(text(f"DROP SCHEMA {SCHEMA} CASCADE"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Bandwidth and CPU benchmark for response compression.
+
+Builds paginated `/rooms` payloads (rooms with long descriptions plus expanded features and badges)
+and reports, for every supported encoding, the bytes on the wire and the CPU time spent:
+
+- ``compress``: what the compression middleware pays on every request of an uncached endpoint.
+- ``cache hit``: what the `cache` decorator pays on a hit, where the precompressed variant is read back.
+
+Usage (from the ``backend`` directory)::
+
+    python -m benchmarks.bench_compression
+"""
+
+import json
+import random
+import timeit
+
+from src.app.core.utils.compression import GZIP, compress, supported_encodings
+
+FEATURES = [{"id": i, "name": f"Feature {i}", "description": "A large bed fit for a king " * 2} for i in range(1, 23)]
+BADGES = [{"id": i, "name": f"Badge {i}", "description": "A room with a view of the ocean " * 2} for i in range(1, 14)]
+WORDS = "experience luxury with a breathtaking view of the ocean from your private balcony".split()
+
+
+def make_rooms_page(items_per_page: int) -> bytes:
+    rng = random.Random(items_per_page)
+    data = []
+    for room_id in range(1, items_per_page + 1):
+        features = rng.sample(FEATURES, 6)
+        badges = rng.sample(BADGES, 3)
+        data.append(
+            {
+                "id": room_id,
+                "name": f"Deluxe Suite {room_id}",
+                "description": " ".join(rng.choices(WORDS, k=120)),
+                "image_2d": f"https://i.ibb.co/abc{room_id}/room.jpg",
+                "image_3d": "",
+                "price": rng.randint(50, 400),
+                "feature_ids": [f["id"] for f in features],
+                "badge_ids": [b["id"] for b in badges],
+                "features": features,
+                "badges": badges,
+            }
+        )
+    page = {"data": data, "total_count": 500, "has_more": True, "page": 1, "items_per_page": items_per_page}
+    return json.dumps(page).encode()
+
+
+def main() -> None:
+    number = 200
+    print(f"{'items':>6} {'encoding':>8} {'raw B':>9} {'wire B':>9} {'ratio':>6} {'compress µs':>12} {'hit µs':>8}")
+    for items_per_page in (10, 50, 100):
+        body = make_rooms_page(items_per_page)
+        for encoding in supported_encodings():
+            levels = [6, 9] if encoding == GZIP else [4, 11]
+            for level in levels:
+                kwargs = {"gzip_level": level} if encoding == GZIP else {"brotli_quality": level}
+                compressed = compress(body, encoding, **kwargs)
+                cost = timeit.timeit(lambda: compress(body, encoding, **kwargs), number=number) / number
+                # a cache hit only copies the stored bytes into the response
+                hit = timeit.timeit(lambda: bytes(compressed), number=number) / number
+                label = f"{encoding}:{level}"
+                print(
+                    f"{items_per_page:>6} {label:>8} {len(body):>9} {len(compressed):>9} "
+                    f"{len(body) / len(compressed):>6.1f} {cost * 1e6:>12.1f} {hit * 1e6:>8.2f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
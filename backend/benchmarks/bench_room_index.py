@@ -0,0 +1,174 @@
+"""Latency benchmark of `GET /rooms/filter`: the in-memory `RoomIndex` against the Postgres query.
+
+Generates ``--rooms`` rooms (default 100k, random prices, features and badges, 2% deleted) and times the filtering
+and paging of each query (ids of a page of 10 rooms plus the total count):
+
+- ``index``: `RoomIndex.filter` on the rooms, bitset ANDs and a binary search on the prices, in this process.
+- ``sql``: the statement of `get_filtered_rooms` (`room_filters`, ids only), on the rooms seeded into a scratch
+  ``bench_room_index`` schema with the `room` table and indexes of the model.
+
+Both answer the same filters, a mix of price ranges and one to three features and badges, and the ids they return
+are checked to be equal. The index build time and size are reported too.
+
+Without ``--sql`` only the index is timed and no database is needed. The SQL case needs the Postgres database of
+the settings; its schema is dropped at the end unless ``--keep`` is given.
+
+Usage (from the ``backend`` directory)::
+
+    python -m benchmarks.bench_room_index --rooms 100000 --sql
+"""
+
+import argparse
+import random
+import statistics
+import time
+from collections.abc import Callable
+from datetime import UTC, datetime
+
+from sqlalchemy import Connection, MetaData, create_engine, func, insert, select, text
+
+from src.app.core.config import settings
+from src.app.core.utils.room_index import RoomIndex
+from src.app.crud.crud_rooms import room_filters
+from src.app.models.room import Room
+
+SCHEMA = "bench_room_index"
+FEATURES, BADGES = 22, 13
+PAGE = 10
+
+Filter = tuple[float | None, float | None, list[int], list[int]]
+
+
+def make_rooms(n: int, rng: random.Random) -> list[tuple[int, bool, float, list[int], list[int]]]:
+    return [
+        (
+            id,
+            rng.random() < 0.02,
+            float(rng.randint(50, 400)),
+            sorted(f for f in range(1, FEATURES + 1) if rng.random() < 0.3),
+            sorted(b for b in range(1, BADGES + 1) if rng.random() < 0.2),
+        )
+        for id in range(1, n + 1)
+    ]
+
+
+def make_filters(n: int, rng: random.Random) -> list[Filter]:
+    filters = []
+    for _ in range(n):
+        low = rng.choice([None, 50, 100, 150])
+        high = rng.choice([None, 200, 300]) if low is not None else rng.choice([150, 250])
+        features = rng.sample(range(1, FEATURES + 1), rng.randint(0, 3))
+        badges = rng.sample(range(1, BADGES + 1), rng.randint(0, 1))
+        filters.append((low, high, features, badges))
+    return filters
+
+
+def seed(conn: Connection, rooms: list[tuple[int, bool, float, list[int], list[int]]]) -> None:
+    conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+    conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+    metadata = MetaData()
+    table = Room.__table__.to_metadata(metadata, schema=SCHEMA)
+    metadata.create_all(conn)
+
+    started, now = time.perf_counter(), datetime.now(UTC)
+    rows = [
+        {
+            "id": id,
+            "name": f"Room {id}",
+            "description": "",
+            "image_2d": "",
+            "image_3d": "",
+            "price": price,
+            "status": "available",
+            "feature_ids": features,
+            "badge_ids": badges,
+            "is_deleted": is_deleted,
+            "created_at": now,
+        }
+        for id, is_deleted, price, features, badges in rooms
+    ]
+    for i in range(0, len(rows), 10_000):
+        conn.execute(insert(table), rows[i : i + 10_000])
+    conn.execute(text(f"ANALYZE {SCHEMA}.room"))
+    print(f"seeded {len(rooms):,} rooms in {time.perf_counter() - started:.1f} s")
+
+
+def sql_page(conn: Connection) -> Callable[[Filter], tuple[list[int], int]]:
+    def run(values: Filter) -> tuple[list[int], int]:
+        stmt = select(Room.id, func.count().over()).where(*room_filters(*values)).order_by(Room.id).limit(PAGE)
+        rows = conn.execute(stmt).all()
+        return [row[0] for row in rows], rows[0][1] if rows else 0
+
+    return run
+
+
+def index_page(index: RoomIndex) -> Callable[[Filter], tuple[list[int], int]]:
+    def run(values: Filter) -> tuple[list[int], int]:
+        ids = index.filter(*values)
+        return ids[:PAGE].tolist(), len(ids)
+
+    return run
+
+
+def time_case(run: Callable[[Filter], tuple[list[int], int]], filters: list[Filter]) -> tuple[list, list[float]]:
+    for values in filters[:10]:  # warm up
+        run(values)
+    results, timings = [], []
+    for values in filters:
+        started = time.perf_counter()
+        results.append(run(values))
+        timings.append((time.perf_counter() - started) * 1e3)
+    return results, sorted(timings)
+
+
+def report(label: str, timings: list[float]) -> None:
+    print(
+        f"{label:<8} {statistics.median(timings):>9.3f} {timings[int(len(timings) * 0.95)]:>9.3f} "
+        f"{statistics.fmean(timings):>9.3f}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rooms", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--sql", action="store_true", help="also time the Postgres query")
+    parser.add_argument("--keep", action="store_true", help="keep the seeded schema")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    rooms = make_rooms(args.rooms, rng)
+    filters = make_filters(args.queries, rng)
+
+    started = time.perf_counter()
+    index = RoomIndex(rooms)
+    size = index.ids.nbytes + index.prices.nbytes + index.live.nbytes
+    size += sum(bits.nbytes for bitsets in (index.features, index.badges) for bits in bitsets.values())
+    print(f"built the index of {args.rooms:,} rooms in {time.perf_counter() - started:.2f} s, {size / 1e6:.1f} MB")
+
+    print(f"\n{args.queries} filters, pages of {PAGE} ids with their total count")
+    print(f"{'case':<8} {'p50 ms':>9} {'p95 ms':>9} {'mean ms':>9}")
+    expected, timings = time_case(index_page(index), filters)
+    report("index", timings)
+
+    if not args.sql:
+        return
+
+    engine = create_engine(settings.POSTGRES_SYNC_PREFIX + settings.POSTGRES_URI)
+    with engine.connect() as conn:
+        conn.execution_options(isolation_level="AUTOCOMMIT")
+        seed(conn, rooms)
+        # the statements name `room`, resolved to the seeded table
+        conn.execute(text(f"SET search_path TO {SCHEMA}, public"))
+
+        results, timings = time_case(sql_page(conn), filters)
+        report("sql", timings)
+        assert results == expected, "the index and Postgres disagree"
+
+        if not args.keep:
+            conn.execute(text(f"DROP SCHEMA {SCHEMA} CASCADE"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""Latency benchmark for `GET /rooms/search` on a synthetic catalog.
+
+Seeds ``--rooms`` rooms (default 100k, random names and 40-word descriptions, random features and badges) into a
+scratch ``bench_room_search`` schema, with the `room` table and indexes of the model, and times a page of results
+(10 rooms plus the total count) for:
+
+- ``ilike``: a naive `ILIKE '%term%'` on name and description, what the search would be without its indexes.
+- ``search``: `room_search`, full-text match on name and description or trigram match on name.
+- ``search typo``: the same with a misspelled term, only found through the trigram match.
+- ``search + filters``: `room_search` combined with `room_filters` (price range and two features).
+
+Needs the Postgres database of the settings (with ``pg_trgm`` available); the schema is dropped at the end unless
+``--keep`` is given.
+
+Usage (from the ``backend`` directory)::
+
+    python -m benchmarks.bench_room_search --rooms 100000
+"""
+
+import argparse
+import random
+import statistics
+import time
+
+from sqlalchemy import Connection, MetaData, Select, create_engine, func, or_, select, text
+
+from src.app.core.config import settings
+from src.app.crud.crud_rooms import room_filters, room_search
+from src.app.models.room import Room
+
+SCHEMA = "bench_room_search"
+WORDS = (
+    "deluxe ocean garden suite king queen twin balcony view city mountain lake sea family studio loft penthouse "
+    "terrace quiet sunny spacious modern classic cozy bright luxury breakfast jacuzzi fireplace kitchen workspace"
+).split()
+FEATURES, BADGES = 22, 13
+
+SEED = f"""
+INSERT INTO {SCHEMA}.room (name, description, image_2d, image_3d, price, status, feature_ids, badge_ids, created_at)
+SELECT
+    initcap(w.words[1 + (i * 7) % :n]) || ' ' || initcap(w.words[1 + (i * 13) % :n]) || ' ' || i,
+    (SELECT string_agg(w.words[1 + floor(random() * :n)::int], ' ') FROM generate_series(1, 40 + i * 0)),
+    '', '', 50 + floor(random() * 350), 'available',
+    ARRAY(SELECT f FROM generate_series(1, {FEATURES}) AS f WHERE random() < 0.3 + i * 0),
+    ARRAY(SELECT b FROM generate_series(1, {BADGES}) AS b WHERE random() < 0.2 + i * 0),
+    now()
+FROM generate_series(1, :rooms) AS i, (SELECT CAST(:words AS text[]) AS words) AS w
+"""
+
+
+def setup(conn: Connection, rooms: int) -> None:
+    conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+    conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+    metadata = MetaData()
+    Room.__table__.to_metadata(metadata, schema=SCHEMA)
+    metadata.create_all(conn)
+
+    started = time.perf_counter()
+    conn.execute(text(SEED), {"rooms": rooms, "words": WORDS, "n": len(WORDS)})
+    conn.execute(text(f"ANALYZE {SCHEMA}.room"))
+    print(f"seeded {rooms:,} rooms in {time.perf_counter() - started:.1f} s")
+
+
+def misspell(word: str, rng: random.Random) -> str:
+    i = rng.randrange(len(word) - 1)
+    return word[:i] + word[i + 1] + word[i] + word[i + 2 :]
+
+
+def page(where: list, order_by: list) -> Select:
+    return select(Room.id, Room.name, Room.price, func.count().over()).where(*where).order_by(*order_by).limit(10)
+
+
+def search_page(term: str, filters: list) -> Select:
+    match, rank = room_search(term)
+    return page([*filters, match], [rank.desc(), Room.id])
+
+
+def run(conn: Connection, statements: list[Select]) -> tuple[list[float], float]:
+    timings, matched = [], 0
+    for stmt in statements:
+        started = time.perf_counter()
+        rows = conn.execute(stmt).all()
+        timings.append((time.perf_counter() - started) * 1e3)
+        matched += rows[0][3] if rows else 0
+    return sorted(timings), matched / len(statements)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rooms", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--keep", action="store_true", help="keep the seeded schema")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    terms = [rng.choice([w for w in WORDS if len(w) > 4]) for _ in range(args.queries)]
+    live, filters = room_filters(), room_filters(100, 250, [3, 7], [])
+
+    cases: dict[str, list[Select]] = {
+        "ilike": [
+            page([*live, or_(Room.name.ilike(f"%{term}%"), Room.description.ilike(f"%{term}%"))], [Room.id])
+            for term in terms
+        ],
+        "search": [search_page(term, live) for term in terms],
+        "search typo": [search_page(misspell(term, rng), live) for term in terms],
+        "search + filters": [search_page(term, filters) for term in terms],
+    }
+
+    engine = create_engine(settings.POSTGRES_SYNC_PREFIX + settings.POSTGRES_URI)
+    with engine.connect() as conn:
+        conn.execution_options(isolation_level="AUTOCOMMIT")
+        setup(conn, args.rooms)
+        # the statements name `room`, resolved to the seeded table
+        conn.execute(text(f"SET search_path TO {SCHEMA}, public"))
+
+        print(f"\n{args.queries} queries per case, {args.rooms:,} rooms, pages of 10 with their total count")
+        print(f"{'case':<18} {'p50 ms':>8} {'p95 ms':>8} {'mean ms':>8} {'matches':>9}")
+        for label, statements in cases.items():
+            run(conn, statements[:10])  # warm up
+            timings, matched = run(conn, statements)
+            print(
+                f"{label:<18} {statistics.median(timings):>8.2f} {timings[int(len(timings) * 0.95)]:>8.2f} "
+                f"{statistics.fmean(timings):>8.2f} {matched:>9.0f}"
+            )
+
+        if not args.keep:
+            conn.execute(text(f"DROP SCHEMA {SCHEMA} CASCADE"))
+
+
+if __name__ == "__main__":
+    main()
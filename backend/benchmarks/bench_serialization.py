@@ -0,0 +1,79 @@
+"""Serialization benchmark for large paginated booking responses.
+
+Compares three ways of turning a `schema_to_select=BookingRead` page into response bytes:
+
+- ``validate + json``: FastAPI's default path, `response_model` re-validation then stdlib `json`.
+- ``validate + orjson``: same re-validation, rendered by `ORJSONResponse`.
+- ``orjson``: returning an `ORJSONResponse` directly, skipping the redundant re-validation.
+
+Usage (from the ``backend`` directory)::
+
+    python -m benchmarks.bench_serialization
+"""
+
+import asyncio
+import timeit
+from datetime import UTC, datetime, timedelta
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from fastcrud.paginated import PaginatedListResponse, paginated_response
+
+from src.app.core.responses import ORJSONResponse
+from src.app.schemas.booking import BookingRead
+
+
+def make_bookings_page(items_per_page: int) -> dict:
+    now = datetime.now(UTC)
+    data = [
+        {
+            "id": i,
+            "user_id": i % 97,
+            "room_id": i % 31,
+            "check_in": now + timedelta(days=i),
+            "check_out": now + timedelta(days=i + 3),
+            "total_price": 299.0,
+            "status": "booked",
+            "guest_name": "John Doe",
+            "guest_contact_number": "+1234567890",
+            "guest_email": "abc@gmail.com",
+            "number_of_guests": 2,
+            "created_at": now,
+            "updated_at": None,
+            "deleted_at": None,
+        }
+        for i in range(items_per_page)
+    ]
+    return paginated_response(crud_data={"data": data, "total_count": 100_000}, page=1, items_per_page=items_per_page)
+
+
+def main() -> None:
+    field = create_response_field(name="response", type_=PaginatedListResponse[BookingRead], mode="serialization")
+
+    async def validated(content: dict) -> object:
+        return await serialize_response(field=field, response_content=content)
+
+    loop = asyncio.new_event_loop()
+    print(f"{'items':>6} {'validate + json ms':>19} {'validate + orjson ms':>21} {'orjson ms':>10} {'bytes':>9}")
+    for items_per_page in (100, 1000, 5000):
+        page = make_bookings_page(items_per_page)
+        number = max(1, 20_000 // items_per_page)
+
+        def stdlib() -> bytes:
+            return JSONResponse(loop.run_until_complete(validated(page))).body
+
+        def orjson_validated() -> bytes:
+            return ORJSONResponse(loop.run_until_complete(validated(page))).body
+
+        def orjson_direct() -> bytes:
+            return ORJSONResponse(page).body
+
+        timings = [timeit.timeit(f, number=number) / number * 1e3 for f in (stdlib, orjson_validated, orjson_direct)]
+        size = len(orjson_direct())
+        print(f"{items_per_page:>6} {timings[0]:>19.2f} {timings[1]:>21.2f} {timings[2]:>10.2f} {size:>9}")
+    loop.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,20 @@
 from typing import Annotated, Any
 
-from fastapi import Depends, HTTPException, Request
+from fastapi import Depends, HTTPException, Query, Request
+from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..core.config import settings
 from ..core.db.database import async_get_db
-from ..core.exceptions.http_exceptions import ForbiddenException, RateLimitException, UnauthorizedException
+from ..core.exceptions.http_exceptions import (
+    BadRequestException,
+    ForbiddenException,
+    UnauthorizedException,
+)
 from ..core.logger import logging
 from ..core.security import oauth2_scheme, verify_token
+from ..core.utils.batch import unique_ids
+from ..core.utils.fieldsets import narrow_schema, parse_fields
 from ..core.utils.rate_limit import is_rate_limited
 from ..crud.crud_rate_limit import crud_rate_limits
 # from ..crud.crud_tier import crud_tiers
@@ -72,6 +79,28 @@ async def get_current_superuser(current_user: Annotated[dict, Depends(get_curren
     return current_user
 
 
+def select_fields(fields: str | None, schema: type[BaseModel], *always: str) -> type[BaseModel]:
+    """Return the `schema_to_select` of a read for its `fields=` query parameter, see `core.utils.fieldsets`.
+
+    The `always` fields are selected whether requested or not.
+    """
+    try:
+        names = parse_fields(fields, schema)
+    except ValueError as e:
+        raise BadRequestException(str(e))
+    if names is not None and always:
+        names = [name for name in schema.model_fields if name in {*names, *always}]
+    return narrow_schema(schema, names)
+
+
+def batch_ids(ids: list[int] = Query(...)) -> list[int]:
+    """The `ids` of a batch read, without repeats, see `core.utils.batch`."""
+    try:
+        return unique_ids(ids)
+    except ValueError as e:
+        raise BadRequestException(str(e))
+
+
 # async def rate_limiter(
 #     request: Request, db: Annotated[AsyncSession, Depends(async_get_db)], user: User | None = Depends(get_optional_user)
 # ) -> None:
@@ -10,6 +10,9 @@ from .users import router as users_router
 from .rooms import router as rooms_router
 from .image import router as image_router
 from .booking import router as booking_router
+from .calendar import router as calendar_router
+from .analytics import router as analytics_router
+from .pricing import router as pricing_router
 
 router = APIRouter(prefix="/v1")
 router.include_router(login_router)
@@ -18,6 +21,9 @@ router.include_router(users_router)
 router.include_router(rooms_router)
 router.include_router(image_router)
 router.include_router(booking_router)
+router.include_router(calendar_router)
+router.include_router(analytics_router)
+router.include_router(pricing_router)
 # router.include_router(posts_router)
 # router.include_router(tasks_router)
 # router.include_router(tiers_router)
@@ -0,0 +1,114 @@
+from datetime import date
+from typing import Annotated, Any, Literal
+
+from fastapi import APIRouter, Depends, Query, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ...core.db.database import async_get_db
+from ...core.exceptions.http_exceptions import BadRequestException, CustomException
+from ...core.logger import logging
+from ...core.utils import queue
+from ...core.utils.analytics import kpis
+from ...crud.crud_booking_daily_rollup import get_daily_rollup
+from ...crud.crud_rooms import crud_rooms
+from ..dependencies import get_current_superuser
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(tags=["analytics"], dependencies=[Depends(get_current_superuser)])
+
+ANALYTICS_MAX_DAYS = 3 * 366
+
+Granularity = Literal["day", "week", "month", "total"]
+
+
+async def _report(
+    db: AsyncSession, metric: str, start: date, end: date, granularity: str, room_ids: list[int]
+) -> dict[str, Any]:
+    if start >= end:
+        raise BadRequestException("The start date should be before the end date")
+    if (end - start).days > ANALYTICS_MAX_DAYS:
+        raise BadRequestException(f"Analytics cover at most {ANALYTICS_MAX_DAYS} days")
+
+    room_count = len(set(room_ids)) if room_ids else await crud_rooms.count(db=db, is_deleted=False)
+    rows = await get_daily_rollup(db, start, end, room_ids or None)
+    columns = list(zip(*rows)) or [[], [], [], []]
+    _, days, nights_sold, revenue = columns
+
+    total = kpis(start, end, "total", days, nights_sold, revenue, room_count)[0]
+    periods = kpis(start, end, granularity, days, nights_sold, revenue, room_count) if granularity != "total" else []
+    return {
+        "start": start,
+        "end": end,
+        "granularity": granularity,
+        "room_count": room_count,
+        metric: total[metric],
+        "periods": [{"start": period["start"], "end": period["end"], metric: period[metric]} for period in periods],
+    }
+
+
+@router.get("/analytics/occupancy", response_model=dict)
+async def read_occupancy(
+    request: Request,
+    start: date,
+    end: date,
+    db: Annotated[AsyncSession, Depends(async_get_db)],
+    granularity: Granularity = "total",
+    room_ids: list[int] = Query([]),
+) -> dict[str, Any]:
+    """
+    Further details:
+    - Occupancy rate: nights sold / available room nights, over `[start, end)` and per period.
+    - Answered from `booking_daily_rollup`, without scanning `booking`.
+    """
+    return await _report(db, "occupancy", start, end, granularity, room_ids)
+
+
+@router.get("/analytics/adr", response_model=dict)
+async def read_adr(
+    request: Request,
+    start: date,
+    end: date,
+    db: Annotated[AsyncSession, Depends(async_get_db)],
+    granularity: Granularity = "total",
+    room_ids: list[int] = Query([]),
+) -> dict[str, Any]:
+    """
+    Further details:
+    - Average daily rate: revenue / nights sold, over `[start, end)` and per period.
+    - Answered from `booking_daily_rollup`, without scanning `booking`.
+    """
+    return await _report(db, "adr", start, end, granularity, room_ids)
+
+
+@router.get("/analytics/revpar", response_model=dict)
+async def read_revpar(
+    request: Request,
+    start: date,
+    end: date,
+    db: Annotated[AsyncSession, Depends(async_get_db)],
+    granularity: Granularity = "total",
+    room_ids: list[int] = Query([]),
+) -> dict[str, Any]:
+    """
+    Further details:
+    - Revenue per available room: revenue / available room nights, over `[start, end)` and per period.
+    - Answered from `booking_daily_rollup`, without scanning `booking`.
+    """
+    return await _report(db, "revpar", start, end, granularity, room_ids)
+
+
+@router.post("/analytics/rollup/rebuild", status_code=202, response_model=dict)
+async def rebuild_rollup(request: Request, start: date | None = None, end: date | None = None) -> dict[str, Any]:
+    """
+    Further details:
+    - Rebuilds `booking_daily_rollup` from `booking` in the worker, over `[start, end)` or every booked day.
+    - A rebuild of the same range already queued or running is not queued twice, its id is returned.
+    """
+    if queue.pool is None:
+        logger.warning("Queue pool is not initialized, cannot rebuild the booking rollup")
+        raise CustomException(status_code=503, detail="The rebuild cannot be queued right now")
+
+    job_id = f"booking_rollup:rebuild:{start or 'first'}:{end or 'last'}"
+    await queue.pool.enqueue_job("rebuild_booking_rollup", start, end, _job_id=job_id)
+    return {"id": job_id}
@@ -1,22 +1,161 @@
-from typing import Annotated, Any
+import asyncio
+from collections.abc import AsyncIterator, Sequence
+from datetime import UTC, date, datetime, time, timedelta
+from typing import Annotated, Any, Literal
 
-from fastapi import APIRouter, Depends, Request, Query
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import StreamingResponse
 from fastcrud.paginated import PaginatedListResponse, compute_offset, paginated_response
+from redis.exceptions import RedisError
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..dependencies import get_current_superuser
-from ...core.db.database import async_get_db
-from ...core.exceptions.http_exceptions import DuplicateValueException, NotFoundException
-from ...crud.crud_booking import crud_bookings
-from ...crud.crud_rooms import crud_rooms
-from ...schemas.booking import BookingCreate, BookingDelete, BookingRead, BookingUpdate, BookingUpdateInternal
-from ...schemas.room import RoomRead, RoomUpdate
+from ...core.config import settings
+from ...core.db import partitions
+from ...core.db.database import async_get_db, local_session
+from ...core.exceptions.cache_exceptions import MissingClientError
+from ...core.exceptions.http_exceptions import (
+    BadRequestException,
+    CustomException,
+    DuplicateValueException,
+    NotFoundException,
+    UnauthorizedException,
+)
+from ...core.logger import logging
+from ...core.responses import ORJSONResponse
+from ...core.utils import booking_jobs, holds, occupancy, pricing, queue
+from ...core.utils.batch import in_request_order
+from ...core.utils.bulk_import import ImportReport, iter_batches, iter_records
+from ...core.utils.export import EXPORT_FORMATS, encode
+from ...crud.crud_booking import (
+    EXPORT_COLUMNS,
+    OPEN_BOOKING_STATUSES,
+    crud_bookings,
+    find_overlapping,
+    get_missing_references,
+    night_bounds,
+    open_overlap_filters,
+    stream_bookings,
+    transition_booking,
+)
+from ...crud.crud_booking_archive import get_booking_with_archive, get_user_bookings_with_archive
+from ...models.booking import Booking
+from ...schemas.booking import (
+    BookingArchiveRead,
+    BookingCreate,
+    BookingCreateInternal,
+    BookingRead,
+    BookingStatusUpdate,
+    BookingUpdate,
+)
+from ..dependencies import batch_ids, get_current_superuser, get_optional_user, select_fields
+
+logger = logging.getLogger(__name__)
+
+# SQLSTATE of an exclusion constraint violation
+EXCLUSION_VIOLATION = "23P01"
 
 router = APIRouter(tags=["bookings"])
 
+
+async def _enqueue_booking_side_effects(
+    booking_id: int,
+    stays: list[tuple[int, datetime, datetime]],
+    action: str,
+    status: str | None = None,
+    notify: str | None = None,
+) -> None:
+    """Hand the side effects of a booking change to the arq worker so the request only pays for the DB write.
+
+    See `booking_jobs.enqueue_side_effects` for the jobs queued.
+    """
+    if queue.pool is None:
+        logger.warning(f"Queue pool is not initialized, skipping side effects of booking {booking_id} ({action})")
+        return
+
+    await booking_jobs.enqueue_side_effects(queue.pool, booking_id, stays, action, status, notify)
+
+
+async def _update_occupancy(room_id: int, check_in: datetime, check_out: datetime, occupied: bool) -> None:
+    """Apply a booking change to the room's occupancy bitmap right away.
+
+    A failure is only logged: the `refresh_room_availability` job enqueued for the same change rebuilds the
+    bitmap from Postgres anyway.
+    """
+    try:
+        await occupancy.mark(room_id, check_in, check_out, occupied)
+    except (RedisError, MissingClientError) as e:
+        logger.warning(f"Could not update the occupancy bitmap of room {room_id}: {e!r}")
+
+async def _after_transition(
+    id: int, transition: dict, status: str, action: str = "updated", notify: str | None = None
+) -> None:
+    stay = (transition["room_id"], transition["check_in"], transition["check_out"])
+    if transition["previous_status"] in OPEN_BOOKING_STATUSES and status not in OPEN_BOOKING_STATUSES:
+        await _update_occupancy(*stay, False)
+    await _enqueue_booking_side_effects(id, [stay], action, status, notify=notify)
+
+def _check_stay(check_in: datetime, check_out: datetime) -> None:
+    # overlaps are checked per night (see `open_overlap_filters`), a stay that never spans a night would not count
+    if occupancy.night_offset(check_out) <= occupancy.night_offset(check_in):
+        raise BadRequestException("A booking covers at least one night")
+    if check_out - check_in > timedelta(days=settings.BOOKING_MAX_NIGHTS):
+        raise BadRequestException(f"A booking covers at most {settings.BOOKING_MAX_NIGHTS} nights")
+    # `booking` only has partitions from the current month to `BOOKING_PARTITION_MONTHS_AHEAD` months ahead, see
+    # `maintain_booking_partitions`; older stays are loaded with `POST /bookings/import`, which creates their months
+    current = partitions.month_start(datetime.now(UTC))
+    if check_in < datetime.combine(current, time(), tzinfo=UTC):
+        raise BadRequestException("Bookings can't check in before the current month")
+    horizon = partitions.add_months(current, settings.BOOKING_PARTITION_MONTHS_AHEAD)
+    if check_in >= datetime.combine(horizon, time(), tzinfo=UTC):
+        raise BadRequestException(f"Bookings open at most {settings.BOOKING_PARTITION_MONTHS_AHEAD} months ahead")
+
+async def _check_holds(booking: BookingCreate, owner: str | None) -> holds.Hold | None:
+    """Return the booking's own hold, after making sure no other guest holds the nights it books.
+
+    `owner` is the id of the authenticated user, holds being placed by users: their own holds never block them,
+    and only they can convert one into a booking. Without Redis holds can not be placed either, so the check is
+    skipped unless the booking names a hold.
+    """
+    if booking.hold_id is not None and owner is None:
+        raise UnauthorizedException("Sign in to book a held room.")
+    try:
+        if booking.hold_id is None:
+            if await holds.conflicting(booking.room_id, booking.check_in, booking.check_out, owner) is not None:
+                raise DuplicateValueException("Room is held by another guest for the given date range")
+            return None
+
+        hold = await holds.get(booking.hold_id)
+    except (RedisError, MissingClientError) as e:
+        if booking.hold_id is not None:
+            raise CustomException(status_code=503, detail="Holds are not available right now")
+        logger.warning(f"Could not check the holds of room {booking.room_id}: {e!r}")
+        return None
+
+    if (
+        hold is None
+        or hold.room_id != booking.room_id
+        or hold.owner != owner
+        or not hold.covers(booking.check_in, booking.check_out)
+    ):
+        raise BadRequestException("Hold not found, expired, or not matching the booking")
+    return hold
+
+
+async def _release_hold(hold: holds.Hold) -> None:
+    try:
+        await holds.release(hold)
+    except (RedisError, MissingClientError) as e:
+        logger.warning(f"Could not release hold {hold.id}, it expires on its own: {e!r}")
+
+
 @router.post("/booking", response_model=BookingRead, status_code=201)
 async def write_booking(
-    request: Request, booking: BookingCreate, db: Annotated[AsyncSession, Depends(async_get_db)]
+    request: Request,
+    booking: BookingCreate,
+    db: Annotated[AsyncSession, Depends(async_get_db)],
+    current_user: Annotated[dict | None, Depends(get_optional_user)],
 ) -> BookingRead:
     """_summary_
 
@@ -31,39 +170,242 @@ async def write_booking(
     # check if the check_in date is before the check_out date
     if booking.check_in >= booking.check_out:
         raise ValueError("Check-in date should be before the check-out date")
-    # check if there is already a booking for the room in the given date range(status = booked)
-    existing_booking = await crud_bookings.exists(db=db, room_id=booking.room_id, check_in__lte=booking.check_out, check_out__gte=booking.check_in, status="booked")
+    _check_stay(booking.check_in, booking.check_out)
+    hold = await _check_holds(booking, str(current_user["id"]) if current_user is not None else None)
+    # check if there is already a booking for the room in the given date range (status = booked or checked_in)
+    existing_booking = await crud_bookings.exists(
+        db=db, **open_overlap_filters(booking.room_id, booking.check_in, booking.check_out)
+    )
     if existing_booking is not False:
         raise DuplicateValueException("Room is already booked in the given date range")
-    
-    created_booking: BookingRead = await crud_bookings.create(db=db, object=booking)
-    
+
+    quotes = await pricing.quote(db, [booking.room_id], booking.check_in, booking.check_out)
+    if booking.room_id not in quotes:
+        raise NotFoundException("Room not found")
+
+    booking_internal = BookingCreateInternal(
+        **booking.model_dump(exclude={"hold_id", "total_price"}), total_price=quotes[booking.room_id]["total"]
+    )
+    try:
+        created_booking: BookingRead = await crud_bookings.create(db=db, object=booking_internal)
+    except IntegrityError as e:
+        await db.rollback()
+        # the partition's exclusion constraint caught a booking written since the check above
+        if getattr(e.orig, "sqlstate", None) == EXCLUSION_VIOLATION:
+            raise DuplicateValueException("Room is already booked in the given date range")
+        raise
+    await _update_occupancy(created_booking.room_id, created_booking.check_in, created_booking.check_out, True)
+    if hold is not None:
+        await _release_hold(hold)
+    await _enqueue_booking_side_effects(
+        created_booking.id,
+        [(created_booking.room_id, created_booking.check_in, created_booking.check_out)],
+        "created",
+        created_booking.status,
+        notify="confirmed",
+    )
+
     return created_booking
 
 @router.get("/bookings", response_model=PaginatedListResponse[BookingRead])
 async def read_bookings(
-    request: Request, db: Annotated[AsyncSession, Depends(async_get_db)], page: int = 1, items_per_page: int = 10
-) -> dict:
+    request: Request,
+    db: Annotated[AsyncSession, Depends(async_get_db)],
+    page: int = 1,
+    items_per_page: int = 10,
+    fields: str | None = None,
+) -> ORJSONResponse:
+    """
+    Further details:
+    - `fields`: comma separated fields to return, all of them by default; only those columns are read.
+    """
     bookings_data = await crud_bookings.get_multi(
         db=db,
         offset=compute_offset(page, items_per_page),
         limit=items_per_page,
-        schema_to_select=BookingRead,
+        schema_to_select=select_fields(fields, BookingRead),
         is_deleted=False,
     )
 
     response: dict[str, Any] = paginated_response(crud_data=bookings_data, page=page, items_per_page=items_per_page)
-    return response
+    return ORJSONResponse(response)
+
+@router.get("/bookings/batch", response_model=dict)
+async def read_bookings_batch(
+    request: Request,
+    db: Annotated[AsyncSession, Depends(async_get_db)],
+    ids: Annotated[list[int], Depends(batch_ids)],
+    fields: str | None = None,
+) -> ORJSONResponse:
+    """
+    Output:
+    - data: the bookings, in the order of `ids`.
+    - missing_ids: the ids of bookings that do not exist, were deleted or archived.
+
+    Further details:
+    - `ids`: repeat the parameter (`?ids=3&ids=1`), at most `BATCH_MAX_IDS` distinct ids, read with one query.
+    - `fields` as in `GET /bookings`, `id` is always returned.
+    """
+    bookings_data = await crud_bookings.get_multi(
+        db=db, limit=None, schema_to_select=select_fields(fields, BookingRead, "id"), is_deleted=False, id__in=ids
+    )
+    return ORJSONResponse(in_request_order(bookings_data["data"], ids))
 
-@router.get("/booking/{id}", response_model=BookingRead)
-async def read_booking(request: Request, id: int, db: Annotated[AsyncSession, Depends(async_get_db)]) -> dict:
-    db_booking: BookingRead | None = await crud_bookings.get(
-        db=db, schema_to_select=BookingRead, id=id, is_deleted=False
+EXPORT_PARTITION_SIZE = 1000
+
+
+async def _export_partitions(start: datetime | None, end: datetime | None) -> AsyncIterator[Sequence[tuple]]:
+    # the request's session is closed once the endpoint returns, the stream needs its own for its whole duration
+    async with local_session() as db:
+        async for partition in stream_bookings(db, start, end, EXPORT_PARTITION_SIZE):
+            yield partition
+
+
+@router.get("/bookings/export", dependencies=[Depends(get_current_superuser)], response_class=StreamingResponse)
+async def export_bookings(
+    request: Request,
+    format: Literal["csv", "ndjson"] = "csv",
+    from_: datetime | None = Query(None, alias="from"),
+    to: datetime | None = None,
+) -> StreamingResponse:
+    """
+    Input:
+    - format: csv or ndjson.
+    - from, to: only export the bookings checking in within [from, to).
+
+    Further details:
+    - Rows are streamed from a server-side cursor as they are read, memory stays constant whatever the row count.
+    """
+    return StreamingResponse(
+        encode(format, _export_partitions(from_, to), EXPORT_COLUMNS),
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="bookings.{format}"'},
     )
+
+def _overlaps_within_batch(stays: list[tuple[int, datetime, datetime]]) -> set[int]:
+    """Return the positions of the stays sharing a night with an earlier accepted stay of the same room."""
+    overlapping: set[int] = set()
+    nights = [night_bounds(check_in, check_out) for _, check_in, check_out in stays]
+    last_room, last_end = None, None
+    for i in sorted(range(len(stays)), key=lambda i: (stays[i][0], nights[i][0])):
+        room_id, (first, end) = stays[i][0], nights[i]
+        if room_id == last_room and first < last_end:
+            overlapping.add(i)
+            continue
+        last_room, last_end = room_id, end
+    return overlapping
+
+
+async def _import_booking_batch(
+    db: AsyncSession, batch: list[tuple[int, BookingCreateInternal]], report: ImportReport
+) -> list[BookingCreateInternal]:
+    accepted = []
+    for row, booking in batch:
+        if booking.check_in >= booking.check_out:
+            report.fail(row, "Check-in date should be before the check-out date")
+        elif occupancy.night_offset(booking.check_out) <= occupancy.night_offset(booking.check_in):
+            report.fail(row, "A booking covers at least one night")
+        else:
+            accepted.append((row, booking))
+
+    missing_users, missing_rooms = await get_missing_references(
+        db, {booking.user_id for _, booking in accepted}, {booking.room_id for _, booking in accepted}
+    )
+    batch, accepted = accepted, []
+    for row, booking in batch:
+        if booking.user_id in missing_users:
+            report.fail(row, f"User {booking.user_id} not found")
+        elif booking.room_id in missing_rooms:
+            report.fail(row, f"Room {booking.room_id} not found")
+        else:
+            accepted.append((row, booking))
+
+    # only bookings that hold their room can conflict, first with each other, then with the database
+    open_rows = [i for i, (_, booking) in enumerate(accepted) if booking.status in OPEN_BOOKING_STATUSES]
+    stays = [(accepted[i][1].room_id, accepted[i][1].check_in, accepted[i][1].check_out) for i in open_rows]
+    conflicts = {open_rows[i] for i in _overlaps_within_batch(stays)}
+    remaining = [i for i in open_rows if i not in conflicts]
+    conflicts |= {
+        remaining[i]
+        for i in await find_overlapping(
+            db, [(accepted[i][1].room_id, accepted[i][1].check_in, accepted[i][1].check_out) for i in remaining]
+        )
+    }
+    for i in sorted(conflicts):
+        report.fail(accepted[i][0], "Room is already booked in the given date range")
+    bookings = [booking for i, (_, booking) in enumerate(accepted) if i not in conflicts]
+
+    if bookings:
+        # imports may reach months the worker did not prepare, historic ones in particular
+        await partitions.ensure_partitions(
+            db, min(booking.check_in for booking in bookings), max(booking.check_in for booking in bookings)
+        )
+        now = datetime.now(UTC)
+        await db.execute(insert(Booking), [{**booking.model_dump(), "created_at": now} for booking in bookings])
+        await db.commit()
+        report.inserted += len(bookings)
+    return bookings
+
+
+@router.post("/bookings/import", dependencies=[Depends(get_current_superuser)], response_model=dict)
+async def import_bookings(
+    request: Request, db: Annotated[AsyncSession, Depends(async_get_db)], format: Literal["csv", "ndjson"] = "csv"
+) -> dict[str, Any]:
+    """
+    Input:
+    - format: csv (with a header row) or ndjson. The request body is the file itself, it is read as a stream.
+
+    Output:
+    - inserted, failed: the number of imported and rejected rows.
+    - errors: `{"row": line number, "errors": [...]}` for each rejected row.
+
+    Further details:
+    - Rows are validated with `BookingCreateInternal` and imported in batches, each batch in its own transaction.
+    - Open bookings overlapping each other or an existing booking are rejected, like in `POST /booking`.
+    """
+    report = ImportReport()
+    rooms: dict[int, tuple[datetime, datetime]] = {}
+    records = iter_records(request.stream(), format, BookingCreateInternal)
+    async for batch in iter_batches(records, BookingCreateInternal, report):
+        for booking in await _import_booking_batch(db, batch, report):
+            first, last = rooms.get(booking.room_id, (booking.check_in, booking.check_out))
+            rooms[booking.room_id] = (min(first, booking.check_in), max(last, booking.check_out))
+
+    if queue.pool is None:
+        logger.warning("Queue pool is not initialized, skipping the refreshes after the booking import")
+    else:
+        jobs = [occupancy.enqueue_refresh(queue.pool, room_id) for room_id in rooms]
+        if rooms:
+            start = min(first for first, _ in rooms.values())
+            end = max(last for _, last in rooms.values())
+            jobs.append(queue.pool.enqueue_job("rebuild_booking_rollup", *occupancy.night_dates(start, end)))
+        await asyncio.gather(*jobs)
+
+    return report.as_dict()
+
+@router.get("/booking/{id}", response_model=BookingArchiveRead)
+async def read_booking(
+    request: Request,
+    id: int,
+    db: Annotated[AsyncSession, Depends(async_get_db)],
+    include_archived: bool = False,
+    fields: str | None = None,
+) -> ORJSONResponse:
+    """
+    Further details:
+    - With `include_archived=true`, a booking moved to `booking_archive` is returned too, with its `archived_at`.
+    - `fields`: comma separated fields to return, all of them by default.
+    """
+    if include_archived:
+        db_booking = await get_booking_with_archive(db, id, select_fields(fields, BookingArchiveRead))
+    else:
+        db_booking = await crud_bookings.get(
+            db=db, schema_to_select=select_fields(fields, BookingRead), id=id, is_deleted=False
+        )
     if db_booking is None:
         raise NotFoundException("Booking not found")
 
-    return dict(db_booking)
+    return ORJSONResponse(db_booking)
 
 @router.put("/booking/{id}", response_model=dict)
 async def update_booking(
@@ -79,44 +421,137 @@ async def update_booking(
 
     Returns:
         dict: _description_
+
+    Further details:
+    - Changing the room or the dates reprices the stay from the room's rate plan, as `POST /booking`.
+    - The status only moves along `BOOKING_TRANSITIONS`, with `POST /booking/{id}/status`.
     """
-    # check if check_in date is before check_out date
-    if booking.check_in >= booking.check_out:
-        raise ValueError("Check-in date should be before the check-out date")
-    # check if there is already a booking for the room in the given date range (status = booked)
-    existing_booking = await crud_bookings.exists(db=db, room_id=booking.room_id, check_in__lte=booking.check_out, check_out__gte=booking.check_in, status="booked")
-    if existing_booking is not False:
-        raise DuplicateValueException("Room is already booked in the given date range")
-    
-    updated_booking: BookingRead = await crud_bookings.update(db=db, id=id, object=booking)
+    db_booking = await crud_bookings.get(db=db, schema_to_select=BookingRead, id=id, is_deleted=False)
+    if db_booking is None:
+        raise NotFoundException("Booking not found")
+
+    previous_stay = (db_booking["room_id"], db_booking["check_in"], db_booking["check_out"])
+    stay = (
+        booking.room_id or db_booking["room_id"],
+        booking.check_in or db_booking["check_in"],
+        booking.check_out or db_booking["check_out"],
+    )
+    values = booking.model_dump(exclude_unset=True)
+    if stay != previous_stay:
+        room_id, check_in, check_out = stay
+        # check if check_in date is before check_out date
+        if check_in >= check_out:
+            raise ValueError("Check-in date should be before the check-out date")
+        _check_stay(check_in, check_out)
+        # check if another booking holds the room in the given date range (status = booked or checked_in)
+        existing_booking = await crud_bookings.exists(
+            db=db, id__ne=id, **open_overlap_filters(room_id, check_in, check_out)
+        )
+        if existing_booking is not False:
+            raise DuplicateValueException("Room is already booked in the given date range")
+
+        quotes = await pricing.quote(db, [room_id], check_in, check_out)
+        if room_id not in quotes:
+            raise NotFoundException("Room not found")
+        values["total_price"] = quotes[room_id]["total"]
+
+    try:
+        await crud_bookings.update(db=db, id=id, object=values)
+    except IntegrityError as e:
+        await db.rollback()
+        if getattr(e.orig, "sqlstate", None) == EXCLUSION_VIOLATION:
+            raise DuplicateValueException("Room is already booked in the given date range")
+        raise
+    if db_booking["status"] in OPEN_BOOKING_STATUSES:
+        await _update_occupancy(*previous_stay, False)
+    if db_booking["status"] in OPEN_BOOKING_STATUSES:
+        await _update_occupancy(*stay, True)
+    await _enqueue_booking_side_effects(id, [previous_stay, stay], "updated", db_booking["status"])
 
     return {"message": "Booking updated successfully"}
 
 @router.delete("/booking/{id}", response_model=dict)
 async def delete_booking(
-    request: Request, id: int, booking: BookingDelete, db: Annotated[AsyncSession, Depends(async_get_db)]
+    request: Request, id: int, db: Annotated[AsyncSession, Depends(async_get_db)]
 ) -> dict:
-    deleted_booking: BookingRead = await crud_bookings.delete(db=db, id=id, object=booking)
+    """
+    Further details:
+    - Soft delete: the booking is flagged `is_deleted` and can be brought back with `POST /booking/{id}/restore`.
+    """
+    db_booking = await crud_bookings.get(db=db, schema_to_select=BookingRead, id=id, is_deleted=False)
+    if db_booking is None:
+        raise NotFoundException("Booking not found")
+
+    await crud_bookings.delete(db=db, id=id)
+    if db_booking["status"] in OPEN_BOOKING_STATUSES:
+        await _update_occupancy(db_booking["room_id"], db_booking["check_in"], db_booking["check_out"], False)
+    await _enqueue_booking_side_effects(
+        id, [(db_booking["room_id"], db_booking["check_in"], db_booking["check_out"])], "deleted", db_booking["status"]
+    )
     return {"message": "Booking deleted successfully"}
 
+@router.post("/booking/{id}/restore", response_model=dict, dependencies=[Depends(get_current_superuser)])
+async def restore_booking(request: Request, id: int, db: Annotated[AsyncSession, Depends(async_get_db)]) -> dict:
+    """
+    Further details:
+    - Brings back a soft deleted booking, unless its room was booked for the same dates in the meantime.
+    """
+    db_booking = await crud_bookings.get(db=db, schema_to_select=BookingRead, id=id, is_deleted=True)
+    if db_booking is None:
+        raise NotFoundException("Deleted booking not found")
+
+    stay = (db_booking["room_id"], db_booking["check_in"], db_booking["check_out"])
+    if db_booking["status"] in OPEN_BOOKING_STATUSES:
+        existing_booking = await crud_bookings.exists(db=db, **open_overlap_filters(*stay))
+        if existing_booking is not False:
+            raise DuplicateValueException("Room is already booked in the given date range")
+
+    await crud_bookings.update(db=db, id=id, object={"is_deleted": False, "deleted_at": None})
+    if db_booking["status"] in OPEN_BOOKING_STATUSES:
+        await _update_occupancy(*stay, True)
+    await _enqueue_booking_side_effects(id, [stay], "restored", db_booking["status"])
+    return {"message": "Booking restored successfully"}
+
 # get all bookings of a user
-@router.get("/user/{user_id}/bookings", response_model=PaginatedListResponse[BookingRead])
+@router.get("/user/{user_id}/bookings", response_model=PaginatedListResponse[BookingArchiveRead])
 async def read_user_bookings(
-    request: Request, user_id: int, db: Annotated[AsyncSession, Depends(async_get_db)], page: int = 1, items_per_page: int = 10
-) -> dict:
+    request: Request,
+    user_id: int,
+    db: Annotated[AsyncSession, Depends(async_get_db)],
+    page: int = 1,
+    items_per_page: int = 10,
+    include_archived: bool = False,
+    fields: str | None = None,
+) -> ORJSONResponse:
+    """
+    Further details:
+    - Newest check-in first.
+    - With `include_archived=true`, bookings moved to `booking_archive` are listed too, with their `archived_at`.
+    - `fields`: comma separated fields to return, all of them by default.
+    """
+    if include_archived:
+        bookings_data = await get_user_bookings_with_archive(
+            db,
+            user_id,
+            compute_offset(page, items_per_page),
+            items_per_page,
+            select_fields(fields, BookingArchiveRead),
+        )
+        return ORJSONResponse(paginated_response(crud_data=bookings_data, page=page, items_per_page=items_per_page))
+
     bookings_data = await crud_bookings.get_multi(
         db=db,
         offset=compute_offset(page, items_per_page),
         limit=items_per_page,
-        schema_to_select=BookingRead,
+        schema_to_select=select_fields(fields, BookingRead),
         is_deleted=False,
         user_id=user_id,
         sort_columns=["check_in"],
-        sort_order="desc",
+        sort_orders="desc",
     )
 
     response: dict[str, Any] = paginated_response(crud_data=bookings_data, page=page, items_per_page=items_per_page)
-    return response
+    return ORJSONResponse(response)
 
 @router.post("/booking/{id}/cancel")
 async def cancel_booking(
@@ -138,37 +573,67 @@ async def cancel_booking(
     Further details:
     - If the booking status is booked, the booking status will be updated to "cancelled".
     - If the booking status is checked_out, the booking status will not be updated.
+    - The status is checked and updated by a single guarded statement, so a concurrent check-out wins or loses
+      cleanly instead of being overwritten.
     
     """
-    booking: BookingRead = await crud_bookings.get(db=db, schema_to_select=BookingRead, id=id, is_deleted=False)
-    if booking is None:
+    result = await transition_booking(db, id, "cancelled")
+    if result is None:
         raise NotFoundException("Booking not found")
-    
-    if booking.get("status") == "cancelled":
+
+    if result["transitioned"]:
+        await _after_transition(id, result, "cancelled", action="cancelled", notify="cancelled")
+        return {
+            "message": "Booking cancelled successfully"
+        }
+
+    if result["previous_status"] == "cancelled":
         return {
             "message": "Booking already cancelled"
         }
-        
-    if booking.get("status") == "booked":
-        updated_booking: BookingRead = await crud_bookings.update(db=db, id=id, object=BookingUpdate(status="cancelled"))
-        
+    if result["previous_status"] == "checked_out":
         return {
-            "message": "Booking cancelled successfully"
+            "message": "Booking already checked out"
         }
-        
-    # booking status is checked_out    
     return {
-        "message": "Booking already checked out"
+        "message": f"Booking is {result['previous_status']}, it can not be cancelled"
     }
 
-from datetime import datetime, timedelta, date
+@router.post("/booking/{id}/status", response_model=dict, dependencies=[Depends(get_current_superuser)])
+async def update_booking_status(
+    request: Request, id: int, values: BookingStatusUpdate, db: Annotated[AsyncSession, Depends(async_get_db)]
+) -> dict[str, str]:
+    """
+    Further details:
+    - Moves the booking along `BOOKING_TRANSITIONS` (e.g. booked -> checked_in -> checked_out) in one guarded
+      statement, a move the booking's current status does not allow is answered with a 409.
+    """
+    result = await transition_booking(db, id, values.status)
+    if result is None:
+        raise NotFoundException("Booking not found")
+    if not result["transitioned"]:
+        raise CustomException(
+            status_code=409, detail=f"Booking is {result['previous_status']}, it can not become {values.status}"
+        )
+
+    await _after_transition(
+        id, result, values.status, notify="cancelled" if values.status == "cancelled" else None
+    )
+    return {
+        "message": "Booking status updated",
+        "previous_status": result["previous_status"],
+        "status": values.status,
+    }
+
+
 @router.get("/room/{room_id}/bookings", response_model=PaginatedListResponse[BookingRead])
 async def read_room_bookings(
     request: Request, room_id: int, db: Annotated[AsyncSession, Depends(async_get_db)], page: int = 1, items_per_page: int = 10,
     status: str = Query("booked", alias="status"),
     start_date: datetime = Query(date.today() - timedelta(days=30), alias="start_date"),
-    end_date: datetime = Query(date.today() + timedelta(days=30), alias="end_date")
-) -> dict:
+    end_date: datetime = Query(date.today() + timedelta(days=30), alias="end_date"),
+    fields: str | None = None,
+) -> ORJSONResponse:
     """_summary_
     Args:
         request (Request): _description_
@@ -184,21 +649,22 @@ async def read_room_bookings(
         
     Further details:
     - Get all bookings of a room with given status within a date range (check by check_out date).
+    - `fields`: comma separated fields to return, all of them by default.
     """
-    
+
     bookings_data = await crud_bookings.get_multi(
         db=db,
         offset=compute_offset(page, items_per_page),
         limit=items_per_page,
-        schema_to_select=BookingRead,
+        schema_to_select=select_fields(fields, BookingRead),
         is_deleted=False,
         room_id=room_id,
         sort_columns=["check_out"],
-        sort_order="asc",
+        sort_orders="asc",
         status=status,
         check_out__gte=start_date,
         check_out__lte=end_date
     )
 
     response: dict[str, Any] = paginated_response(crud_data=bookings_data, page=page, items_per_page=items_per_page)
-    return response
+    return ORJSONResponse(response)
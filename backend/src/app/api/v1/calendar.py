@@ -0,0 +1,91 @@
+from datetime import UTC, date, datetime, timedelta
+from typing import Annotated, Any
+
+import numpy as np
+from fastapi import APIRouter, Depends, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ...core.db.database import async_get_db
+from ...core.exceptions.http_exceptions import BadRequestException
+from ...core.responses import ORJSONResponse
+from ...core.utils.occupancy import booking_grid, night_offset, nights, run_length_spans
+from ...crud.crud_booking import SOLD_BOOKING_STATUSES, get_bookings_in_range
+from ...crud.crud_rooms import crud_rooms
+from ...schemas.room import RoomRead
+from ..dependencies import get_current_superuser
+
+router = APIRouter(tags=["calendar"])
+
+CALENDAR_MAX_DAYS = 366
+
+
+@router.get("/calendar", dependencies=[Depends(get_current_superuser)], response_model=dict)
+async def read_calendar(
+    request: Request,
+    db: Annotated[AsyncSession, Depends(async_get_db)],
+    start: date | None = None,
+    end: date | None = None,
+) -> ORJSONResponse:
+    """
+    Input:
+    - start: the first day of the grid (defaults to today).
+    - end: the day after the last day of the grid (defaults to 30 days after start).
+
+    Output:
+    - days: the number of days (columns) of the grid.
+    - rooms: for each room, its id, name and `spans`, a list of `[day, nights, booking_id, status]` runs
+      where `day` is the column the booking starts at within the grid.
+
+    Further details:
+    - Every booking overlapping the range is loaded with a single query, the grid is built with numpy.
+    - A booking occupies the nights from its check-in day up to its check-out day.
+    """
+    start = start or datetime.now(UTC).date()
+    end = end or start + timedelta(days=30)
+    days = (end - start).days
+    if days <= 0:
+        raise BadRequestException("The start date should be before the end date")
+    if days > CALENDAR_MAX_DAYS:
+        raise BadRequestException(f"The calendar covers at most {CALENDAR_MAX_DAYS} days")
+
+    rooms_data = await crud_rooms.get_multi(
+        db=db, limit=None, schema_to_select=RoomRead, sort_columns="id", return_total_count=False, is_deleted=False
+    )
+    rooms = rooms_data["data"]
+    bookings = await get_bookings_in_range(
+        db,
+        datetime.combine(start, datetime.min.time(), tzinfo=UTC),
+        datetime.combine(end, datetime.min.time(), tzinfo=UTC),
+        SOLD_BOOKING_STATUSES,
+    )
+
+    row_of = {room["id"]: row for row, room in enumerate(rooms)}
+    bookings = [booking for booking in bookings if booking[1] in row_of]
+    statuses = {booking_id: status for booking_id, _, _, _, status in bookings}
+
+    origin = night_offset(start)
+    intervals = np.array(
+        [nights(check_in, check_out) for _, _, check_in, check_out, _ in bookings], dtype=np.int64
+    ).reshape(-1, 2) - origin
+    grid = booking_grid(
+        np.array([row_of[room_id] for _, room_id, _, _, _ in bookings], dtype=np.int64),
+        intervals[:, 0],
+        intervals[:, 1],
+        np.array([booking_id for booking_id, _, _, _, _ in bookings], dtype=np.int64),
+        (len(rooms), days),
+    )
+
+    response: dict[str, Any] = {
+        "start": start,
+        "end": end,
+        "days": days,
+        "rooms": [
+            {
+                "id": room["id"],
+                "name": room["name"],
+                "spans": [[day, length, booking_id, statuses[booking_id]] for day, length, booking_id in spans],
+            }
+            for room, spans in zip(rooms, run_length_spans(grid))
+        ],
+    }
+    return ORJSONResponse(response)
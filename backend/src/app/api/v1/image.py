@@ -1,34 +1,73 @@
-from fastapi import APIRouter, UploadFile, File
-import httpx
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, File, UploadFile
+from fastapi.responses import FileResponse
 from pydantic import BaseModel
+
 from ...core.config import settings
+from ...core.exceptions.http_exceptions import BadRequestException, NotFoundException
+from ...core.logger import logging
+from ...core.utils import queue
+from ...core.utils.image_storage import ImageStorage, LocalImageStorage, get_image_storage
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(tags=["images"])
 
+
 class ImageUploadResponse(BaseModel):
     url: str
-    
+    variants: dict[str, str] = {}
+
+
 @router.post("/images/upload", status_code=200, response_model=ImageUploadResponse)
-async def write_user(
-    image: UploadFile = File(...)
-):
+async def upload_image(
+    storage: Annotated[ImageStorage, Depends(get_image_storage)],
+    image: UploadFile = File(...),
+) -> dict:
     """
     Input:
     - image: an image file.
-    
-    
-    
+
+
+
     Output:
     - url: the URL of the uploaded image.
+    - variants: width -> URL of the responsive variants (local storage only), available once the worker made them.
+
+    Further details:
+    - The file is streamed to the configured storage backend (`IMAGE_STORAGE_BACKEND`), never fully buffered.
+    - With the local backend, identical bytes are stored once and resizing is handed off to the arq worker.
     """
     # check if it is a valid image
-    if not image.content_type.startswith("image/"):
-        return {"error": "Invalid image type"}
-    # send the image to imgbb
-    # https://api.imgbb.com/1/upload?key=IMGBB_API_KEY
-    # httpx
-    response = httpx.post("https://api.imgbb.com/1/upload?key=" + settings.IMGBB_API_KEY, files={"image": (image.filename, image.file, image.content_type)})
-    if response.status_code != 200:
-        return {"error": "Failed to upload image"}
-    image_url = response.json()["data"]["url"]
-    return {"url": image_url}
+    if not image.content_type or not image.content_type.startswith("image/"):
+        raise BadRequestException("Invalid image type")
+
+    stored = await storage.save(image)
+
+    if stored.digest is not None and stored.variants:
+        if queue.pool is None:
+            logger.warning(f"Queue pool is not initialized, skipping variants for image {stored.digest}")
+        else:
+            await queue.pool.enqueue_job(
+                "generate_image_variants", stored.digest, _job_id=f"image_variants:{stored.digest}"
+            )
+
+    return {"url": stored.url, "variants": stored.variants}
+
+
+@router.get("/images/{digest}/{name}", include_in_schema=False)
+async def read_stored_image(
+    digest: str, name: str, storage: Annotated[ImageStorage, Depends(get_image_storage)]
+) -> FileResponse:
+    if not isinstance(storage, LocalImageStorage):
+        raise NotFoundException("Image not found")
+
+    path = storage.path(digest, name)
+    if path is None or not path.is_file():
+        raise NotFoundException("Image not found")
+
+    # stored files are content-addressed, so a URL always maps to the same bytes
+    return FileResponse(
+        path, headers={"Cache-Control": f"public, max-age={settings.IMAGE_CACHE_MAX_AGE}, immutable"}
+    )
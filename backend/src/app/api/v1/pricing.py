@@ -0,0 +1,119 @@
+from datetime import UTC, datetime
+from typing import Annotated, Any
+
+from fastapi import APIRouter, Depends, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ...core.db.database import async_get_db
+from ...core.exceptions.http_exceptions import BadRequestException, DuplicateValueException, NotFoundException
+from ...core.utils import pricing
+from ...core.utils.occupancy import nights
+from ...crud.crud_rate_plan import crud_rate_plans
+from ...crud.crud_rooms import crud_rooms
+from ...schemas.rate_plan import (
+    QuoteRead,
+    QuoteRequest,
+    RatePlanCreate,
+    RatePlanRead,
+    RatePlanUpdate,
+    RatePlanUpdateInternal,
+)
+from ..dependencies import get_current_superuser
+
+router = APIRouter(tags=["pricing"])
+
+QUOTE_MAX_ROOMS = 500
+QUOTE_MAX_NIGHTS = 366
+
+
+@router.post("/quote", response_model=QuoteRead)
+async def write_quote(
+    request: Request, values: QuoteRequest, db: Annotated[AsyncSession, Depends(async_get_db)]
+) -> dict[str, Any]:
+    """
+    Further details:
+    - Prices the stay in every room of `room_ids` at once, with each room's rate plan or the default one.
+    - `nightly` holds one price per night, `total` is their sum after the length-of-stay `discount`.
+    - `POST /booking` charges the same total.
+    """
+    if values.check_in >= values.check_out:
+        raise BadRequestException("Check-in date should be before the check-out date")
+    if len(set(values.room_ids)) > QUOTE_MAX_ROOMS:
+        raise BadRequestException(f"A quote covers at most {QUOTE_MAX_ROOMS} rooms")
+    start, end = nights(values.check_in, values.check_out)
+    if end - start > QUOTE_MAX_NIGHTS:
+        raise BadRequestException(f"A quote covers at most {QUOTE_MAX_NIGHTS} nights")
+
+    quotes = await pricing.quote(db, values.room_ids, values.check_in, values.check_out)
+    missing = [room_id for room_id in dict.fromkeys(values.room_ids) if room_id not in quotes]
+    if missing:
+        raise NotFoundException(f"Rooms not found: {missing}")
+    return {
+        "check_in": values.check_in,
+        "check_out": values.check_out,
+        "nights": end - start,
+        "quotes": [quotes[room_id] for room_id in dict.fromkeys(values.room_ids)],
+    }
+
+
+@router.post("/rate_plan", response_model=RatePlanRead, status_code=201, dependencies=[Depends(get_current_superuser)])
+async def write_rate_plan(
+    request: Request, rate_plan: RatePlanCreate, db: Annotated[AsyncSession, Depends(async_get_db)]
+) -> RatePlanRead:
+    """
+    Further details:
+    - A plan with a `room_id` prices that room, the plan without one prices every other room.
+    """
+    if rate_plan.room_id is not None and not await crud_rooms.exists(
+        db=db, id=rate_plan.room_id, is_deleted=False
+    ):
+        raise NotFoundException("Room not found")
+    if await crud_rate_plans.exists(db=db, room_id=rate_plan.room_id):
+        raise DuplicateValueException("This room already has a rate plan")
+
+    created_rate_plan: RatePlanRead = await crud_rate_plans.create(db=db, object=rate_plan)
+    pricing.invalidate()
+    return created_rate_plan
+
+
+@router.get("/rate_plans", response_model=dict)
+async def read_rate_plans(request: Request, db: Annotated[AsyncSession, Depends(async_get_db)]) -> dict[str, Any]:
+    rate_plans: dict[str, Any] = await crud_rate_plans.get_multi(db=db, schema_to_select=RatePlanRead, limit=None)
+    return rate_plans
+
+
+@router.get("/rate_plan/{id}", response_model=RatePlanRead)
+async def read_rate_plan(request: Request, id: int, db: Annotated[AsyncSession, Depends(async_get_db)]) -> dict:
+    db_rate_plan = await crud_rate_plans.get(db=db, schema_to_select=RatePlanRead, id=id)
+    if db_rate_plan is None:
+        raise NotFoundException("Rate plan not found")
+
+    return db_rate_plan
+
+
+@router.patch("/rate_plan/{id}", response_model=dict, dependencies=[Depends(get_current_superuser)])
+async def patch_rate_plan(
+    request: Request, values: RatePlanUpdate, id: int, db: Annotated[AsyncSession, Depends(async_get_db)]
+) -> dict[str, str]:
+    if not await crud_rate_plans.exists(db=db, id=id):
+        raise NotFoundException("Rate plan not found")
+
+    await crud_rate_plans.update(
+        db=db,
+        object=RatePlanUpdateInternal(**values.model_dump(exclude_unset=True), updated_at=datetime.now(UTC)),
+        id=id,
+    )
+    pricing.invalidate()
+    return {"message": "Rate plan updated"}
+
+
+@router.delete("/rate_plan/{id}", response_model=dict, dependencies=[Depends(get_current_superuser)])
+async def erase_rate_plan(
+    request: Request, id: int, db: Annotated[AsyncSession, Depends(async_get_db)]
+) -> dict[str, str]:
+    if not await crud_rate_plans.exists(db=db, id=id):
+        raise NotFoundException("Rate plan not found")
+
+    await crud_rate_plans.db_delete(db=db, id=id)
+    pricing.invalidate()
+    return {"message": "Rate plan deleted"}
@@ -1,17 +1,78 @@
-from typing import Annotated, Any
+from datetime import UTC, datetime
+from typing import Annotated, Any, Literal
 
-from fastapi import APIRouter, Depends, Request, Query
+from fastapi import APIRouter, Depends, Query, Request
 from fastcrud.paginated import PaginatedListResponse, compute_offset, paginated_response
+from pydantic import BaseModel
+from redis.exceptions import RedisError
+from sqlalchemy import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..dependencies import get_current_superuser
+from ...core.config import settings
 from ...core.db.database import async_get_db
-from ...core.exceptions.http_exceptions import DuplicateValueException, NotFoundException
-from ...crud.crud_rooms import crud_rooms, crud_room_features, crud_room_badges
-from ...schemas.room import RoomCreate, RoomDelete, RoomRead, RoomReadExternal, RoomUpdate, RoomUpdateInternal, RoomFeatureBase, RoomBadgeBase, RoomFeatureDetail, RoomBadgeDetail
+from ...core.exceptions.cache_exceptions import MissingClientError
+from ...core.exceptions.http_exceptions import (
+    BadRequestException,
+    CustomException,
+    DuplicateValueException,
+    ForbiddenException,
+    NotFoundException,
+)
+from ...core.logger import logging
+from ...core.responses import ORJSONResponse
+from ...core.utils import holds, occupancy, room_facets, room_index, room_names
+from ...core.utils.batch import in_request_order
+from ...core.utils.bulk_import import ImportReport, iter_batches, iter_records
+from ...core.utils.cache import _delete_keys_by_pattern, cache
+from ...core.utils.fieldsets import narrow_schema, parse_fields
+from ...crud.crud_rooms import (
+    crud_room_badges,
+    crud_room_features,
+    crud_rooms,
+    get_existing_names,
+    get_filtered_rooms,
+    get_room_facets,
+    room_filters,
+    search_rooms,
+)
+from ...models.room import Room
+from ...schemas.room import (
+    RoomBadgeBase,
+    RoomBadgeDetail,
+    RoomCreate,
+    RoomFeatureBase,
+    RoomFeatureDetail,
+    RoomHoldCreate,
+    RoomHoldRead,
+    RoomRead,
+    RoomReadExternal,
+    RoomUpdate,
+)
+from ..dependencies import batch_ids, get_current_superuser, get_current_user
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(tags=["rooms"])
 
+ROOM_SEARCH_MAX_LENGTH = 200
+ROOM_SUGGEST_MAX_LIMIT = 20
+ROOM_FACETS_PRICE_BUCKET = 50
+ROOMS_CACHE_PREFIX = "rooms"
+
+# `RoomReadExternal` fields looked up from the ids of a `RoomRead` field
+ROOM_HYDRATED_FIELDS = {"feature_ids": "features", "badge_ids": "badges"}
+
+async def _invalidate_room_caches() -> None:
+    """Drop the cached `GET /rooms` pages and facet counts after a room write.
+
+    A failure leaves them until their expiration (`ROOMS_CACHE_TTL`, `ROOM_FACETS_CACHE_TTL`).
+    """
+    try:
+        await _delete_keys_by_pattern(f"{ROOMS_CACHE_PREFIX}:*")
+        await room_facets.invalidate()
+    except (RedisError, MissingClientError) as e:
+        logger.warning(f"Could not drop the cached room pages and facets: {e!r}")
+
 @router.post("/room", response_model=RoomRead, status_code=201)
 async def write_room(
     request: Request, room: RoomCreate, db: Annotated[AsyncSession, Depends(async_get_db)]
@@ -21,53 +82,176 @@ async def write_room(
         raise DuplicateValueException("Room name is already registered")
 
     created_room: RoomRead = await crud_rooms.create(db=db, object=room)
+    room_names.room_written(created_room.id, created_room.name)
+    room_index.room_written(created_room.id, created_room.price, created_room.feature_ids, created_room.badge_ids)
+    await _invalidate_room_caches()
     return created_room
 
+async def _import_room_batch(db: AsyncSession, batch: list[tuple[int, RoomCreate]], report: ImportReport) -> None:
+    taken = await get_existing_names(db, {room.name for _, room in batch})
+    rooms = []
+    for row, room in batch:
+        if room.name in taken:
+            report.fail(row, "Room name is already registered")
+            continue
+        taken.add(room.name)
+        rooms.append(room)
+
+    if rooms:
+        now = datetime.now(UTC)
+        await db.execute(insert(Room), [{**room.model_dump(), "created_at": now} for room in rooms])
+        await db.commit()
+        report.inserted += len(rooms)
+
+@router.post("/rooms/import", dependencies=[Depends(get_current_superuser)], response_model=dict)
+async def import_rooms(
+    request: Request, db: Annotated[AsyncSession, Depends(async_get_db)], format: Literal["csv", "ndjson"] = "csv"
+) -> dict[str, Any]:
+    """
+    Input:
+    - format: csv (with a header row, `feature_ids`/`badge_ids` as `1;2;3`) or ndjson. The request body is the
+      file itself, it is read as a stream.
+
+    Output:
+    - inserted, failed: the number of imported and rejected rows.
+    - errors: `{"row": line number, "errors": [...]}` for each rejected row.
+
+    Further details:
+    - Rows are validated with `RoomCreate` and imported in batches, each batch in its own transaction.
+    - Rows whose name is already registered, or repeated earlier in the file, are rejected.
+    """
+    report = ImportReport()
+    records = iter_records(request.stream(), format, RoomCreate)
+    async for batch in iter_batches(records, RoomCreate, report):
+        await _import_room_batch(db, batch, report)
+    if report.inserted:
+        room_names.invalidate()
+        room_index.invalidate()
+        await _invalidate_room_caches()
+    return report.as_dict()
+
+class RoomFieldset:
+    """What a room read selects and hydrates for a `fields=` query parameter (every field without one).
+
+    `needed` are `RoomRead` columns the endpoint itself uses, selected whether requested or not, and `always` the
+    fields returned whether requested or not.
+    """
+
+    def __init__(self, fields: str | None, *needed: str, always: tuple[str, ...] = ()) -> None:
+        try:
+            names = parse_fields(fields, RoomReadExternal)
+        except ValueError as e:
+            raise BadRequestException(str(e))
+
+        requested = set(RoomReadExternal.model_fields) if names is None else {*names, *always}
+        self.features = "features" in requested
+        self.badges = "badges" in requested
+        # hydration needs the ids even when they are not asked for themselves
+        columns = requested & set(RoomRead.model_fields)
+        columns |= {ids for ids, hydrated in ROOM_HYDRATED_FIELDS.items() if hydrated in requested}
+        columns |= set(needed)
+        self.schema_to_select = narrow_schema(RoomRead, [name for name in RoomRead.model_fields if name in columns])
+        self.hidden = columns - requested
+        # `RoomReadExternal` restricted to the returned fields, the endpoint's `response_model` for this fieldset
+        self.response_model = narrow_schema(
+            RoomReadExternal, [name for name in RoomReadExternal.model_fields if name in requested]
+        )
+
+    async def apply(self, db: AsyncSession, rooms: list[dict]) -> list[dict]:
+        """Hydrate the requested features and badges of `rooms`, in one query each, and drop unrequested ids."""
+        if self.features:
+            await _hydrate(db, rooms, crud_room_features, RoomFeatureDetail, "feature_ids")
+        if self.badges:
+            await _hydrate(db, rooms, crud_room_badges, RoomBadgeDetail, "badge_ids")
+        for room in rooms:
+            for name in self.hidden:
+                del room[name]
+        return rooms
+
+
+async def _hydrate(db: AsyncSession, rooms: list[dict], crud: Any, schema: type[BaseModel], ids_field: str) -> None:
+    ids = sorted({id for room in rooms for id in room[ids_field]})
+    details = await crud.get_multi(db=db, schema_to_select=schema, limit=None, id__in=ids) if ids else {"data": []}
+    by_id = {detail["id"]: detail for detail in details["data"]}
+    for room in rooms:
+        room[ROOM_HYDRATED_FIELDS[ids_field]] = [by_id[id] for id in sorted(set(room[ids_field])) if id in by_id]
+
+
 @router.get("/rooms", response_model=PaginatedListResponse[RoomReadExternal])
+@cache(
+    key_prefix=ROOMS_CACHE_PREFIX + ":page_{page}:items_per_page:{items_per_page}:fields",
+    resource_id_name="fields",
+    expiration=settings.ROOMS_CACHE_TTL,
+)
 async def read_rooms(
-    request: Request, db: Annotated[AsyncSession, Depends(async_get_db)], page: int = 1, items_per_page: int = 10
-) -> dict:
+    request: Request,
+    db: Annotated[AsyncSession, Depends(async_get_db)],
+    page: int = 1,
+    items_per_page: int = 10,
+    fields: str | None = None,
+) -> PaginatedListResponse:
+    """
+    Further details:
+    - `fields`: comma separated fields to return (e.g. `id,name,price,image_2d`), all of them by default. Only
+      those columns are read, and features and badges are only looked up when asked for.
+    - Pages are cached (precompressed) for `ROOMS_CACHE_TTL` seconds, room writes drop them. Without Redis they
+      are read from Postgres on every request.
+    """
+    fieldset = RoomFieldset(fields)
     rooms_data = await crud_rooms.get_multi(
         db=db,
         offset=compute_offset(page, items_per_page),
         limit=items_per_page,
-        schema_to_select=RoomRead,
+        schema_to_select=fieldset.schema_to_select,
         is_deleted=False,
     )
 
     response: dict[str, Any] = paginated_response(crud_data=rooms_data, page=page, items_per_page=items_per_page)
-    for room in response["data"]:
-        room_features = await crud_room_features.get_multi(
-            db=db, schema_to_select=RoomFeatureDetail, id__in=room["feature_ids"]
-        )
-        room_badges = await crud_room_badges.get_multi(
-            db=db, schema_to_select=RoomBadgeDetail, id__in=room["badge_ids"]
-        )
-        room["features"] = room_features["data"]
-        room["badges"] = room_badges["data"]
-    
-    return response
+    await fieldset.apply(db, response["data"])
+    # validated here, the cache decorator serves (and stores) serialized JSON that skips `response_model`
+    return PaginatedListResponse[fieldset.response_model].model_validate(response)
 
-@router.get("/room/{id}", response_model=RoomReadExternal)
-async def read_room(request: Request, id: int, db: Annotated[AsyncSession, Depends(async_get_db)]) -> dict:
-    db_room: RoomRead | None = await crud_rooms.get(
-        db=db, schema_to_select=RoomRead, id=id, is_deleted=False
+@router.get("/rooms/batch", response_model=dict)
+async def read_rooms_batch(
+    request: Request,
+    db: Annotated[AsyncSession, Depends(async_get_db)],
+    ids: Annotated[list[int], Depends(batch_ids)],
+    fields: str | None = None,
+) -> ORJSONResponse:
+    """
+    Output:
+    - data: the rooms, in the order of `ids`.
+    - missing_ids: the ids of rooms that do not exist or were deleted.
+
+    Further details:
+    - `ids`: repeat the parameter (`?ids=3&ids=1`), at most `BATCH_MAX_IDS` distinct ids.
+    - One query reads every room, and one query per kind their features and badges.
+    - `fields` as in `GET /rooms`, `id` is always returned.
+    """
+    fieldset = RoomFieldset(fields, always=("id",))
+    rooms_data = await crud_rooms.get_multi(
+        db=db, limit=None, schema_to_select=fieldset.schema_to_select, is_deleted=False, id__in=ids
     )
+
+    response = in_request_order(rooms_data["data"], ids)
+    await fieldset.apply(db, response["data"])
+    return ORJSONResponse(response)
+
+@router.get("/room/{id}", response_model=RoomReadExternal)
+async def read_room(
+    request: Request, id: int, db: Annotated[AsyncSession, Depends(async_get_db)], fields: str | None = None
+) -> ORJSONResponse:
+    """
+    Further details:
+    - `fields`: comma separated fields to return, all of them by default.
+    """
+    fieldset = RoomFieldset(fields)
+    db_room = await crud_rooms.get(db=db, schema_to_select=fieldset.schema_to_select, id=id, is_deleted=False)
     if db_room is None:
         raise NotFoundException("Room not found")
 
-    # get room features and badges in the room.feature_ids and room.badge_ids
-    room = dict(db_room)
-    room_features = await crud_room_features.get_multi(
-        db=db, schema_to_select=RoomFeatureDetail, id__in=db_room["feature_ids"]
-    )
-    room_badges = await crud_room_badges.get_multi(
-        db=db, schema_to_select=RoomBadgeDetail, id__in=db_room["badge_ids"]
-    )
-    room["features"] = room_features["data"]
-    room["badges"] = room_badges["data"]
-    
-    return room
+    room = (await fieldset.apply(db, [dict(db_room)]))[0]
+    return ORJSONResponse(room)
 
 @router.patch("/room/{id}")
 async def patch_room(
@@ -76,11 +260,14 @@ async def patch_room(
     id: int,
     db: Annotated[AsyncSession, Depends(async_get_db)],
 ) -> dict[str, str]:
-    db_room = await crud_rooms.get(db=db, schema_to_select=RoomRead, id=id)
+    db_room = await crud_rooms.get(db=db, schema_to_select=RoomRead, id=id, is_deleted=False)
     if db_room is None:
         raise NotFoundException("Room not found")
 
     await crud_rooms.update(db=db, object=values, id=id)
+    room_names.room_written(id, values.name)
+    room_index.room_written(id, values.price, values.feature_ids, values.badge_ids)
+    await _invalidate_room_caches()
     return {"message": "Room updated"}
 
 @router.delete("/room/{id}")
@@ -89,13 +276,141 @@ async def erase_room(
     id: int,
     db: Annotated[AsyncSession, Depends(async_get_db)],
 ) -> dict[str, str]:
-    db_room = await crud_rooms.get(db=db, schema_to_select=RoomRead, id=id)
+    """
+    Further details:
+    - Soft delete: the room is flagged `is_deleted` and can be brought back with `POST /room/{id}/restore`.
+    """
+    db_room = await crud_rooms.get(db=db, schema_to_select=RoomRead, id=id, is_deleted=False)
     if not db_room:
         raise NotFoundException("Room not found")
 
     await crud_rooms.delete(db=db, id=id)
+    room_names.room_deleted(id)
+    room_index.room_deleted(id)
+    await _invalidate_room_caches()
     return {"message": "Room deleted"}
 
+@router.post("/room/{id}/restore", dependencies=[Depends(get_current_superuser)])
+async def restore_room(
+    request: Request,
+    id: int,
+    db: Annotated[AsyncSession, Depends(async_get_db)],
+) -> dict[str, str]:
+    if not await crud_rooms.exists(db=db, id=id, is_deleted=True):
+        raise NotFoundException("Deleted room not found")
+
+    await crud_rooms.update(db=db, object={"is_deleted": False, "deleted_at": None}, id=id)
+    room_names.invalidate()
+    room_index.room_restored(id)
+    await _invalidate_room_caches()
+    return {"message": "Room restored"}
+
+@router.get("/room/{id}/availability", response_model=dict)
+async def read_room_availability(
+    request: Request,
+    id: int,
+    check_in: datetime,
+    check_out: datetime,
+    db: Annotated[AsyncSession, Depends(async_get_db)],
+) -> dict[str, Any]:
+    """
+    Further details:
+    - Answered from the room's occupancy bitmap in Redis when it covers the stay, from Postgres otherwise.
+    - A stay occupies the nights from its check-in day up to its check-out day.
+    """
+    if check_in >= check_out:
+        raise BadRequestException("Check-in date should be before the check-out date")
+    if not await crud_rooms.exists(db=db, id=id, is_deleted=False):
+        raise NotFoundException("Room not found")
+
+    available, _ = await occupancy.check(db, [id], check_in, check_out)
+    return {"room_id": id, "check_in": check_in, "check_out": check_out, "available": available[id]}
+
+@router.get("/rooms/availability", response_model=dict)
+async def read_rooms_availability(
+    request: Request,
+    check_in: datetime,
+    check_out: datetime,
+    db: Annotated[AsyncSession, Depends(async_get_db)],
+    room_ids: list[int] = Query(...),
+) -> dict[str, Any]:
+    """
+    Further details:
+    - Checks many rooms for the same stay with one Redis round trip and a vectorized bit test.
+    - Rooms whose bitmap does not cover the stay are checked with a single Postgres query.
+    """
+    if check_in >= check_out:
+        raise BadRequestException("Check-in date should be before the check-out date")
+
+    available, _ = await occupancy.check(db, room_ids, check_in, check_out)
+    return {
+        "check_in": check_in,
+        "check_out": check_out,
+        "available_room_ids": [room_id for room_id, free in available.items() if free],
+        "unavailable_room_ids": [room_id for room_id, free in available.items() if not free],
+    }
+
+@router.post("/room/{id}/hold", response_model=RoomHoldRead, status_code=201)
+async def hold_room(
+    request: Request,
+    id: int,
+    values: RoomHoldCreate,
+    current_user: Annotated[dict, Depends(get_current_user)],
+    db: Annotated[AsyncSession, Depends(async_get_db)],
+) -> dict[str, Any]:
+    """
+    Output:
+    - hold_id: pass it as `hold_id` to `POST /booking` to book the held nights.
+    - expires_at: when the hold lapses on its own, after `ROOM_HOLD_TTL` seconds.
+
+    Further details:
+    - Only the room's availability and the other holds are checked, atomically in Redis; nothing is written to
+      Postgres until the booking is made.
+    - Placing an overlapping hold of your own is allowed (e.g. after changing the dates).
+    """
+    if values.check_in >= values.check_out:
+        raise BadRequestException("Check-in date should be before the check-out date")
+    first_night, end = occupancy.nights(values.check_in, values.check_out)
+    if end - first_night > settings.ROOM_HOLD_MAX_NIGHTS:
+        raise BadRequestException(f"A hold covers at most {settings.ROOM_HOLD_MAX_NIGHTS} nights")
+    if not await crud_rooms.exists(db=db, id=id, is_deleted=False):
+        raise NotFoundException("Room not found")
+
+    available, _ = await occupancy.check(db, [id], values.check_in, values.check_out)
+    if not available[id]:
+        raise DuplicateValueException("Room is already booked in the given date range")
+
+    try:
+        hold = await holds.place(id, values.check_in, values.check_out, owner=str(current_user["id"]))
+    except MissingClientError:
+        raise CustomException(status_code=503, detail="Holds are not available right now")
+    if isinstance(hold, str):
+        raise DuplicateValueException("Room is held by another guest for the given date range")
+
+    return {
+        "hold_id": hold.id,
+        "room_id": id,
+        "check_in": values.check_in,
+        "check_out": values.check_out,
+        "expires_at": hold.expires_at,
+    }
+
+@router.delete("/room/{id}/hold/{hold_id}")
+async def release_room_hold(
+    request: Request, id: int, hold_id: str, current_user: Annotated[dict, Depends(get_current_user)]
+) -> dict[str, str]:
+    try:
+        hold = await holds.get(hold_id)
+    except MissingClientError:
+        raise CustomException(status_code=503, detail="Holds are not available right now")
+    if hold is None or hold.room_id != id:
+        raise NotFoundException("Hold not found")
+    if hold.owner != str(current_user["id"]):
+        raise ForbiddenException("You can only release your own holds")
+
+    await holds.release(hold)
+    return {"message": "Hold released"}
+
 # add a new room feature:
 @router.post("/room_feature", response_model=RoomFeatureDetail, status_code=201, tags=["room_features_and_badges"])
 async def write_room_feature(
@@ -125,6 +440,7 @@ async def patch_room_feature(
         raise NotFoundException("Feature not found")
 
     await crud_room_features.update(db=db, object=values, id=id)
+    await _invalidate_room_caches()
     return {"message": "Feature updated"}
 
 # list of room features
@@ -164,6 +480,7 @@ async def patch_room_badge(
         raise NotFoundException("Badge not found")
 
     await crud_room_badges.update(db=db, object=values, id=id)
+    await _invalidate_room_caches()
     return {"message": "Badge updated"}
 
 # list of room badges
@@ -187,33 +504,127 @@ async def filter_rooms(
     # badge_ids: list[int] = [],
     feature_ids: list[int] = Query([]),
     badge_ids: list[int] = Query([]),
-) -> dict:
-    rooms_data = await crud_rooms.get_multi(
-        db=db,
-        limit=None,
-        schema_to_select=RoomRead,
-        is_deleted=False,
-        price__gte=min_price,
-        price__lte=max_price,
+    fields: str | None = None,
+) -> ORJSONResponse:
+    """
+    Further details:
+    - Rooms priced within `[min_price, max_price]` having every one of `feature_ids` and `badge_ids`, by id.
+    - Filtered and paginated in one Postgres query, or with `ROOM_INDEX_ENABLED` from the in-memory room index of
+      the worker, only the rooms of the page being read from Postgres (by primary key).
+    - `fields`: comma separated fields to return, all of them by default.
+    """
+    fieldset = RoomFieldset(fields, "id")
+    offset = compute_offset(page, items_per_page)
+    if settings.ROOM_INDEX_ENABLED:
+        index = await room_index.get_index(db)
+        ids = index.filter(min_price, max_price, feature_ids, badge_ids)
+        page_ids = ids[offset : offset + items_per_page].tolist()
+        rooms_data = {"data": [], "total_count": len(ids)}
+        if page_ids:
+            rooms = await crud_rooms.get_multi(
+                db=db, limit=None, schema_to_select=fieldset.schema_to_select, is_deleted=False, id__in=page_ids
+            )
+            rooms_data["data"] = in_request_order(rooms["data"], page_ids)["data"]
+    else:
+        rooms_data = await get_filtered_rooms(
+            db,
+            room_filters(min_price, max_price, feature_ids, badge_ids),
+            offset,
+            items_per_page,
+            fieldset.schema_to_select,
+        )
+
+    response: dict[str, Any] = paginated_response(crud_data=rooms_data, page=page, items_per_page=items_per_page)
+    await fieldset.apply(db, response["data"])
+    return ORJSONResponse(response)
+
+@router.get("/rooms/search", response_model=PaginatedListResponse[RoomReadExternal])
+async def search_rooms_endpoint(
+    request: Request,
+    db: Annotated[AsyncSession, Depends(async_get_db)],
+    q: str = Query(..., min_length=2, max_length=ROOM_SEARCH_MAX_LENGTH),
+    page: int = 1,
+    items_per_page: int = 10,
+    min_price: float | None = None,
+    max_price: float | None = None,
+    feature_ids: list[int] = Query([]),
+    badge_ids: list[int] = Query([]),
+    fields: str | None = None,
+) -> ORJSONResponse:
+    """
+    Further details:
+    - `q` is matched against room names and descriptions as a web search query (`"sea view" -balcony`, `or`),
+      and against name words with typo tolerance (`oecan` finds `Ocean`).
+    - Best matches first: full-text rank (name above description) plus name similarity.
+    - Combines with the filters of `GET /rooms/filter` in the same query; `fields` as in `GET /rooms`.
+    """
+    fieldset = RoomFieldset(fields)
+    rooms_data = await search_rooms(
+        db,
+        q,
+        room_filters(min_price, max_price, feature_ids, badge_ids),
+        compute_offset(page, items_per_page),
+        items_per_page,
+        fieldset.schema_to_select,
     )
 
-    if feature_ids != []:
-        rooms_data["data"] = [room for room in rooms_data["data"] if set(feature_ids).issubset(room["feature_ids"])]
-    if badge_ids != []:
-        rooms_data["data"] = [room for room in rooms_data["data"] if set(badge_ids).issubset(room["badge_ids"])]
-    rooms_data["total_count"] = len(rooms_data["data"])
-    if rooms_data["total_count"] > items_per_page:
-        rooms_data["data"] = rooms_data["data"][compute_offset(page, items_per_page):compute_offset(page, items_per_page) + items_per_page]
     response: dict[str, Any] = paginated_response(crud_data=rooms_data, page=page, items_per_page=items_per_page)
-    
-    for room in response["data"]:
-        room_features = await crud_room_features.get_multi(
-            db=db, schema_to_select=RoomFeatureDetail, id__in=room["feature_ids"]
-        )
-        room_badges = await crud_room_badges.get_multi(
-            db=db, schema_to_select=RoomBadgeDetail, id__in=room["badge_ids"]
-        )
-        room["features"] = room_features["data"]
-        room["badges"] = room_badges["data"]
-        
-    return response
\ No newline at end of file
+    await fieldset.apply(db, response["data"])
+    return ORJSONResponse(response)
+
+@router.get("/rooms/facets", response_model=dict)
+async def read_room_facets(
+    request: Request,
+    db: Annotated[AsyncSession, Depends(async_get_db)],
+    min_price: float | None = None,
+    max_price: float | None = None,
+    feature_ids: list[int] = Query([]),
+    badge_ids: list[int] = Query([]),
+    price_bucket: float = Query(ROOM_FACETS_PRICE_BUCKET, ge=1),
+) -> ORJSONResponse:
+    """
+    Output:
+    - total: the number of rooms matching the filters.
+    - features, badges: `{"id", "count"}`, how many of these rooms have each feature and badge.
+    - prices: `{"min", "max", "count"}`, how many of these rooms cost `[min, max)`, in buckets of `price_bucket`.
+
+    Further details:
+    - Filters as in `GET /rooms/filter`. Every count comes from the same query on the matching rooms.
+    - Counts are cached in Redis per filter state, and dropped on room writes.
+    """
+    key = room_facets.filter_key(min_price, max_price, feature_ids, badge_ids, price_bucket)
+    try:
+        facets, generation = await room_facets.get(key)
+    except (RedisError, MissingClientError) as e:
+        logger.warning(f"Could not read the cached room facets: {e!r}")
+        facets, generation = None, None
+    if facets is not None:
+        return ORJSONResponse(facets)
+
+    facets = await get_room_facets(db, room_filters(min_price, max_price, feature_ids, badge_ids), price_bucket)
+    if generation is not None:
+        try:
+            # a room written since `get` started a new generation, these counts are never served
+            await room_facets.store(key, facets, generation)
+        except (RedisError, MissingClientError) as e:
+            logger.warning(f"Could not cache the room facets: {e!r}")
+    return ORJSONResponse(facets)
+
+@router.get("/rooms/suggest", response_model=dict)
+async def suggest_rooms(
+    request: Request,
+    db: Annotated[AsyncSession, Depends(async_get_db)],
+    prefix: str = Query(..., min_length=1, max_length=ROOM_SEARCH_MAX_LENGTH),
+    limit: int = Query(10, ge=1, le=ROOM_SUGGEST_MAX_LIMIT),
+) -> ORJSONResponse:
+    """
+    Output:
+    - data: `{"id", "name"}` of the rooms whose name starts with `prefix` (case-insensitive), by name.
+
+    Further details:
+    - Meant for search-as-you-type: answered from an in-memory index of the room names in each worker, without
+      querying Postgres. The index is reloaded every `ROOM_SUGGEST_TTL` seconds, and updated right away by the
+      room writes handled in the same worker.
+    """
+    index = await room_names.get_index(db)
+    return ORJSONResponse({"data": index.suggest(prefix, limit)})
@@ -4,10 +4,12 @@ from fastapi import APIRouter, Depends, Request
 from fastcrud.paginated import PaginatedListResponse, compute_offset, paginated_response
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from ...api.dependencies import get_current_superuser, get_current_user
+from ...api.dependencies import batch_ids, get_current_superuser, get_current_user, select_fields
 from ...core.db.database import async_get_db
 from ...core.exceptions.http_exceptions import DuplicateValueException, ForbiddenException, NotFoundException
+from ...core.responses import ORJSONResponse
 from ...core.security import blacklist_token, get_password_hash, oauth2_scheme
+from ...core.utils.batch import in_request_order
 # from ...crud.crud_rate_limit import crud_rate_limits
 # from ...crud.crud_tier import crud_tiers
 from ...crud.crud_users import crud_users
@@ -41,18 +43,48 @@ async def write_user(
 
 @router.get("/users", response_model=PaginatedListResponse[UserRead])
 async def read_users(
-    request: Request, db: Annotated[AsyncSession, Depends(async_get_db)], page: int = 1, items_per_page: int = 10
-) -> dict:
+    request: Request,
+    db: Annotated[AsyncSession, Depends(async_get_db)],
+    page: int = 1,
+    items_per_page: int = 10,
+    fields: str | None = None,
+) -> ORJSONResponse:
+    """
+    Further details:
+    - `fields`: comma separated fields to return, all of them by default; only those columns are read.
+    """
     users_data = await crud_users.get_multi(
         db=db,
         offset=compute_offset(page, items_per_page),
         limit=items_per_page,
-        schema_to_select=UserRead,
+        schema_to_select=select_fields(fields, UserRead),
         is_deleted=False,
     )
 
     response: dict[str, Any] = paginated_response(crud_data=users_data, page=page, items_per_page=items_per_page)
-    return response
+    return ORJSONResponse(response)
+
+
+@router.get("/users/batch", response_model=dict)
+async def read_users_batch(
+    request: Request,
+    db: Annotated[AsyncSession, Depends(async_get_db)],
+    ids: Annotated[list[int], Depends(batch_ids)],
+    fields: str | None = None,
+) -> ORJSONResponse:
+    """
+    Output:
+    - data: the users, in the order of `ids`.
+    - missing_ids: the ids of users that do not exist or were deleted.
+
+    Further details:
+    - `ids`: repeat the parameter (`?ids=3&ids=1`), at most `BATCH_MAX_IDS` distinct ids, read with one query.
+    - `fields` as in `GET /users`, `id` is always returned.
+    """
+    users_data = await crud_users.get_multi(
+        db=db, limit=None, schema_to_select=select_fields(fields, UserRead, "id"), is_deleted=False, id__in=ids
+    )
+    return ORJSONResponse(in_request_order(users_data["data"], ids))
 
 
 @router.get("/user/me/", response_model=UserRead)
@@ -61,14 +93,20 @@ async def read_users_me(request: Request, current_user: Annotated[UserRead, Depe
 
 
 @router.get("/user/{username}", response_model=UserRead)
-async def read_user(request: Request, username: str, db: Annotated[AsyncSession, Depends(async_get_db)]) -> dict:
+async def read_user(
+    request: Request, username: str, db: Annotated[AsyncSession, Depends(async_get_db)], fields: str | None = None
+) -> ORJSONResponse:
+    """
+    Further details:
+    - `fields`: comma separated fields to return, all of them by default.
+    """
     db_user: UserRead | None = await crud_users.get(
-        db=db, schema_to_select=UserRead, username=username, is_deleted=False
+        db=db, schema_to_select=select_fields(fields, UserRead), username=username, is_deleted=False
     )
     if db_user is None:
         raise NotFoundException("User not found")
 
-    return db_user
+    return ORJSONResponse(db_user)
 
 
 @router.patch("/user/{username}")
@@ -81,6 +81,12 @@ class ClientSideCacheSettings(BaseSettings):
     CLIENT_CACHE_MAX_AGE: int = config("CLIENT_CACHE_MAX_AGE", default=60)
 
 
+class CompressionSettings(BaseSettings):
+    COMPRESSION_MINIMUM_SIZE: int = config("COMPRESSION_MINIMUM_SIZE", default=1024)
+    COMPRESSION_GZIP_LEVEL: int = config("COMPRESSION_GZIP_LEVEL", default=6)
+    COMPRESSION_BROTLI_QUALITY: int = config("COMPRESSION_BROTLI_QUALITY", default=4)
+
+
 class RedisQueueSettings(BaseSettings):
     REDIS_QUEUE_HOST: str = config("REDIS_QUEUE_HOST", default="localhost")
     REDIS_QUEUE_PORT: int = config("REDIS_QUEUE_PORT", default=6379)
@@ -96,9 +102,97 @@ class DefaultRateLimitSettings(BaseSettings):
     DEFAULT_RATE_LIMIT_LIMIT: int = config("DEFAULT_RATE_LIMIT_LIMIT", default=10)
     DEFAULT_RATE_LIMIT_PERIOD: int = config("DEFAULT_RATE_LIMIT_PERIOD", default=3600)
 
+class BookingLifecycleSettings(BaseSettings):
+    # without a check-in step a booking still "booked" after check-out simply becomes "checked_out";
+    # once the front desk records check-ins, bookings never checked in are marked "no_show" instead
+    BOOKING_TRACK_CHECK_IN: bool = config("BOOKING_TRACK_CHECK_IN", default=False)
+    BOOKING_NO_SHOW_GRACE_HOURS: int = config("BOOKING_NO_SHOW_GRACE_HOURS", default=24)
+    BOOKING_TRANSITION_BATCH_SIZE: int = config("BOOKING_TRANSITION_BATCH_SIZE", default=500)
+    BOOKING_TRANSITION_MAX_BATCHES: int = config("BOOKING_TRANSITION_MAX_BATCHES", default=100)
+
+
+class IdempotencySettings(BaseSettings):
+    IDEMPOTENCY_TTL: int = config("IDEMPOTENCY_TTL", default=86400)
+    IDEMPOTENCY_LOCK_TTL: int = config("IDEMPOTENCY_LOCK_TTL", default=60)
+    IDEMPOTENCY_WAIT_TIMEOUT: float = config("IDEMPOTENCY_WAIT_TIMEOUT", default=10.0)
+
+
+class BookingPartitionSettings(BaseSettings):
+    # the worker keeps a monthly `booking` partition ready this many months ahead, bookings can't check in later
+    BOOKING_PARTITION_MONTHS_AHEAD: int = config("BOOKING_PARTITION_MONTHS_AHEAD", default=24)
+    # partitions of months older than this are detached to the archive schema, 0 keeps every partition attached
+    BOOKING_PARTITION_RETENTION_MONTHS: int = config("BOOKING_PARTITION_RETENTION_MONTHS", default=0)
+    # longest stay a booking can cover, which bounds `check_in` in overlap checks so they only scan a few partitions
+    BOOKING_MAX_NIGHTS: int = config("BOOKING_MAX_NIGHTS", default=90)
+
+
+class BookingArchiveSettings(BaseSettings):
+    # checked-out bookings are moved to `booking_archive` this many days after check-out, 0 never moves them
+    BOOKING_ARCHIVE_AFTER_DAYS: int = config("BOOKING_ARCHIVE_AFTER_DAYS", default=730)
+    BOOKING_ARCHIVE_BATCH_SIZE: int = config("BOOKING_ARCHIVE_BATCH_SIZE", default=1000)
+    BOOKING_ARCHIVE_MAX_BATCHES: int = config("BOOKING_ARCHIVE_MAX_BATCHES", default=100)
+
+
+class OccupancySettings(BaseSettings):
+    # how far ahead the per-room occupancy bitmaps in Redis are kept, later stays are checked against Postgres
+    OCCUPANCY_HORIZON_DAYS: int = config("OCCUPANCY_HORIZON_DAYS", default=365)
+
+
+class RoomHoldSettings(BaseSettings):
+    # how long a checkout keeps a room's nights to itself, holds then expire in Redis on their own
+    ROOM_HOLD_TTL: int = config("ROOM_HOLD_TTL", default=600)
+    ROOM_HOLD_MAX_NIGHTS: int = config("ROOM_HOLD_MAX_NIGHTS", default=60)
+
+
+class PricingSettings(BaseSettings):
+    # per-worker caches (rate plans, room names, room index) are reloaded this many seconds after they are loaded,
+    # so writes made on another worker show up within this delay
+    RATE_PLAN_CACHE_TTL: int = config("RATE_PLAN_CACHE_TTL", default=60)
+
+
+class RoomSuggestSettings(BaseSettings):
+    ROOM_SUGGEST_TTL: int = config("ROOM_SUGGEST_TTL", default=60)
+    # memory cap of the index (about 250 bytes a name), past it the alphabetically last names are not suggested
+    ROOM_SUGGEST_MAX_NAMES: int = config("ROOM_SUGGEST_MAX_NAMES", default=100_000)
+
+
+class RoomListingCacheSettings(BaseSettings):
+    # `GET /rooms` pages are dropped on room writes, and this long after they were cached at most
+    ROOMS_CACHE_TTL: int = config("ROOMS_CACHE_TTL", default=300)
+
+
+class RoomFacetSettings(BaseSettings):
+    # the cached facet counts are dropped on room writes, and this long after they were first cached at most
+    ROOM_FACETS_CACHE_TTL: int = config("ROOM_FACETS_CACHE_TTL", default=300)
+
+
+class RoomIndexSettings(BaseSettings):
+    # answer `GET /rooms/filter` from an in-memory index of the rooms in each worker instead of Postgres
+    ROOM_INDEX_ENABLED: bool = config("ROOM_INDEX_ENABLED", default=False)
+    ROOM_INDEX_TTL: int = config("ROOM_INDEX_TTL", default=60)
+
+
 class IMGBBSettings(BaseSettings):
     IMGBB_API_KEY: str = config("IMGBB_API_KEY", default=None)
+    IMGBB_UPLOAD_URL: str = config("IMGBB_UPLOAD_URL", default="https://api.imgbb.com/1/upload")
+    IMAGE_UPLOAD_TIMEOUT: float = config("IMAGE_UPLOAD_TIMEOUT", default=30.0)
+    IMAGE_UPLOAD_MAX_CONCURRENCY: int = config("IMAGE_UPLOAD_MAX_CONCURRENCY", default=8)
     
+
+class ImageStorageSettings(BaseSettings):
+    IMAGE_STORAGE_BACKEND: str = config("IMAGE_STORAGE_BACKEND", default="imgbb")  # imgbb or local
+    LOCAL_IMAGE_STORAGE_DIR: str = config("LOCAL_IMAGE_STORAGE_DIR", default="./storage/images")
+    LOCAL_IMAGE_BASE_URL: str = config("LOCAL_IMAGE_BASE_URL", default="/api/v1/images")
+    IMAGE_VARIANT_WIDTHS: str = config("IMAGE_VARIANT_WIDTHS", default="320,640,1280")
+    IMAGE_CACHE_MAX_AGE: int = config("IMAGE_CACHE_MAX_AGE", default=31536000)
+
+
+class HTTPClientSettings(BaseSettings):
+    HTTP_CLIENT_MAX_CONNECTIONS: int = config("HTTP_CLIENT_MAX_CONNECTIONS", default=20)
+    HTTP_CLIENT_MAX_KEEPALIVE_CONNECTIONS: int = config("HTTP_CLIENT_MAX_KEEPALIVE_CONNECTIONS", default=10)
+    HTTP_CLIENT_CONNECT_TIMEOUT: float = config("HTTP_CLIENT_CONNECT_TIMEOUT", default=5.0)
+
+
 class EnvironmentOption(Enum):
     LOCAL = "local"
     STAGING = "staging"
@@ -117,11 +211,25 @@ class Settings(
     TestSettings,
     RedisCacheSettings,
     ClientSideCacheSettings,
+    CompressionSettings,
+    IdempotencySettings,
     RedisQueueSettings,
     RedisRateLimiterSettings,
     DefaultRateLimitSettings,
+    BookingLifecycleSettings,
+    BookingPartitionSettings,
+    BookingArchiveSettings,
+    OccupancySettings,
+    RoomHoldSettings,
+    PricingSettings,
+    RoomSuggestSettings,
+    RoomListingCacheSettings,
+    RoomFacetSettings,
+    RoomIndexSettings,
     EnvironmentSettings,
     IMGBBSettings,
+    ImageStorageSettings,
+    HTTPClientSettings,
 ):
     pass
 
@@ -3,6 +3,7 @@ from datetime import UTC, datetime
 
 from sqlalchemy import Boolean, Column, DateTime, text
 from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, MappedAsDataclass, mapped_column
 
 
 class UUIDMixin:
@@ -18,6 +19,13 @@ class TimestampMixin:
     )
 
 
-class SoftDeleteMixin:
-    deleted_at: datetime = Column(DateTime, nullable=True)
-    is_deleted: bool = Column(Boolean, default=False)
+class SoftDeleteMixin(MappedAsDataclass):
+    """`deleted_at` and `is_deleted` for models soft deleted by `FastCRUD.delete`.
+
+    Usable with the dataclass-mapped `Base`: the fields are keyword-only so they can precede the model's own
+    required fields. Hot indexes of these models are partial (`WHERE NOT is_deleted`), so queries should filter
+    `is_deleted=False` to keep tombstones out of their scans.
+    """
+
+    deleted_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), default=None, kw_only=True)
+    is_deleted: Mapped[bool] = mapped_column(Boolean, default=False, server_default=text("false"), kw_only=True)
@@ -0,0 +1,107 @@
+from datetime import UTC, date, datetime
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# `booking` is range partitioned by `check_in`, one partition per UTC month
+PARTITIONED_TABLE = "booking"
+# detached partitions are moved there, out of the way of `booking` but still queryable
+ARCHIVE_SCHEMA = "archive"
+
+# A partitioned table can not carry an exclusion constraint on a range of its partition key, so each partition gets
+# its own: two open bookings of a room overlapping within a month are refused by Postgres itself. Stays crossing a
+# month boundary are still only checked by the application.
+_CREATE_PARTITION = """
+CREATE TABLE IF NOT EXISTS {name} PARTITION OF booking (
+    CONSTRAINT {name}_no_overlap EXCLUDE USING gist (room_id WITH =, tstzrange(check_in, check_out) WITH &&)
+    WHERE (status IN ('booked', 'checked_in') AND NOT is_deleted)
+) FOR VALUES FROM ('{start} 00:00:00+00') TO ('{end} 00:00:00+00')
+"""
+
+_ATTACHED_PARTITIONS = text(
+    """
+    SELECT child.relname
+    FROM pg_inherits
+    JOIN pg_class AS child ON child.oid = pg_inherits.inhrelid
+    WHERE pg_inherits.inhparent = CAST(:table AS regclass)
+    """
+)
+
+
+def month_start(value: date | datetime) -> date:
+    if isinstance(value, datetime):
+        value = (value.astimezone(UTC) if value.tzinfo else value).date()
+    return value.replace(day=1)
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"{PARTITIONED_TABLE}_p{month:%Y_%m}"
+
+
+def partition_month(name: str) -> date | None:
+    """Return the month of a partition named by `partition_name`, None for any other table."""
+    prefix = f"{PARTITIONED_TABLE}_p"
+    try:
+        return datetime.strptime(name.removeprefix(prefix), "%Y_%m").date() if name.startswith(prefix) else None
+    except ValueError:
+        return None
+
+
+def create_partition_sql(month: date) -> str:
+    return _CREATE_PARTITION.format(name=partition_name(month), start=month, end=add_months(month, 1))
+
+
+async def attached_partitions(db: AsyncSession) -> dict[date, str]:
+    result = await db.execute(_ATTACHED_PARTITIONS, {"table": PARTITIONED_TABLE})
+    return {month: name for name in result.scalars() if (month := partition_month(name)) is not None}
+
+
+async def ensure_partitions(db: AsyncSession, first: date, last: date) -> list[str]:
+    """Create the missing monthly partitions from the month of `first` to the month of `last`, both included.
+
+    Creating a partition locks `booking` for a moment, so this belongs to the worker (ahead of time), to bulk
+    imports and to the startup `create_tables`, never to the request path.
+
+    Returns
+    -------
+    list[str]
+        The names of the partitions created.
+    """
+    existing = await attached_partitions(db)
+    created = []
+    month = month_start(first)
+    while month <= month_start(last):
+        if month not in existing:
+            await db.execute(text(create_partition_sql(month)))
+            created.append(partition_name(month))
+        month = add_months(month, 1)
+
+    await db.commit()
+    return created
+
+
+async def detach_partitions(db: AsyncSession, before: date) -> list[str]:
+    """Detach the partitions whose month ends on or before `before`, and move them to `ARCHIVE_SCHEMA`.
+
+    Each partition is detached in its own short transaction. Its rows leave `booking` (and every query on it)
+    but stay in `archive.booking_pYYYY_MM`, where they can be read, dumped or dropped.
+
+    Returns
+    -------
+    list[str]
+        The names of the partitions detached.
+    """
+    detached = []
+    for month, name in sorted((await attached_partitions(db)).items()):
+        if add_months(month, 1) > before:
+            break
+        await db.execute(text(f"ALTER TABLE {PARTITIONED_TABLE} DETACH PARTITION {name}"))
+        await db.execute(text(f"ALTER TABLE {name} SET SCHEMA {ARCHIVE_SCHEMA}"))
+        await db.commit()
+        detached.append(name)
+    return detached
@@ -0,0 +1,44 @@
+from decimal import Decimal
+from typing import Any
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+# OPT_UTC_Z keeps aware UTC datetimes as "...Z", exactly like pydantic's own JSON serialization.
+ORJSON_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, BaseModel):
+        return obj.model_dump()
+
+    if isinstance(obj, Decimal):
+        return float(obj)
+
+    if isinstance(obj, set | frozenset):
+        return list(obj)
+
+    return jsonable_encoder(obj)
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize content to JSON bytes with orjson.
+
+    `datetime`, `date`, `UUID`, `Enum`, dataclasses and numpy arrays are handled natively; pydantic models,
+    `Decimal` and sets go through a small fallback, anything else through `jsonable_encoder`.
+    """
+    return orjson.dumps(content, default=_default, option=ORJSON_OPTIONS)
+
+
+class ORJSONResponse(JSONResponse):
+    """JSON response rendered with orjson, used as the application's default response class.
+
+    Returning an `ORJSONResponse` directly from an endpoint also skips FastAPI's `response_model`
+    re-validation, which is redundant when the data already comes from a `schema_to_select` projection.
+    The `response_model` is still used for the OpenAPI schema.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -1,39 +1,66 @@
+import asyncio
 from collections.abc import AsyncGenerator, Callable
 from contextlib import _AsyncGeneratorContextManager, asynccontextmanager
+from datetime import UTC, datetime
 from typing import Any
 
 import anyio
 import fastapi
+import httpx
 import redis.asyncio as redis
 from arq import create_pool
 from arq.connections import RedisSettings
 from fastapi import APIRouter, Depends, FastAPI
+from fastapi.middleware.cors import CORSMiddleware
 from fastapi.openapi.docs import get_redoc_html, get_swagger_ui_html
 from fastapi.openapi.utils import get_openapi
-from fastapi.middleware.cors import CORSMiddleware
+from sqlalchemy import text
 
 from ..api.dependencies import get_current_superuser
 from ..middleware.client_cache_middleware import ClientCacheMiddleware
+from ..middleware.compression_middleware import CompressionMiddleware
+from ..middleware.idempotency_middleware import IdempotencyMiddleware
+from ..models import *
 from .config import (
     AppSettings,
     ClientSideCacheSettings,
+    CompressionSettings,
     DatabaseSettings,
     EnvironmentOption,
     EnvironmentSettings,
+    HTTPClientSettings,
+    IdempotencySettings,
     RedisCacheSettings,
     RedisQueueSettings,
     RedisRateLimiterSettings,
     settings,
 )
-from .db.database import Base, async_engine as engine
-from .utils import cache, queue, rate_limit
-from ..models import *
+from .db import partitions
+from .db.database import Base, local_session
+from .db.database import async_engine as engine
+from .responses import ORJSONResponse
+from .utils import cache, http_client, queue, rate_limit
 
 # -------------- database --------------
+# used by the models (`pg_trgm` for the room name search index, `btree_gist` for the booking partitions' exclusion
+# constraints), created by the migrations otherwise
+POSTGRES_EXTENSIONS = ("pg_trgm", "btree_gist")
+
+
 async def create_tables() -> None:
     async with engine.begin() as conn:
+        for extension in POSTGRES_EXTENSIONS:
+            await conn.execute(text(f"CREATE EXTENSION IF NOT EXISTS {extension}"))
         await conn.run_sync(Base.metadata.create_all)
 
+    # `create_all` leaves the partitioned `booking` without any partition (nor overlap constraint), create those the
+    # worker's `maintain_booking_partitions` keeps ready
+    current = partitions.month_start(datetime.now(UTC))
+    async with local_session() as db:
+        await partitions.ensure_partitions(
+            db, current, partitions.add_months(current, settings.BOOKING_PARTITION_MONTHS_AHEAD)
+        )
+
 
 # -------------- cache --------------
 async def create_redis_cache_pool() -> None:
@@ -64,6 +91,22 @@ async def close_redis_rate_limit_pool() -> None:
     await rate_limit.client.aclose()  # type: ignore
 
 
+# -------------- http client --------------
+async def create_http_client() -> None:
+    http_client.client = httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=settings.HTTP_CLIENT_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.HTTP_CLIENT_MAX_KEEPALIVE_CONNECTIONS,
+        ),
+        timeout=httpx.Timeout(settings.IMAGE_UPLOAD_TIMEOUT, connect=settings.HTTP_CLIENT_CONNECT_TIMEOUT),
+    )
+    http_client.upload_limiter = asyncio.Semaphore(settings.IMAGE_UPLOAD_MAX_CONCURRENCY)
+
+
+async def close_http_client() -> None:
+    await http_client.client.aclose()  # type: ignore
+
+
 # -------------- application --------------
 async def set_threadpool_tokens(number_of_tokens: int = 100) -> None:
     limiter = anyio.to_thread.current_default_thread_limiter()
@@ -76,9 +119,12 @@ def lifespan_factory(
         | RedisCacheSettings
         | AppSettings
         | ClientSideCacheSettings
+        | CompressionSettings
+        | IdempotencySettings
         | RedisQueueSettings
         | RedisRateLimiterSettings
         | EnvironmentSettings
+        | HTTPClientSettings
     ),
     create_tables_on_start: bool = True,
 ) -> Callable[[FastAPI], _AsyncGeneratorContextManager[Any]]:
@@ -91,22 +137,28 @@ def lifespan_factory(
         if isinstance(settings, DatabaseSettings) and create_tables_on_start:
             await create_tables()
 
-        # if isinstance(settings, RedisCacheSettings):
-        #     await create_redis_cache_pool()
+        if isinstance(settings, RedisCacheSettings):
+            await create_redis_cache_pool()
 
-        # if isinstance(settings, RedisQueueSettings):
-        #     await create_redis_queue_pool()
+        if isinstance(settings, RedisQueueSettings):
+            await create_redis_queue_pool()
 
         # if isinstance(settings, RedisRateLimiterSettings):
         #     await create_redis_rate_limit_pool()
 
+        if isinstance(settings, HTTPClientSettings):
+            await create_http_client()
+
         yield
 
-        # if isinstance(settings, RedisCacheSettings):
-        #     await close_redis_cache_pool()
+        if isinstance(settings, HTTPClientSettings):
+            await close_http_client()
+
+        if isinstance(settings, RedisCacheSettings):
+            await close_redis_cache_pool()
 
-        # if isinstance(settings, RedisQueueSettings):
-        #     await close_redis_queue_pool()
+        if isinstance(settings, RedisQueueSettings):
+            await close_redis_queue_pool()
 
         # if isinstance(settings, RedisRateLimiterSettings):
         #     await close_redis_rate_limit_pool()
@@ -122,9 +174,12 @@ def create_application(
         | RedisCacheSettings
         | AppSettings
         | ClientSideCacheSettings
+        | CompressionSettings
+        | IdempotencySettings
         | RedisQueueSettings
         | RedisRateLimiterSettings
         | EnvironmentSettings
+        | HTTPClientSettings
     ),
     create_tables_on_start: bool = True,
     **kwargs: Any,
@@ -147,8 +202,13 @@ def create_application(
         - DatabaseSettings: Adds event handlers for initializing database tables during startup.
         - RedisCacheSettings: Sets up event handlers for creating and closing a Redis cache pool.
         - ClientSideCacheSettings: Integrates middleware for client-side caching.
+        - CompressionSettings: Integrates middleware for gzip/brotli response compression above a size threshold.
+        - IdempotencySettings: Integrates middleware replaying the stored response of mutating requests retried with
+          the same `Idempotency-Key` header (needs the Redis cache pool).
         - RedisQueueSettings: Sets up event handlers for creating and closing a Redis queue pool.
         - RedisRateLimiterSettings: Sets up event handlers for creating and closing a Redis rate limiter pool.
+        - HTTPClientSettings: Sets up event handlers for creating and closing the shared, pooled `httpx.AsyncClient`
+          used for outgoing requests (e.g. image uploads).
         - EnvironmentSettings: Conditionally sets documentation URLs and integrates custom routes for API documentation
           based on the environment type.
 
@@ -158,6 +218,7 @@ def create_application(
 
     **kwargs
         Additional keyword arguments passed directly to the FastAPI constructor.
+        `default_response_class` defaults to the orjson based `ORJSONResponse`.
 
     Returns
     -------
@@ -182,14 +243,33 @@ def create_application(
     if isinstance(settings, EnvironmentSettings):
         kwargs.update({"docs_url": None, "redoc_url": None, "openapi_url": None})
 
+    kwargs.setdefault("default_response_class", ORJSONResponse)
+
     lifespan = lifespan_factory(settings, create_tables_on_start=create_tables_on_start)
 
     application = FastAPI(lifespan=lifespan, **kwargs)
     application.include_router(router)
 
+    # added first so it sits inside the compression middleware and stores uncompressed responses
+    if isinstance(settings, IdempotencySettings):
+        application.add_middleware(
+            IdempotencyMiddleware,
+            ttl=settings.IDEMPOTENCY_TTL,
+            lock_ttl=settings.IDEMPOTENCY_LOCK_TTL,
+            wait_timeout=settings.IDEMPOTENCY_WAIT_TIMEOUT,
+        )
+
     if isinstance(settings, ClientSideCacheSettings):
         application.add_middleware(ClientCacheMiddleware, max_age=settings.CLIENT_CACHE_MAX_AGE)
 
+    if isinstance(settings, CompressionSettings):
+        application.add_middleware(
+            CompressionMiddleware,
+            minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+            gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+            brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+        )
+
     if isinstance(settings, EnvironmentSettings):
         if settings.ENVIRONMENT != EnvironmentOption.PRODUCTION:
             docs_router = APIRouter()
@@ -197,8 +277,6 @@ def create_application(
                 docs_router = APIRouter(dependencies=[Depends(get_current_superuser)])
 
             @docs_router.get("/", include_in_schema=False)
-            async def get_swagger_documentation() -> fastapi.responses.HTMLResponse:
-                return get_swagger_ui_html(openapi_url="/openapi.json", title="docs")
             @docs_router.get("/docs", include_in_schema=False)
             async def get_swagger_documentation() -> fastapi.responses.HTMLResponse:
                 return get_swagger_ui_html(openapi_url="/openapi.json", title="docs")
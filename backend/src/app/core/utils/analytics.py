@@ -0,0 +1,98 @@
+from datetime import date, timedelta
+
+import numpy as np
+
+GRANULARITIES = ("day", "week", "month", "total")
+
+
+def period_starts(start: date, end: date, granularity: str) -> list[date]:
+    """Split `[start, end)` into periods, returning the first day of each one.
+
+    Weeks start on Monday and months on their first day, so the first and last periods may be partial.
+    """
+    if granularity == "total":
+        return [start]
+    if granularity == "day":
+        return [start + timedelta(days=i) for i in range((end - start).days)]
+
+    starts = [start]
+    while True:
+        current = starts[-1]
+        if granularity == "week":
+            following = current + timedelta(days=7 - current.weekday())
+        elif granularity == "month":
+            following = date(current.year + current.month // 12, current.month % 12 + 1, 1)
+        else:
+            raise ValueError(f"Unknown granularity: {granularity}")
+        if following >= end:
+            return starts
+        starts.append(following)
+
+
+def _ratio(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    return np.divide(numerator, denominator, out=np.zeros_like(numerator, dtype=np.float64), where=denominator > 0)
+
+
+def kpis(
+    start: date,
+    end: date,
+    granularity: str,
+    days: list[date],
+    nights_sold: list[int],
+    revenue: list[float],
+    room_count: int,
+) -> list[dict]:
+    """Aggregate daily rollup rows into occupancy, ADR and RevPAR per period.
+
+    Rows are summed per day with `np.bincount`, then per period with `np.add.reduceat`, so the cost is linear
+    in the number of rows whatever the granularity.
+
+    Parameters
+    ----------
+    start: date
+        The first day of the range.
+    end: date
+        The day after the last day of the range.
+    granularity: str
+        One of `GRANULARITIES`.
+    days: list[date]
+        The day of each rollup row, within `[start, end)`.
+    nights_sold: list[int]
+        The nights sold of each rollup row.
+    revenue: list[float]
+        The revenue of each rollup row.
+    room_count: int
+        The number of rooms for sale on every day of the range.
+
+    Returns
+    -------
+    list[dict]
+        One entry per period with its `start`, `end`, `nights_sold`, `available_nights`, `revenue`,
+        `occupancy` (sold / available), `adr` (revenue / sold) and `revpar` (revenue / available).
+    """
+    n_days = (end - start).days
+    offsets = np.array([(day - start).days for day in days], dtype=np.int64)
+    sold_per_day = np.bincount(offsets, weights=np.asarray(nights_sold, dtype=np.float64), minlength=n_days)
+    revenue_per_day = np.bincount(offsets, weights=np.asarray(revenue, dtype=np.float64), minlength=n_days)
+
+    starts = period_starts(start, end, granularity)
+    edges = np.array([(period - start).days for period in starts], dtype=np.int64)
+    sold = np.add.reduceat(sold_per_day, edges)
+    earned = np.add.reduceat(revenue_per_day, edges)
+    available = np.diff(np.append(edges, n_days)).astype(np.float64) * room_count
+
+    occupancy, adr, revpar = _ratio(sold, available), _ratio(earned, sold), _ratio(earned, available)
+    ends = [*starts[1:], end]
+    return [
+        {
+            "start": starts[i],
+            "end": ends[i],
+            "nights_sold": int(sold[i]),
+            "available_nights": int(available[i]),
+            "revenue": round(float(earned[i]), 2),
+            "occupancy": round(float(occupancy[i]), 4),
+            "adr": round(float(adr[i]), 2),
+            "revpar": round(float(revpar[i]), 2),
+        }
+        for i in range(len(starts))
+    ]
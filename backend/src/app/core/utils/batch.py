@@ -0,0 +1,43 @@
+from collections.abc import Sequence
+from typing import Any
+
+# most ids a batch read accepts, so one request stays one bounded `id IN (...)` query
+BATCH_MAX_IDS = 100
+
+
+def unique_ids(ids: Sequence[int]) -> list[int]:
+    """Return `ids` without repeats, in the order they were first given.
+
+    Raises
+    ------
+    ValueError
+        If no id, or more than `BATCH_MAX_IDS` distinct ids, are given.
+    """
+    unique = list(dict.fromkeys(ids))
+    if not unique:
+        raise ValueError("No ids requested")
+    if len(unique) > BATCH_MAX_IDS:
+        raise ValueError(f"At most {BATCH_MAX_IDS} ids can be requested at once")
+    return unique
+
+
+def in_request_order(rows: list[dict], ids: list[int]) -> dict[str, Any]:
+    """Order the rows of a batch read like the requested `ids`, and list the ids no row was found for.
+
+    Parameters
+    ----------
+    rows: list[dict]
+        The rows read with `id IN (ids)`, in any order, each with its `id`.
+    ids: list[int]
+        The requested ids, as returned by `unique_ids`.
+
+    Returns
+    -------
+    dict[str, Any]
+        `data`: the rows in the order of `ids`, `missing_ids`: the ids without a row, in the same order.
+    """
+    by_id = {row["id"]: row for row in rows}
+    return {
+        "data": [by_id[id] for id in ids if id in by_id],
+        "missing_ids": [id for id in ids if id not in by_id],
+    }
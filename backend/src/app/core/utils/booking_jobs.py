@@ -0,0 +1,73 @@
+import asyncio
+import uuid as uuid_pkg
+from datetime import date, datetime
+
+from arq.connections import ArqRedis
+from arq.jobs import Job
+from redis.asyncio import Redis
+
+from . import occupancy
+
+# version of the last `refresh_booking_rollup` job requested for a room and range of nights, in the queue's Redis
+ROLLUP_REFRESH_VERSION_KEY = "booking_rollup:refresh_version:{room_id}:{start}:{end}"
+# a version outlives any retry of its jobs, a job older than that just runs
+ROLLUP_REFRESH_VERSION_TTL = 86400
+
+
+async def enqueue_rollup_refresh(pool: ArqRedis, room_id: int, start: date, end: date) -> Job | None:
+    """Queue a `refresh_booking_rollup` job recomputing the room's rollup over `[start, end)` after a change.
+
+    As for `occupancy.enqueue_refresh`, every change gets its own job, numbered by a version per room and range:
+    a job is skipped by the worker once a later version is queued (see `rollup_refresh_superseded`).
+    """
+    key = ROLLUP_REFRESH_VERSION_KEY.format(room_id=room_id, start=start, end=end)
+    async with pool.pipeline(transaction=True) as pipe:
+        pipe.incr(key)
+        pipe.expire(key, ROLLUP_REFRESH_VERSION_TTL)
+        version, _ = await pipe.execute()
+    return await pool.enqueue_job(
+        "refresh_booking_rollup", room_id, start, end, version,
+        _job_id=f"booking_rollup:{room_id}:{start}:{end}:{version}",
+    )
+
+
+async def rollup_refresh_superseded(redis: Redis, room_id: int, start: date, end: date, version: int | None) -> bool:
+    """Whether a later `refresh_booking_rollup` job than `version` is queued for the room and range."""
+    if version is None:
+        return False
+    latest = await redis.get(ROLLUP_REFRESH_VERSION_KEY.format(room_id=room_id, start=start, end=end))
+    return latest is not None and int(latest) > version
+
+
+async def enqueue_side_effects(
+    pool: ArqRedis,
+    booking_id: int,
+    stays: list[tuple[int, datetime, datetime]],
+    action: str,
+    status: str | None = None,
+    notify: str | None = None,
+) -> None:
+    """Queue the worker jobs following a booking change: availability and rollup refreshes, audit, notification.
+
+    `stays` are the `(room_id, check_in, check_out)` the change touched, before and after it. Notifications are
+    deduplicated per booking and event, superseded availability and rollup refreshes are skipped (see
+    `occupancy.enqueue_refresh` and `enqueue_rollup_refresh`), and jobs are retried by the worker (see
+    `WorkerSettings`).
+    """
+    jobs = [occupancy.enqueue_refresh(pool, room_id) for room_id in {room_id for room_id, _, _ in stays}]
+    for room_id, first_night, end in {(room_id, *occupancy.night_dates(*stay)) for room_id, *stay in stays}:
+        jobs.append(enqueue_rollup_refresh(pool, room_id, first_night, end))
+    jobs.append(
+        pool.enqueue_job(
+            "record_booking_audit", booking_id, action, status,
+            _job_id=f"booking_audit:{booking_id}:{action}:{uuid_pkg.uuid4().hex}",
+        )
+    )
+    if notify is not None:
+        jobs.append(
+            pool.enqueue_job(
+                "send_booking_notification", booking_id, notify, _job_id=f"booking_notification:{booking_id}:{notify}"
+            )
+        )
+
+    await asyncio.gather(*jobs)
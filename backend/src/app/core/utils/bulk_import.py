@@ -0,0 +1,148 @@
+import codecs
+import csv
+import typing
+from collections.abc import AsyncIterable, AsyncIterator
+from dataclasses import dataclass, field
+from typing import Any
+
+import orjson
+from pydantic import BaseModel, ValidationError
+
+IMPORT_BATCH_SIZE = 1000
+# a quoted CSV field spanning more lines than this is reported instead of buffered further
+IMPORT_MAX_RECORD_LINES = 100
+# past this many failed rows the report only keeps counting them
+IMPORT_MAX_REPORTED_ERRORS = 1000
+
+
+@dataclass
+class ImportReport:
+    inserted: int = 0
+    failed: int = 0
+    errors: list[dict[str, Any]] = field(default_factory=list)
+
+    def fail(self, row: int, *messages: str) -> None:
+        self.failed += 1
+        if len(self.errors) < IMPORT_MAX_REPORTED_ERRORS:
+            self.errors.append({"row": row, "errors": list(messages)})
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "inserted": self.inserted,
+            "failed": self.failed,
+            "errors": self.errors,
+            "errors_truncated": self.failed > len(self.errors),
+        }
+
+
+async def iter_lines(chunks: AsyncIterable[bytes]) -> AsyncIterator[tuple[int, str]]:
+    """Split a stream of UTF-8 bytes into `(line number, line)`, without ever holding more than one chunk."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending, number = "", 0
+    async for chunk in chunks:
+        lines = (pending + decoder.decode(chunk)).split("\n")
+        pending = lines.pop()
+        for line in lines:
+            number += 1
+            yield number, line.rstrip("\r")
+
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield number + 1, pending.rstrip("\r")
+
+
+def _list_fields(schema: type[BaseModel]) -> set[str]:
+    return {name for name, info in schema.model_fields.items() if typing.get_origin(info.annotation) is list}
+
+
+async def iter_records(
+    chunks: AsyncIterable[bytes], format: str, schema: type[BaseModel]
+) -> AsyncIterator[tuple[int, dict | None, str | None]]:
+    """Parse a CSV (with a header row) or NDJSON stream into `(row number, record, parse error)`.
+
+    Row numbers are the line numbers in the upload. In CSV, list fields of `schema` are `;` separated
+    (e.g. `1;2;3`, empty for none) and other empty cells are left out so the schema defaults apply.
+    """
+    list_fields = _list_fields(schema)
+    header: list[str] | None = None
+    record_lines: list[str] = []
+    first_line = 0
+
+    async for number, line in iter_lines(chunks):
+        if format == "ndjson":
+            if not line.strip():
+                continue
+            try:
+                record = orjson.loads(line)
+            except orjson.JSONDecodeError as e:
+                yield number, None, f"Invalid JSON: {e}"
+                continue
+            if not isinstance(record, dict):
+                yield number, None, "Each line should be a JSON object"
+                continue
+            yield number, record, None
+            continue
+
+        # a quoted CSV field may span lines: keep reading until the quotes are balanced
+        if not record_lines:
+            first_line = number
+        record_lines.append(line)
+        text = "\n".join(record_lines)
+        if text.count('"') % 2:
+            if len(record_lines) >= IMPORT_MAX_RECORD_LINES:
+                yield first_line, None, f"Quoted field spans more than {IMPORT_MAX_RECORD_LINES} lines"
+                record_lines = []
+            continue
+        record_lines = []
+        if not text.strip():
+            continue
+
+        values = next(csv.reader([text]))
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+        if len(values) != len(header):
+            yield first_line, None, f"Expected {len(header)} columns, got {len(values)}"
+            continue
+
+        record = {}
+        for name, value in zip(header, values):
+            if name in list_fields:
+                record[name] = [item.strip() for item in value.split(";") if item.strip()]
+            elif value != "":
+                record[name] = value
+        yield first_line, record, None
+
+    if record_lines:
+        yield first_line, None, "Unterminated quoted field"
+
+
+async def iter_batches(
+    records: AsyncIterable[tuple[int, dict | None, str | None]],
+    schema: type[BaseModel],
+    report: ImportReport,
+    size: int = IMPORT_BATCH_SIZE,
+) -> AsyncIterator[list[tuple[int, BaseModel]]]:
+    """Validate records with `schema` and group the valid ones in batches of `size`.
+
+    Rows that fail to parse or validate are added to `report` and never reach a batch.
+    """
+    batch: list[tuple[int, BaseModel]] = []
+    async for row, record, error in records:
+        if error is not None:
+            report.fail(row, error)
+            continue
+        try:
+            batch.append((row, schema.model_validate(record)))
+        except ValidationError as e:
+            report.fail(
+                row, *(f"{'.'.join(str(part) for part in err['loc'])}: {err['msg']}" for err in e.errors())
+            )
+            continue
+
+        if len(batch) >= size:
+            yield batch
+            batch = []
+
+    if batch:
+        yield batch
@@ -1,14 +1,19 @@
 import functools
-import json
 import re
 from collections.abc import Callable
 from typing import Any
 
 from fastapi import Request, Response
-from fastapi.encoders import jsonable_encoder
 from redis.asyncio import ConnectionPool, Redis
+from redis.exceptions import RedisError
 
+from ..config import settings
 from ..exceptions.cache_exceptions import CacheIdentificationInferenceError, InvalidRequestError, MissingClientError
+from ..logger import logging
+from ..responses import dumps
+from .compression import IDENTITY, compress, negotiate_encoding
+
+logger = logging.getLogger(__name__)
 
 pool: ConnectionPool | None = None
 client: Redis | None = None
@@ -181,6 +186,60 @@ async def _delete_keys_by_pattern(pattern: str) -> None:
             await client.delete(*keys)
 
 
+def _should_compress(body: bytes, encoding: str | None) -> bool:
+    return encoding is not None and len(body) >= settings.COMPRESSION_MINIMUM_SIZE
+
+
+def _compress(body: bytes, encoding: str) -> bytes:
+    return compress(
+        body,
+        encoding,
+        gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+        brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+    )
+
+
+def _json_response(body: bytes, encoding: str | None) -> Response:
+    """Build a JSON response from already serialized (and possibly compressed) bytes.
+
+    The `Content-Encoding` header makes the compression middleware pass the body through untouched.
+    """
+    headers = {"Vary": "Accept-Encoding"}
+    if encoding is not None:
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+async def _cached_response(cache_key: str, body: bytes, encoding: str | None, encoded_body: bytes | None) -> Response:
+    """Serve a cache hit, compressing it at most once per encoding.
+
+    Parameters
+    ----------
+    cache_key: str
+        The key of the Redis hash holding the cached variants.
+    body: bytes
+        The uncompressed (identity) JSON body.
+    encoding: str | None
+        The encoding negotiated with the client, if any.
+    encoded_body: bytes | None
+        The cached variant for `encoding`, if it was already stored.
+
+    Returns
+    -------
+    Response
+        The cached response, precompressed when the client accepts it.
+    """
+    if encoding is None or not _should_compress(body, encoding):
+        return _json_response(body, None)
+
+    if encoded_body is None:
+        encoded_body = _compress(body, encoding)
+        if client is not None:
+            await client.hset(cache_key, encoding, encoded_body)
+
+    return _json_response(encoded_body, encoding)
+
+
 def cache(
     key_prefix: str,
     resource_id_name: Any = None,
@@ -281,14 +340,18 @@ def cache(
     - `to_invalidate_extra` and `pattern_to_invalidate_extra` are used for cache invalidation on methods other than GET.
     - Using `pattern_to_invalidate_extra` can be resource-intensive on large datasets. Use it judiciously and
       consider the potential impact on Redis performance.
+    - Entries are stored as a Redis hash holding the serialized JSON plus one precompressed variant per
+      negotiated `Accept-Encoding` (only above `COMPRESSION_MINIMUM_SIZE`), so hits are never recompressed.
+      Deleting the key invalidates every variant at once. A key still holding a plain string entry, as cached
+      before entries were hashes, is read as a miss and replaced.
+    - GET results are always returned as serialized JSON, so the endpoint's `response_model` is not applied:
+      return a pydantic model (validated by the endpoint) to have it filter what is cached and served.
+    - Without Redis, or when it fails, GET requests are answered by the endpoint and writes skip the invalidation.
     """
 
     def wrapper(func: Callable) -> Callable:
         @functools.wraps(func)
         async def inner(request: Request, *args: Any, **kwargs: Any) -> Response:
-            if client is None:
-                raise MissingClientError
-
             if resource_id_name:
                 resource_id = kwargs[resource_id_name]
             else:
@@ -300,33 +363,63 @@ def cache(
                 if to_invalidate_extra is not None or pattern_to_invalidate_extra is not None:
                     raise InvalidRequestError
 
-                cached_data = await client.get(cache_key)
-                if cached_data:
-                    return json.loads(cached_data.decode())
+                encoding = negotiate_encoding(request.headers.get("Accept-Encoding"))
+                fields = [IDENTITY] if encoding is None else [IDENTITY, encoding]
+                try:
+                    if client is None:
+                        raise MissingClientError
+                    cached_data = await client.hmget(cache_key, fields)
+                except (RedisError, MissingClientError) as e:
+                    # a WRONGTYPE reply is an entry of the old string format, replaced below
+                    if "WRONGTYPE" not in str(e):
+                        logger.warning(f"Could not read {cache_key} from the cache: {e!r}")
+                    cached_data = [None]
+                if cached_data[0]:
+                    encoded_data = cached_data[1] if encoding is not None else None
+                    return await _cached_response(cache_key, cached_data[0], encoding, encoded_data)
 
             result = await func(request, *args, **kwargs)
 
             if request.method == "GET":
-                serializable_data = jsonable_encoder(result)
-                serialized_data = json.dumps(serializable_data)
-
-                await client.set(cache_key, serialized_data)
-                await client.expire(cache_key, expiration)
-
-                serialized_data = json.loads(serialized_data)
+                serialized_data = dumps(result)
+
+                variants = {IDENTITY: serialized_data}
+                if encoding is not None and _should_compress(serialized_data, encoding):
+                    variants[encoding] = _compress(serialized_data, encoding)
+
+                try:
+                    if client is None:
+                        raise MissingClientError
+                    async with client.pipeline(transaction=True) as pipe:
+                        # replaces whatever the key held, including an entry of the old string format
+                        pipe.delete(cache_key)
+                        pipe.hset(cache_key, mapping=variants)
+                        pipe.expire(cache_key, expiration)
+                        await pipe.execute()
+                except (RedisError, MissingClientError) as e:
+                    logger.warning(f"Could not cache {cache_key}: {e!r}")
+
+                if encoding in variants:
+                    return _json_response(variants[encoding], encoding)
+                return _json_response(serialized_data, None)
 
             else:
-                await client.delete(cache_key)
-                if to_invalidate_extra is not None:
-                    formatted_extra = _format_extra_data(to_invalidate_extra, kwargs)
-                    for prefix, id in formatted_extra.items():
-                        extra_cache_key = f"{prefix}:{id}"
-                        await client.delete(extra_cache_key)
-
-                if pattern_to_invalidate_extra is not None:
-                    for pattern in pattern_to_invalidate_extra:
-                        formatted_pattern = _format_prefix(pattern, kwargs)
-                        await _delete_keys_by_pattern(formatted_pattern + "*")
+                try:
+                    if client is None:
+                        raise MissingClientError
+                    await client.delete(cache_key)
+                    if to_invalidate_extra is not None:
+                        formatted_extra = _format_extra_data(to_invalidate_extra, kwargs)
+                        for prefix, id in formatted_extra.items():
+                            extra_cache_key = f"{prefix}:{id}"
+                            await client.delete(extra_cache_key)
+
+                    if pattern_to_invalidate_extra is not None:
+                        for pattern in pattern_to_invalidate_extra:
+                            formatted_pattern = _format_prefix(pattern, kwargs)
+                            await _delete_keys_by_pattern(formatted_pattern + "*")
+                except (RedisError, MissingClientError) as e:
+                    logger.warning(f"Could not invalidate {cache_key}: {e!r}")
 
             return result
 
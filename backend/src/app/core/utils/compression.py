@@ -0,0 +1,111 @@
+import gzip
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is an optional extra
+    brotli = None
+
+GZIP = "gzip"
+BROTLI = "br"
+IDENTITY = "identity"
+
+COMPRESSIBLE_MEDIA_TYPES = (
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+    "text/",
+)
+
+
+def supported_encodings() -> tuple[str, ...]:
+    """Return the content encodings this process can produce, in order of preference."""
+    if brotli is not None:
+        return (BROTLI, GZIP)
+    return (GZIP,)
+
+
+def negotiate_encoding(accept_encoding: str | None) -> str | None:
+    """Pick the best supported content encoding from an `Accept-Encoding` header.
+
+    Parameters
+    ----------
+    accept_encoding: str | None
+        The raw value of the `Accept-Encoding` request header.
+
+    Returns
+    -------
+    str | None
+        `"br"` or `"gzip"` if the client accepts one of them, otherwise None.
+
+    Note
+    ----
+        - Quality values are honoured, `q=0` explicitly disables an encoding.
+        - On equal quality the server preference (brotli, then gzip) wins.
+    """
+    if not accept_encoding:
+        return None
+
+    qualities: dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        token, _, params = part.strip().partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        qualities[token] = quality
+
+    best: str | None = None
+    best_quality = 0.0
+    for encoding in supported_encodings():
+        quality = qualities.get(encoding, qualities.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+
+    return best
+
+
+def is_compressible(media_type: str | None) -> bool:
+    """Whether a response with the given `Content-Type` is worth compressing."""
+    if not media_type:
+        return False
+    media_type = media_type.split(";", 1)[0].strip().lower()
+    return any(media_type.startswith(prefix) for prefix in COMPRESSIBLE_MEDIA_TYPES)
+
+
+def compress(body: bytes, encoding: str, gzip_level: int = 6, brotli_quality: int = 4) -> bytes:
+    """Compress a response body with the negotiated encoding.
+
+    Parameters
+    ----------
+    body: bytes
+        The uncompressed body.
+    encoding: str
+        Either `"gzip"` or `"br"`, as returned by `negotiate_encoding`.
+    gzip_level: int
+        The zlib compression level used for gzip.
+    brotli_quality: int
+        The brotli quality used when brotli is available.
+
+    Returns
+    -------
+    bytes
+        The compressed body.
+    """
+    if encoding == BROTLI:
+        if brotli is None:
+            raise ValueError("brotli is not installed")
+        return brotli.compress(body, quality=brotli_quality, mode=brotli.MODE_TEXT)
+
+    if encoding == GZIP:
+        # mtime is fixed so identical bodies produce identical bytes (stable ETags and cache entries)
+        return gzip.compress(body, compresslevel=gzip_level, mtime=0)
+
+    raise ValueError(f"Unsupported encoding: {encoding}")
@@ -0,0 +1,43 @@
+import csv
+import io
+from collections.abc import AsyncIterable, AsyncIterator, Sequence
+
+from ..responses import dumps
+
+EXPORT_FORMATS = {"csv": "text/csv; charset=utf-8", "ndjson": "application/x-ndjson"}
+
+
+async def encode_csv(partitions: AsyncIterable[Sequence[Sequence]], columns: Sequence[str]) -> AsyncIterator[bytes]:
+    """Encode partitions of rows as CSV, yielding one chunk per partition after the header.
+
+    Only one partition is held in memory at a time, whatever the number of rows. Values are written as `str()`
+    renders them, so datetimes come out as `2024-01-01 12:00:00+00:00` (RFC 3339 with a space separator).
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    yield buffer.getvalue().encode()
+
+    async for partition in partitions:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(partition)
+        yield buffer.getvalue().encode()
+
+
+async def encode_ndjson(
+    partitions: AsyncIterable[Sequence[Sequence]], columns: Sequence[str]
+) -> AsyncIterator[bytes]:
+    """Encode partitions of rows as newline delimited JSON objects, yielding one chunk per partition."""
+    async for partition in partitions:
+        yield b"".join(dumps(dict(zip(columns, row))) + b"\n" for row in partition)
+
+
+def encode(
+    format: str, partitions: AsyncIterable[Sequence[Sequence]], columns: Sequence[str]
+) -> AsyncIterator[bytes]:
+    if format == "csv":
+        return encode_csv(partitions, columns)
+    if format == "ndjson":
+        return encode_ndjson(partitions, columns)
+    raise ValueError(f"Unknown export format: {format}")
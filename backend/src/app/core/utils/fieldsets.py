@@ -0,0 +1,54 @@
+from functools import lru_cache
+
+from pydantic import BaseModel, create_model
+
+
+def parse_fields(fields: str | None, schema: type[BaseModel]) -> list[str] | None:
+    """Parse a `fields=` query parameter into field names of `schema`.
+
+    Parameters
+    ----------
+    fields: str | None
+        Comma separated field names, e.g. `"id,name,price"`. Blank entries and repeats are ignored.
+    schema: type[BaseModel]
+        The read schema the names are checked against.
+
+    Returns
+    -------
+    list[str] | None
+        The requested names in `schema` order, or None when `fields` is not given (every field).
+
+    Raises
+    ------
+    ValueError
+        If a name is not a field of `schema`, or no name is given.
+    """
+    if fields is None:
+        return None
+
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = requested - set(schema.model_fields)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    if not requested:
+        raise ValueError("No fields requested")
+    return [name for name in schema.model_fields if name in requested]
+
+
+@lru_cache(maxsize=256)
+def _narrow(schema: type[BaseModel], names: tuple[str, ...]) -> type[BaseModel]:
+    return create_model(  # type: ignore[call-overload]
+        f"{schema.__name__}Fields",
+        **{name: (schema.model_fields[name].annotation, schema.model_fields[name]) for name in names},
+    )
+
+
+def narrow_schema(schema: type[BaseModel], names: list[str] | None) -> type[BaseModel]:
+    """Return `schema` restricted to `names`, to pass as FastCRUD's `schema_to_select`.
+
+    FastCRUD selects the model columns matching the schema's fields, so only the requested columns are read from
+    Postgres and serialized. Narrowed schemas are cached, the same `fields=` builds its schema once per worker.
+    """
+    if names is None or len(names) == len(schema.model_fields):
+        return schema
+    return _narrow(schema, tuple(names))
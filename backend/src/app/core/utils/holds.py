@@ -0,0 +1,131 @@
+import time
+import uuid as uuid_pkg
+from dataclasses import dataclass
+from datetime import UTC, datetime
+
+from ..config import settings
+from ..exceptions.cache_exceptions import MissingClientError
+from . import cache
+from .occupancy import nights
+
+# per room: hold_id -> "start:end:expires_at_ms:owner", `start`/`end` being night offsets (see `occupancy`)
+ROOM_HOLDS_KEY = "room_holds:{room_id}"
+# per hold: the room it belongs to, expiring with the hold
+HOLD_KEY = "room_hold:{hold_id}"
+
+# Atomically drop expired holds of the room, fail with the id of an overlapping hold of another owner, or add
+# the new one. The room hash and the hold key expire with the holds they contain, so nothing is ever cleaned
+# up in Postgres.
+_PLACE_HOLD = """
+local now, start_night, end_night = tonumber(ARGV[4]), tonumber(ARGV[2]), tonumber(ARGV[3])
+local latest = tonumber(ARGV[5])
+local holds = redis.call('HGETALL', KEYS[1])
+for i = 1, #holds, 2 do
+    local s, e, expires, owner = string.match(holds[i + 1], '^(%d+):(%d+):(%d+):(.*)$')
+    s, e, expires = tonumber(s), tonumber(e), tonumber(expires)
+    if expires <= now then
+        redis.call('HDEL', KEYS[1], holds[i])
+    elseif s < end_night and e > start_night and owner ~= ARGV[6] then
+        return holds[i]
+    elseif expires > latest then
+        latest = expires
+    end
+end
+redis.call('HSET', KEYS[1], ARGV[1], ARGV[2] .. ':' .. ARGV[3] .. ':' .. ARGV[5] .. ':' .. ARGV[6])
+redis.call('PEXPIREAT', KEYS[1], latest)
+redis.call('SET', KEYS[2], ARGV[7], 'PXAT', ARGV[5])
+return false
+"""
+
+
+@dataclass
+class Hold:
+    id: str
+    room_id: int
+    start: int
+    end: int
+    expires_at_ms: int
+    owner: str
+
+    @property
+    def expires_at(self) -> datetime:
+        return datetime.fromtimestamp(self.expires_at_ms / 1000, tz=UTC)
+
+    def covers(self, check_in: datetime, check_out: datetime) -> bool:
+        start, end = nights(check_in, check_out)
+        return self.start <= start and end <= self.end
+
+
+def _parse(hold_id: str, room_id: int, value: bytes) -> Hold:
+    start, end, expires_at_ms, owner = value.decode().split(":", 3)
+    return Hold(hold_id, room_id, int(start), int(end), int(expires_at_ms), owner)
+
+
+def _now_ms() -> int:
+    return int(time.time() * 1000)
+
+
+async def place(room_id: int, check_in: datetime, check_out: datetime, owner: str) -> Hold | str:
+    """Hold the room's nights from `check_in` to `check_out` for `ROOM_HOLD_TTL` seconds.
+
+    Returns
+    -------
+    Hold | str
+        The new hold, or the id of the hold of another owner overlapping the stay.
+    """
+    if cache.client is None:
+        raise MissingClientError
+
+    start, end = nights(check_in, check_out)
+    hold = Hold(uuid_pkg.uuid4().hex, room_id, start, end, _now_ms() + settings.ROOM_HOLD_TTL * 1000, owner)
+    conflict = await cache.client.eval(
+        _PLACE_HOLD,
+        2,
+        ROOM_HOLDS_KEY.format(room_id=room_id),
+        HOLD_KEY.format(hold_id=hold.id),
+        hold.id, start, end, _now_ms(), hold.expires_at_ms, owner, room_id,
+    )
+    if conflict is not None:
+        return conflict.decode()
+    return hold
+
+
+async def get(hold_id: str) -> Hold | None:
+    """Return a live hold, or None if it does not exist or expired."""
+    if cache.client is None:
+        raise MissingClientError
+
+    room_id = await cache.client.get(HOLD_KEY.format(hold_id=hold_id))
+    if room_id is None:
+        return None
+
+    value = await cache.client.hget(ROOM_HOLDS_KEY.format(room_id=int(room_id)), hold_id)
+    if value is None:
+        return None
+
+    hold = _parse(hold_id, int(room_id), value)
+    return hold if hold.expires_at_ms > _now_ms() else None
+
+
+async def conflicting(room_id: int, check_in: datetime, check_out: datetime, owner: str | None = None) -> Hold | None:
+    """Return a live hold of another owner overlapping the stay, if any."""
+    if cache.client is None:
+        raise MissingClientError
+
+    start, end = nights(check_in, check_out)
+    now = _now_ms()
+    for hold_id, value in (await cache.client.hgetall(ROOM_HOLDS_KEY.format(room_id=room_id))).items():
+        hold = _parse(hold_id.decode(), room_id, value)
+        if hold.expires_at_ms > now and hold.start < end and hold.end > start and hold.owner != owner:
+            return hold
+    return None
+
+
+async def release(hold: Hold) -> None:
+    if cache.client is None:
+        raise MissingClientError
+
+    async with cache.client.pipeline(transaction=True) as pipe:
+        pipe.hdel(ROOM_HOLDS_KEY.format(room_id=hold.room_id), hold.id)
+        pipe.delete(HOLD_KEY.format(hold_id=hold.id))
+        await pipe.execute()
@@ -0,0 +1,6 @@
+import asyncio
+
+import httpx
+
+client: httpx.AsyncClient | None = None
+upload_limiter: asyncio.Semaphore | None = None
@@ -0,0 +1,201 @@
+import hashlib
+import mimetypes
+import os
+import re
+import secrets
+import uuid as uuid_pkg
+from abc import ABC, abstractmethod
+from collections.abc import AsyncIterator
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+
+import anyio
+import httpx
+from fastapi import UploadFile
+
+from ..config import settings
+from ..exceptions.cache_exceptions import MissingClientError
+from ..exceptions.http_exceptions import CustomException
+from ..logger import logging
+from . import http_client
+
+try:
+    from PIL import Image
+except ImportError:  # pragma: no cover - without Pillow no variants are made, see `generate_image_variants`
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+DIGEST_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+NAME_PATTERN = re.compile(r"^(original\.[a-z0-9]{1,5}|w[0-9]{1,5}\.webp)$")
+
+
+@dataclass
+class StoredImage:
+    url: str
+    digest: str | None = None
+    created: bool = True
+    variants: dict[str, str] = field(default_factory=dict)
+
+
+class ImageStorage(ABC):
+    """Where `/images/upload` puts files. Implementations must stream the upload, never buffer it fully."""
+
+    @abstractmethod
+    async def save(self, image: UploadFile) -> StoredImage:
+        ...
+
+
+# -------------- imgbb --------------
+def _multipart_envelope(field_name: str, image: UploadFile) -> tuple[bytes, bytes, str]:
+    """Build the multipart head/tail around a single file part, and the matching content type."""
+    boundary = secrets.token_hex(16)
+    filename = (image.filename or "image").replace('"', "%22")
+    head = (
+        f"--{boundary}\r\n"
+        f'Content-Disposition: form-data; name="{field_name}"; filename="{filename}"\r\n'
+        f"Content-Type: {image.content_type}\r\n\r\n"
+    ).encode()
+    tail = f"\r\n--{boundary}--\r\n".encode()
+    return head, tail, f"multipart/form-data; boundary={boundary}"
+
+
+async def _stream_multipart(head: bytes, image: UploadFile, tail: bytes) -> AsyncIterator[bytes]:
+    yield head
+    while chunk := await image.read(UPLOAD_CHUNK_SIZE):
+        yield chunk
+    yield tail
+
+
+class ImgBBImageStorage(ImageStorage):
+    """Uploads to imgbb through the shared, pooled HTTP client, at most `IMAGE_UPLOAD_MAX_CONCURRENCY` at a time."""
+
+    async def save(self, image: UploadFile) -> StoredImage:
+        if http_client.client is None or http_client.upload_limiter is None:
+            raise MissingClientError
+
+        head, tail, content_type = _multipart_envelope("image", image)
+        headers = {"Content-Type": content_type}
+        if image.size is not None:
+            headers["Content-Length"] = str(len(head) + image.size + len(tail))
+
+        async with http_client.upload_limiter:
+            try:
+                response = await http_client.client.post(
+                    settings.IMGBB_UPLOAD_URL,
+                    params={"key": settings.IMGBB_API_KEY},
+                    content=_stream_multipart(head, image, tail),
+                    headers=headers,
+                )
+            except httpx.TimeoutException:
+                raise CustomException(status_code=504, detail="Image upload timed out")
+            except httpx.HTTPError as e:
+                logger.error(f"Image upload failed: {e}")
+                raise CustomException(status_code=502, detail="Failed to upload image")
+
+        if response.status_code != 200:
+            logger.error(f"Image upload rejected by upstream with status {response.status_code}")
+            raise CustomException(status_code=502, detail="Failed to upload image")
+
+        return StoredImage(url=response.json()["data"]["url"])
+
+
+# -------------- local filesystem --------------
+class LocalImageStorage(ImageStorage):
+    """Content-addressed storage on the local filesystem.
+
+    Files are stored under ``<root>/<digest[:2]>/<digest>/original.<ext>`` where ``digest`` is the sha256 of the
+    bytes, so uploading the same image twice stores it once. Responsive ``w<width>.webp`` variants are written
+    next to the original by the `generate_image_variants` worker job.
+
+    Parameters
+    ----------
+    root: str
+        The directory images are stored in.
+    base_url: str
+        The URL prefix the stored files are served under.
+    variant_widths: list[int]
+        The widths of the responsive variants.
+    """
+
+    def __init__(self, root: str, base_url: str, variant_widths: list[int]) -> None:
+        self.root = Path(root)
+        self.base_url = base_url.rstrip("/")
+        self.variant_widths = variant_widths
+
+    def directory(self, digest: str) -> Path:
+        return self.root / digest[:2] / digest
+
+    def path(self, digest: str, name: str) -> Path | None:
+        """Resolve a stored file, or None if the digest/name are not valid storage names."""
+        if not DIGEST_PATTERN.match(digest) or not NAME_PATTERN.match(name):
+            return None
+        return self.directory(digest) / name
+
+    def url(self, digest: str, name: str) -> str:
+        return f"{self.base_url}/{digest}/{name}"
+
+    def variant_name(self, width: int) -> str:
+        return f"w{width}.webp"
+
+    def widths_for(self, original: Path) -> list[int]:
+        """Return the variant widths made for an image: the ones below its own width, none if it can't be read."""
+        if Image is None:
+            return []
+        try:
+            with Image.open(original) as image:
+                source_width = image.width
+        except (OSError, ValueError):
+            return []
+        return [width for width in self.variant_widths if width < source_width]
+
+    async def save(self, image: UploadFile) -> StoredImage:
+        extension = (mimetypes.guess_extension(image.content_type or "") or ".bin").lstrip(".")
+        tmp_dir = anyio.Path(self.root / "tmp")
+        await tmp_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = tmp_dir / uuid_pkg.uuid4().hex
+
+        sha256 = hashlib.sha256()
+        try:
+            async with await anyio.open_file(tmp_path, "wb") as f:
+                while chunk := await image.read(UPLOAD_CHUNK_SIZE):
+                    sha256.update(chunk)
+                    await f.write(chunk)
+        except BaseException:
+            await tmp_path.unlink(missing_ok=True)
+            raise
+
+        digest = sha256.hexdigest()
+        name = f"original.{extension}"
+        target = anyio.Path(self.directory(digest) / name)
+        created = not await target.exists()
+        if created:
+            await target.parent.mkdir(parents=True, exist_ok=True)
+            # rename is atomic, a concurrent upload of the same bytes just overwrites it with identical content
+            await anyio.to_thread.run_sync(os.replace, tmp_path, target)
+        else:
+            await tmp_path.unlink()
+
+        widths = await anyio.to_thread.run_sync(self.widths_for, Path(target))
+        return StoredImage(
+            url=self.url(digest, name),
+            digest=digest,
+            created=created,
+            variants={str(width): self.url(digest, self.variant_name(width)) for width in widths},
+        )
+
+
+@lru_cache
+def get_image_storage() -> ImageStorage:
+    """Return the storage backend selected by `IMAGE_STORAGE_BACKEND` (usable as a FastAPI dependency)."""
+    if settings.IMAGE_STORAGE_BACKEND == "local":
+        widths = [int(width) for width in settings.IMAGE_VARIANT_WIDTHS.split(",") if width.strip()]
+        return LocalImageStorage(settings.LOCAL_IMAGE_STORAGE_DIR, settings.LOCAL_IMAGE_BASE_URL, widths)
+
+    if settings.IMAGE_STORAGE_BACKEND == "imgbb":
+        return ImgBBImageStorage()
+
+    raise ValueError(f"Unknown IMAGE_STORAGE_BACKEND: {settings.IMAGE_STORAGE_BACKEND}")
@@ -0,0 +1,291 @@
+from collections.abc import Iterable
+from datetime import UTC, date, datetime, time, timedelta
+
+import numpy as np
+from arq.connections import ArqRedis
+from arq.jobs import Job
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ...crud.crud_booking import get_open_stays
+from ..config import settings
+from ..exceptions.cache_exceptions import MissingClientError
+from ..logger import logging
+from . import cache
+
+logger = logging.getLogger(__name__)
+
+# bit `n` of a room's bitmap is the night starting `EPOCH + n days`, so offsets never shift as days pass
+EPOCH = date(2020, 1, 1)
+KEY_PREFIX = "room_occupancy"
+# room_id -> first night offset *not* covered by the room's last rebuild
+BUILT_UNTIL_KEY = f"{KEY_PREFIX}:built_until"
+# room_id -> version of the last `refresh_room_availability` job requested for the room, in the queue's Redis
+REFRESH_VERSION_KEY = f"{KEY_PREFIX}:refresh_version"
+
+
+def _key(room_id: int) -> str:
+    return f"{KEY_PREFIX}:{room_id}"
+
+
+def _day(value: datetime | date) -> date:
+    if isinstance(value, datetime):
+        return (value.astimezone(UTC) if value.tzinfo else value).date()
+    return value
+
+
+def _midnight(day: date) -> datetime:
+    return datetime.combine(day, time(), tzinfo=UTC)
+
+
+def night_offset(day: datetime | date) -> int:
+    return (_day(day) - EPOCH).days
+
+
+def nights(check_in: datetime | date, check_out: datetime | date) -> tuple[int, int]:
+    """Return the `[start, end)` night offsets a stay occupies, at least one night.
+
+    A stay occupies the nights from its check-in day up to, not including, its check-out day, so a room can
+    be checked out and checked in again on the same day.
+    """
+    start = night_offset(check_in)
+    return start, max(night_offset(check_out), start + 1)
+
+
+def night_dates(check_in: datetime | date, check_out: datetime | date) -> tuple[date, date]:
+    """Same as `nights`, as the `[first night, end)` dates."""
+    start, end = nights(check_in, check_out)
+    return EPOCH + timedelta(days=start), EPOCH + timedelta(days=end)
+
+
+def occupancy_bits(stays: Iterable[tuple[datetime, datetime]], until: int) -> bytes:
+    """Pack the nights occupied by `stays` into a bitmap covering offsets `[0, until)`.
+
+    The bit order matches Redis (`SETBIT`/`GETRANGE`): bit 0 is the most significant bit of the first byte.
+    """
+    occupied = np.zeros(until, dtype=bool)
+    for check_in, check_out in stays:
+        start, end = nights(check_in, check_out)
+        occupied[max(start, 0):min(end, until)] = True
+    return np.packbits(occupied, bitorder="big").tobytes()
+
+
+def busy_rows(chunks: list[bytes], start: int, end: int) -> np.ndarray:
+    """Test nights `[start, end)` of many bitmaps at once.
+
+    Parameters
+    ----------
+    chunks: list[bytes]
+        For each room, the bitmap bytes from byte `start // 8` on (as returned by `GETRANGE`), possibly shorter
+        when the bitmap ends earlier.
+    start: int
+        The first night offset of the stay.
+    end: int
+        The night offset after the last night of the stay.
+
+    Returns
+    -------
+    np.ndarray
+        A boolean array, True where at least one night of the stay is occupied.
+    """
+    first_byte = start // 8
+    width = (end - 1) // 8 - first_byte + 1
+    matrix = np.zeros((len(chunks), width), dtype=np.uint8)
+    for row, chunk in enumerate(chunks):
+        chunk = chunk[:width]
+        matrix[row, : len(chunk)] = np.frombuffer(chunk, dtype=np.uint8)
+
+    bits = np.unpackbits(matrix, axis=1, bitorder="big")
+    return bits[:, start - first_byte * 8 : end - first_byte * 8].any(axis=1)
+
+
+def booking_grid(
+    rows: np.ndarray, starts: np.ndarray, ends: np.ndarray, values: np.ndarray, shape: tuple[int, int]
+) -> np.ndarray:
+    """Paint night intervals onto a rooms x days grid without a Python loop per night.
+
+    Parameters
+    ----------
+    rows: np.ndarray
+        The grid row (room) of each interval.
+    starts: np.ndarray
+        The first day column of each interval.
+    ends: np.ndarray
+        The column after the last day of each interval, columns outside `[0, shape[1])` are clipped.
+    values: np.ndarray
+        The non-zero value (e.g. booking id) painted over each interval; a later interval wins on overlap.
+    shape: tuple[int, int]
+        The `(rooms, days)` shape of the grid.
+
+    Returns
+    -------
+    np.ndarray
+        The grid, 0 where no interval covers a day.
+    """
+    grid = np.zeros(shape, dtype=np.int64)
+    starts = np.clip(starts, 0, shape[1])
+    lengths = np.clip(ends, 0, shape[1]) - starts
+    keep = lengths > 0
+    rows, starts, lengths, values = rows[keep], starts[keep], lengths[keep], values[keep]
+    if not len(lengths):
+        return grid
+
+    # expand every interval into its cells: the column is the interval start plus the position inside it
+    first_cell = np.repeat(np.cumsum(lengths) - lengths, lengths)
+    columns = np.repeat(starts, lengths) + np.arange(lengths.sum()) - first_cell
+    grid[np.repeat(rows, lengths), columns] = np.repeat(values, lengths)
+    return grid
+
+
+def run_length_spans(grid: np.ndarray) -> list[list[tuple[int, int, int]]]:
+    """Run-length encode each row of `grid` into `(start, length, value)` spans, skipping zero runs."""
+    n_rows, n_columns = grid.shape
+    if not n_columns:
+        return [[] for _ in range(n_rows)]
+
+    run_starts = np.ones(grid.shape, dtype=bool)
+    run_starts[:, 1:] = grid[:, 1:] != grid[:, :-1]
+    rows, columns = np.nonzero(run_starts)
+
+    # every row starts a run at column 0, so the next run start in the flattened grid ends the current run
+    flat = rows * n_columns + columns
+    lengths = np.append(flat[1:], n_rows * n_columns) - flat
+    values = grid[rows, columns]
+
+    nonzero = values != 0
+    rows, columns, lengths, values = rows[nonzero], columns[nonzero], lengths[nonzero], values[nonzero]
+    bounds = np.searchsorted(rows, np.arange(n_rows + 1))
+    spans = list(zip(columns.tolist(), lengths.tolist(), values.tolist()))
+    return [spans[bounds[row] : bounds[row + 1]] for row in range(n_rows)]
+
+
+async def rebuild(db: AsyncSession, room_ids: list[int]) -> int:
+    """Rebuild the bitmaps of `room_ids` from Postgres, from today to `OCCUPANCY_HORIZON_DAYS` ahead.
+
+    Open bookings of all the rooms are loaded in one query and every bitmap is replaced in one transaction,
+    together with the horizon it covers.
+
+    Returns
+    -------
+    int
+        The first night offset not covered by the rebuilt bitmaps.
+    """
+    if cache.client is None:
+        raise MissingClientError
+
+    today = datetime.now(UTC).date()
+    horizon = today + timedelta(days=settings.OCCUPANCY_HORIZON_DAYS)
+    until = night_offset(horizon)
+
+    stays: dict[int, list[tuple[datetime, datetime]]] = {room_id: [] for room_id in room_ids}
+    for room_id, check_in, check_out in await get_open_stays(db, room_ids, _midnight(today), _midnight(horizon)):
+        stays[room_id].append((check_in, check_out))
+
+    async with cache.client.pipeline(transaction=True) as pipe:
+        for room_id, room_stays in stays.items():
+            pipe.set(_key(room_id), occupancy_bits(room_stays, until))
+        if stays:
+            pipe.hset(BUILT_UNTIL_KEY, mapping=dict.fromkeys(stays, until))
+        await pipe.execute()
+
+    return until
+
+
+async def enqueue_refresh(pool: ArqRedis, room_id: int) -> Job | None:
+    """Queue a `refresh_room_availability` job rebuilding the room's bitmap after the change just committed.
+
+    arq drops a job whose id is still queued or running, so a fixed id would lose a change committed while the
+    rebuild reads Postgres. Every change gets its own job instead, numbered by a per-room version: a job is
+    skipped by the worker once a later version is queued (see `refresh_superseded`), the last one always runs.
+    """
+    version = await pool.hincrby(REFRESH_VERSION_KEY, str(room_id), 1)
+    return await pool.enqueue_job(
+        "refresh_room_availability", room_id, version, _job_id=f"room_availability:{room_id}:{version}"
+    )
+
+
+async def refresh_superseded(redis: Redis, room_id: int, version: int | None) -> bool:
+    """Whether a later `refresh_room_availability` job than `version` is queued for the room."""
+    if version is None:
+        return False
+    latest = await redis.hget(REFRESH_VERSION_KEY, str(room_id))
+    return latest is not None and int(latest) > version
+
+
+async def mark(room_id: int, check_in: datetime, check_out: datetime, occupied: bool) -> bool:
+    """Set (or clear) the nights of a stay in the room's bitmap, in one `BITFIELD` call.
+
+    Nothing is written for a room whose bitmap was never built: its availability is answered by Postgres until
+    the `refresh_room_availability` job builds it.
+
+    Returns
+    -------
+    bool
+        Whether the bitmap was updated.
+    """
+    if cache.client is None:
+        raise MissingClientError
+
+    built_until = await cache.client.hget(BUILT_UNTIL_KEY, room_id)
+    if built_until is None:
+        return False
+
+    start, end = nights(check_in, check_out)
+    start, end = max(start, night_offset(datetime.now(UTC))), min(end, int(built_until))
+    if start >= end:
+        return False
+
+    bitfield = cache.client.bitfield(_key(room_id))
+    for offset in range(start, end):
+        bitfield.set("u1", offset, int(occupied))
+    await bitfield.execute()
+    return True
+
+
+async def check(
+    db: AsyncSession, room_ids: list[int], check_in: datetime, check_out: datetime
+) -> tuple[dict[int, bool], list[int]]:
+    """Check whether each room is free for a stay.
+
+    The bitmaps of all the rooms are fetched in one pipeline and tested together. Rooms without a bitmap
+    covering the stay (never built, beyond the horizon, or a stay starting in the past) are answered by a
+    single Postgres query instead, as are all the rooms when Redis fails.
+
+    Returns
+    -------
+    tuple[dict[int, bool], list[int]]
+        room_id -> available, and the rooms that were answered by Postgres.
+    """
+    start, end = nights(check_in, check_out)
+    available: dict[int, bool] = {}
+    unknown = list(dict.fromkeys(room_ids))
+
+    if cache.client is not None and unknown and start >= night_offset(datetime.now(UTC)):
+        try:
+            async with cache.client.pipeline(transaction=False) as pipe:
+                pipe.hmget(BUILT_UNTIL_KEY, unknown)
+                for room_id in unknown:
+                    pipe.getrange(_key(room_id), start // 8, (end - 1) // 8)
+                built_until, *chunks = await pipe.execute()
+        except RedisError as e:
+            logger.warning(f"Could not read the occupancy bitmaps, checking {len(unknown)} rooms in Postgres: {e!r}")
+        else:
+            busy = busy_rows(chunks, start, end)
+            covered = [until is not None and int(until) >= end for until in built_until]
+            available = {room_id: not busy[i] for i, room_id in enumerate(unknown) if covered[i]}
+            unknown = [room_id for i, room_id in enumerate(unknown) if not covered[i]]
+
+    if unknown:
+        window_start, window_end = EPOCH + timedelta(days=start), EPOCH + timedelta(days=end)
+        taken = set()
+        for room_id, stay_in, stay_out in await get_open_stays(
+            db, unknown, _midnight(window_start), _midnight(window_end)
+        ):
+            # the query works on timestamps, keep only the stays actually sharing a night
+            stay_start, stay_end = nights(stay_in, stay_out)
+            if stay_start < end and stay_end > start:
+                taken.add(room_id)
+        available.update({room_id: room_id not in taken for room_id in unknown})
+
+    return available, unknown
@@ -0,0 +1,168 @@
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from datetime import date, datetime
+
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ...crud.crud_rate_plan import get_pricing_rules
+from ...crud.crud_rooms import get_prices
+from ..config import settings
+from .occupancy import EPOCH, night_offset, nights
+from .worker_cache import WorkerCache
+
+# weekday of night offset 0, Monday being 0
+_EPOCH_WEEKDAY = EPOCH.weekday()
+
+
+@dataclass(frozen=True, eq=False)
+class CompiledPlan:
+    """A rate plan as numpy arrays, ready to price any range of nights."""
+
+    # Monday first
+    weekday_multipliers: np.ndarray = field(default_factory=lambda: np.ones(7))
+    season_starts: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.int64))
+    season_ends: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.int64))
+    season_multipliers: np.ndarray = field(default_factory=lambda: np.empty(0))
+    # NaN for seasons without a fixed price
+    season_prices: np.ndarray = field(default_factory=lambda: np.empty(0))
+    # sorted ascending
+    los_min_nights: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.int64))
+    los_discounts: np.ndarray = field(default_factory=lambda: np.empty(0))
+
+    def factors(self, start: int, end: int) -> tuple[np.ndarray, np.ndarray]:
+        """Return, for each night offset in `[start, end)`, its multiplier of `Room.price` and its fixed price.
+
+        The fixed price is NaN for nights outside a season with a fixed price.
+        """
+        offsets = np.arange(start, end, dtype=np.int64)
+        weekdays = self.weekday_multipliers[(offsets + _EPOCH_WEEKDAY) % 7]
+        if not len(self.season_starts):
+            return weekdays, np.full(len(offsets), np.nan)
+
+        # seasons x nights, the last matching season of the list wins
+        in_season = (offsets >= self.season_starts[:, None]) & (offsets < self.season_ends[:, None])
+        matched = in_season.any(axis=0)
+        season = len(in_season) - 1 - in_season[::-1].argmax(axis=0)
+        multipliers = np.where(matched, self.season_multipliers[season], 1.0) * weekdays
+        prices = np.where(matched, self.season_prices[season], np.nan) * weekdays
+        return multipliers, prices
+
+    def discount(self, night_count: int) -> float:
+        """Return the discount of the longest length-of-stay rule `night_count` qualifies for."""
+        i = int(np.searchsorted(self.los_min_nights, night_count, side="right")) - 1
+        return float(self.los_discounts[i]) if i >= 0 else 0.0
+
+
+# rooms without a rate plan, nor a default one, are sold at `Room.price` every night
+FLAT_PLAN = CompiledPlan()
+
+
+def _offset(value: str | date) -> int:
+    return night_offset(value if isinstance(value, date) else date.fromisoformat(value))
+
+
+def compile_plan(rules: dict) -> CompiledPlan:
+    """Compile the `weekday_multipliers`, `seasons` and `length_of_stay` rules of a rate plan."""
+    seasons = rules.get("seasons") or []
+    length_of_stay = sorted(rules.get("length_of_stay") or [], key=lambda rule: rule["min_nights"])
+    return CompiledPlan(
+        weekday_multipliers=np.asarray(rules.get("weekday_multipliers") or [1.0] * 7, dtype=np.float64),
+        season_starts=np.array([_offset(season["start"]) for season in seasons], dtype=np.int64),
+        season_ends=np.array([_offset(season["end"]) for season in seasons], dtype=np.int64),
+        season_multipliers=np.array([season.get("multiplier", 1.0) for season in seasons], dtype=np.float64),
+        season_prices=np.array(
+            [np.nan if season.get("price") is None else season["price"] for season in seasons], dtype=np.float64
+        ),
+        los_min_nights=np.array([rule["min_nights"] for rule in length_of_stay], dtype=np.int64),
+        los_discounts=np.array([rule["discount"] for rule in length_of_stay], dtype=np.float64),
+    )
+
+
+def price_nights(
+    base_prices: Sequence[float], plans: Sequence[CompiledPlan], start: int, end: int
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Price the nights `[start, end)` of many rooms at once.
+
+    Each distinct plan is evaluated once over the nights, then broadcast over the base prices of the rooms
+    sharing it, so the cost grows with rooms x nights in numpy rather than in Python.
+
+    Parameters
+    ----------
+    base_prices: Sequence[float]
+        The `Room.price` of each room.
+    plans: Sequence[CompiledPlan]
+        The plan of each room, rooms sharing a plan should share the same object.
+    start: int
+        The first night offset.
+    end: int
+        The night offset after the last night.
+
+    Returns
+    -------
+    tuple[np.ndarray, np.ndarray, np.ndarray]
+        The rooms x nights price matrix, the length-of-stay discount rate and the total of each room, prices
+        rounded to cents.
+    """
+    base = np.asarray(base_prices, dtype=np.float64)
+    nightly = np.empty((len(base), end - start), dtype=np.float64)
+    discounts = np.zeros(len(base), dtype=np.float64)
+
+    groups: dict[int, tuple[CompiledPlan, list[int]]] = {}
+    for i, plan in enumerate(plans):
+        groups.setdefault(id(plan), (plan, []))[1].append(i)
+    for plan, rows in groups.values():
+        multipliers, prices = plan.factors(start, end)
+        nightly[rows] = np.where(np.isnan(prices), base[rows, None] * multipliers, prices)
+        discounts[rows] = plan.discount(end - start)
+
+    nightly = np.round(nightly, 2)
+    totals = np.round(nightly.sum(axis=1) * (1 - discounts), 2)
+    return nightly, discounts, totals
+
+
+# per worker: room_id or None for the default plan -> compiled plan
+_plans: WorkerCache[dict[int | None, CompiledPlan]] = WorkerCache()
+
+
+def invalidate() -> None:
+    """Drop this worker's compiled rate plans, other workers reload theirs within `RATE_PLAN_CACHE_TTL`."""
+    _plans.invalidate()
+
+
+async def get_plans(db: AsyncSession) -> dict[int | None, CompiledPlan]:
+    async def load() -> dict[int | None, CompiledPlan]:
+        return {plan["room_id"]: compile_plan(plan) for plan in await get_pricing_rules(db)}
+
+    return await _plans.get(load, settings.RATE_PLAN_CACHE_TTL)
+
+
+async def quote(
+    db: AsyncSession, room_ids: Sequence[int], check_in: datetime, check_out: datetime
+) -> dict[int, dict]:
+    """Price a stay in each of `room_ids`, with each room's rate plan (or the default one).
+
+    Returns
+    -------
+    dict[int, dict]
+        room_id -> `{"room_id", "nightly", "subtotal", "discount", "total"}`, missing rooms are left out.
+    """
+    prices = await get_prices(db, list(room_ids))
+    plans = await get_plans(db)
+    default = plans.get(None, FLAT_PLAN)
+
+    rooms = list(prices)
+    start, end = nights(check_in, check_out)
+    nightly, discounts, totals = price_nights(
+        [prices[room_id] for room_id in rooms], [plans.get(room_id, default) for room_id in rooms], start, end
+    )
+    return {
+        room_id: {
+            "room_id": room_id,
+            "nightly": nightly[i].tolist(),
+            "subtotal": round(float(nightly[i].sum()), 2),
+            "discount": float(discounts[i]),
+            "total": float(totals[i]),
+        }
+        for i, room_id in enumerate(rooms)
+    }
@@ -0,0 +1,58 @@
+import orjson
+
+from ..config import settings
+from ..exceptions.cache_exceptions import MissingClientError
+from . import cache
+
+# per generation: normalized filter (see `filter_key`) -> facet counts of the live rooms matching it
+ROOM_FACETS_KEY = "room_facets:{generation}"
+# bumped by every room write, so counts read before a write are stored where no later read looks
+GENERATION_KEY = "room_facets:generation"
+
+
+def filter_key(
+    min_price: float | None,
+    max_price: float | None,
+    feature_ids: list[int],
+    badge_ids: list[int],
+    price_bucket: float,
+) -> str:
+    """Normalize a filter state, so equivalent filters (ids repeated or in another order) share their counts."""
+    return orjson.dumps(
+        [min_price, max_price, sorted(set(feature_ids)), sorted(set(badge_ids)), price_bucket]
+    ).decode()
+
+
+async def get(key: str) -> tuple[dict | None, int]:
+    """Return the cached counts of a filter state (None if missing), and the generation to store them under."""
+    if cache.client is None:
+        raise MissingClientError
+
+    generation = int(await cache.client.get(GENERATION_KEY) or 0)
+    facets = await cache.client.hget(ROOM_FACETS_KEY.format(generation=generation), key)
+    return (orjson.loads(facets) if facets is not None else None), generation
+
+
+async def store(key: str, facets: dict, generation: int) -> None:
+    """Store the counts of a filter state under the generation read before counting, for `ROOM_FACETS_CACHE_TTL`
+    seconds at most.
+
+    All the filter states of a generation expire together, `ROOM_FACETS_CACHE_TTL` seconds after the first one is
+    stored, which bounds both the staleness and the number of stored states.
+    """
+    if cache.client is None:
+        raise MissingClientError
+
+    facets_key = ROOM_FACETS_KEY.format(generation=generation)
+    async with cache.client.pipeline(transaction=True) as pipe:
+        pipe.hset(facets_key, key, orjson.dumps(facets))
+        pipe.expire(facets_key, settings.ROOM_FACETS_CACHE_TTL, nx=True)
+        await pipe.execute()
+
+
+async def invalidate() -> None:
+    """Start a new generation, the counts of the previous ones are never read again and expire."""
+    if cache.client is None:
+        raise MissingClientError
+
+    await cache.client.incr(GENERATION_KEY)
@@ -0,0 +1,210 @@
+from collections.abc import Sequence
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ...models.room import Room
+from ..config import settings
+from .worker_cache import WorkerCache
+
+
+def _capacity(size: int) -> int:
+    # a multiple of 64 rooms, so every bitset is a whole number of bytes
+    return max(64, (size + 63) // 64 * 64)
+
+
+def _set_bit(bits: np.ndarray, position: int, value: bool) -> None:
+    # `np.packbits` order: the first room of a byte is its most significant bit
+    mask = 0x80 >> (position & 7)
+    if value:
+        bits[position >> 3] |= mask
+    else:
+        bits[position >> 3] &= ~mask & 0xFF
+
+
+def _bitsets(positions: dict[int, list[int]], capacity: int) -> dict[int, np.ndarray]:
+    bitsets = {}
+    for key, rows in positions.items():
+        bits = np.zeros(capacity, dtype=bool)
+        bits[rows] = True
+        bitsets[key] = np.packbits(bits)
+    return bitsets
+
+
+class RoomIndex:
+    """In-memory index of the rooms answering `room_filters` queries without Postgres.
+
+    Rooms are kept in id order, room `i` being bit `i` of one bitset per feature id, one per badge id and one of
+    the live rooms, next to an array of the room prices.
+
+    Parameters
+    ----------
+    rooms: Sequence[tuple[int, bool, float, list[int], list[int]]]
+        `(id, is_deleted, price, feature_ids, badge_ids)` of every room, ordered by id.
+
+    Note
+    ----
+        - A filter is a vectorized AND of the bitsets of its features and badges with the live rooms, and of the
+          rooms within the price range, found by a binary search in the prices sorted once per price change.
+        - Rooms are never removed, deleted ones only leave the live bitset, so positions (and the id order) hold.
+        - Rooms created with an id above the last one are appended, the arrays growing by doubling.
+    """
+
+    def __init__(self, rooms: Sequence[tuple[int, bool, float, list[int], list[int]]]) -> None:
+        self.size = len(rooms)
+        self.capacity = _capacity(self.size)
+        self.ids = np.zeros(self.capacity, dtype=np.int64)
+        self.prices = np.zeros(self.capacity, dtype=np.float64)
+        self.positions: dict[int, int] = {}
+
+        live = np.zeros(self.capacity, dtype=bool)
+        features: dict[int, list[int]] = {}
+        badges: dict[int, list[int]] = {}
+        for position, (id, is_deleted, price, feature_ids, badge_ids) in enumerate(rooms):
+            self.ids[position], self.prices[position], live[position] = id, price, not is_deleted
+            self.positions[id] = position
+            for feature_id in feature_ids or ():
+                features.setdefault(feature_id, []).append(position)
+            for badge_id in badge_ids or ():
+                badges.setdefault(badge_id, []).append(position)
+
+        self.live = np.packbits(live)
+        self.features = _bitsets(features, self.capacity)
+        self.badges = _bitsets(badges, self.capacity)
+        self._by_price: tuple[np.ndarray, np.ndarray] | None = None
+
+    def filter(
+        self,
+        min_price: float | None = None,
+        max_price: float | None = None,
+        feature_ids: Sequence[int] = (),
+        badge_ids: Sequence[int] = (),
+    ) -> np.ndarray:
+        """Return the ids of the live rooms matching the filters (as `room_filters`), in id order."""
+        bits = self.live.copy()
+        for bitsets, ids in ((self.features, feature_ids), (self.badges, badge_ids)):
+            for id in set(ids):
+                if id not in bitsets:
+                    return self.ids[:0]
+                np.bitwise_and(bits, bitsets[id], out=bits)
+        if min_price is not None or max_price is not None:
+            np.bitwise_and(bits, self._price_bits(min_price, max_price), out=bits)
+        return self.ids[np.flatnonzero(np.unpackbits(bits, count=self.size))]
+
+    def _price_bits(self, min_price: float | None, max_price: float | None) -> np.ndarray:
+        if self._by_price is None:
+            order = np.argsort(self.prices[: self.size], kind="stable")
+            self._by_price = (order, self.prices[order])
+        order, sorted_prices = self._by_price
+
+        start = 0 if min_price is None else np.searchsorted(sorted_prices, min_price, side="left")
+        end = self.size if max_price is None else np.searchsorted(sorted_prices, max_price, side="right")
+        bits = np.zeros(self.capacity, dtype=bool)
+        bits[order[start:end]] = True
+        return np.packbits(bits)
+
+    def write(
+        self,
+        id: int,
+        price: float | None = None,
+        feature_ids: list[int] | None = None,
+        badge_ids: list[int] | None = None,
+    ) -> bool:
+        """Apply a room create or update, None values being left unchanged.
+
+        Returns
+        -------
+        bool
+            False if the room can not be added in id order (nor its position known), the index must be reloaded.
+        """
+        position = self.positions.get(id)
+        if position is None:
+            if (self.size and id < self.ids[self.size - 1]) or price is None:
+                return False
+            position = self._append(id)
+
+        if price is not None:
+            self.prices[position] = price
+            self._by_price = None
+        if feature_ids is not None:
+            self._assign(self.features, position, feature_ids)
+        if badge_ids is not None:
+            self._assign(self.badges, position, badge_ids)
+        return True
+
+    def set_live(self, id: int, live: bool) -> bool:
+        """Mark a room deleted or restored, False if it is not indexed."""
+        position = self.positions.get(id)
+        if position is None:
+            return False
+        _set_bit(self.live, position, live)
+        return True
+
+    def _append(self, id: int) -> int:
+        if self.size == self.capacity:
+            grow = self.capacity
+            self.ids = np.concatenate([self.ids, np.zeros(grow, dtype=np.int64)])
+            self.prices = np.concatenate([self.prices, np.zeros(grow, dtype=np.float64)])
+            for bitsets in (self.features, self.badges):
+                for key, bits in bitsets.items():
+                    bitsets[key] = np.concatenate([bits, np.zeros(grow // 8, dtype=np.uint8)])
+            self.live = np.concatenate([self.live, np.zeros(grow // 8, dtype=np.uint8)])
+            self.capacity += grow
+
+        position = self.size
+        self.ids[position] = id
+        self.positions[id] = position
+        self.size += 1
+        self._by_price = None
+        _set_bit(self.live, position, True)
+        return position
+
+    def _assign(self, bitsets: dict[int, np.ndarray], position: int, ids: list[int]) -> None:
+        for bits in bitsets.values():
+            _set_bit(bits, position, False)
+        for id in set(ids):
+            if id not in bitsets:
+                bitsets[id] = np.zeros(self.capacity // 8, dtype=np.uint8)
+            _set_bit(bitsets[id], position, True)
+
+
+_index: WorkerCache[RoomIndex] = WorkerCache()
+
+
+async def get_index(db: AsyncSession) -> RoomIndex:
+    """Return this worker's room index, loading it if it is missing or older than `ROOM_INDEX_TTL`."""
+
+    async def load() -> RoomIndex:
+        stmt = select(Room.id, Room.is_deleted, Room.price, Room.feature_ids, Room.badge_ids).order_by(Room.id)
+        return RoomIndex((await db.execute(stmt)).tuples().all())
+
+    return await _index.get(load, settings.ROOM_INDEX_TTL)
+
+
+def room_written(
+    id: int, price: float | None, feature_ids: list[int] | None = None, badge_ids: list[int] | None = None
+) -> None:
+    """Apply a room create or update to this worker's index, other workers reload theirs within `ROOM_INDEX_TTL`."""
+    index = _index.value
+    if index is not None and not index.write(id, price, feature_ids, badge_ids):
+        invalidate()
+
+
+def room_deleted(id: int) -> None:
+    """Drop a deleted room from the filters of this worker's index."""
+    index = _index.value
+    if index is not None and not index.set_live(id, False):
+        invalidate()
+
+
+def room_restored(id: int) -> None:
+    """Bring a restored room back in the filters of this worker's index."""
+    index = _index.value
+    if index is not None and not index.set_live(id, True):
+        invalidate()
+
+
+def invalidate() -> None:
+    """Drop this worker's index, it is reloaded on the next filter."""
+    _index.invalidate()
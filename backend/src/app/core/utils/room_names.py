@@ -0,0 +1,109 @@
+from bisect import bisect_left, insort
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ...models.room import Room
+from ..config import settings
+from ..logger import logging
+from .worker_cache import WorkerCache
+
+logger = logging.getLogger(__name__)
+
+
+def _key(name: str) -> str:
+    return name.casefold()
+
+
+class RoomNameIndex:
+    """Sorted array of room names, answering case-insensitive prefix lookups with a binary search.
+
+    Parameters
+    ----------
+    rooms: list[tuple[int, str]]
+        `(id, name)` of the live rooms.
+    max_names: int
+        At most this many names are kept, the alphabetically first ones.
+
+    Note
+    ----
+        - Names are kept as `(casefolded name, name, id)` tuples in one sorted list, a lookup is a `bisect` and a
+          scan of the matching run, so it does not depend on the size of the catalog.
+        - Past `max_names`, the last names (alphabetically) are dropped and never suggested.
+    """
+
+    __slots__ = ("entries", "names", "max_names", "truncated")
+
+    def __init__(self, rooms: list[tuple[int, str]], max_names: int) -> None:
+        entries = sorted((_key(name), name, id) for id, name in rooms)
+        self.max_names = max_names
+        self.truncated = len(entries) > max_names
+        self.entries: list[tuple[str, str, int]] = entries[:max_names]
+        self.names = {id: name for _, name, id in self.entries}
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def suggest(self, prefix: str, limit: int) -> list[dict]:
+        """Return up to `limit` rooms whose name starts with `prefix` (case-insensitive), by name."""
+        key = _key(prefix)
+        suggestions = []
+        for i in range(bisect_left(self.entries, (key,)), len(self.entries)):
+            entry_key, name, id = self.entries[i]
+            if not entry_key.startswith(key) or len(suggestions) == limit:
+                break
+            suggestions.append({"id": id, "name": name})
+        return suggestions
+
+    def add(self, id: int, name: str) -> None:
+        self.remove(id)
+        entry = (_key(name), name, id)
+        if len(self.entries) >= self.max_names:
+            self.truncated = True
+            if entry > self.entries[-1]:
+                return
+            _, _, dropped = self.entries.pop()
+            del self.names[dropped]
+        insort(self.entries, entry)
+        self.names[id] = name
+
+    def remove(self, id: int) -> None:
+        name = self.names.pop(id, None)
+        if name is not None:
+            del self.entries[bisect_left(self.entries, (_key(name), name, id))]
+
+
+_index: WorkerCache[RoomNameIndex] = WorkerCache()
+
+
+async def get_index(db: AsyncSession) -> RoomNameIndex:
+    """Return this worker's room name index, loading it if it is missing or older than `ROOM_SUGGEST_TTL`."""
+
+    async def load() -> RoomNameIndex:
+        rooms = (await db.execute(select(Room.id, Room.name).where(~Room.is_deleted))).all()
+        index = RoomNameIndex([(id, name) for id, name in rooms], settings.ROOM_SUGGEST_MAX_NAMES)
+        if index.truncated:
+            logger.warning(f"{len(rooms)} rooms, only the first {len(index)} names are suggested")
+        return index
+
+    return await _index.get(load, settings.ROOM_SUGGEST_TTL)
+
+
+def room_written(id: int, name: str | None) -> None:
+    """Apply a room create, rename or restore to this worker's index, other workers reload theirs within
+    `ROOM_SUGGEST_TTL`."""
+    index = _index.value
+    if index is not None and name is not None:
+        index.add(id, name)
+
+
+def room_deleted(id: int) -> None:
+    """Drop a deleted room from this worker's index."""
+    index = _index.value
+    if index is not None:
+        index.remove(id)
+
+
+def invalidate() -> None:
+    """Drop this worker's index, it is reloaded on the next lookup."""
+    _index.invalidate()
@@ -0,0 +1,38 @@
+import time
+from collections.abc import Awaitable, Callable
+from typing import Generic, TypeVar
+
+T = TypeVar("T")
+
+
+class WorkerCache(Generic[T]):
+    """A value kept in the memory of each worker and reloaded once it is older than a TTL.
+
+    Writes made on one worker can update its own value in place (see `value`), other workers only see them once
+    their copy expires, so the TTL bounds how stale a worker can be.
+    """
+
+    __slots__ = ("_entry",)
+
+    def __init__(self) -> None:
+        # (monotonic load time, value)
+        self._entry: tuple[float, T] | None = None
+
+    @property
+    def value(self) -> T | None:
+        """The loaded value, even if expired, None if it is not loaded."""
+        return None if self._entry is None else self._entry[1]
+
+    async def get(self, load: Callable[[], Awaitable[T]], ttl: float) -> T:
+        """Return the value, calling `load` if it is missing or older than `ttl` seconds."""
+        if self._entry is None or time.monotonic() - self._entry[0] > ttl:
+            self._entry = (time.monotonic(), await load())
+        return self._entry[1]
+
+    def set(self, value: T) -> None:
+        """Keep `value` as if it was just loaded."""
+        self._entry = (time.monotonic(), value)
+
+    def invalidate(self) -> None:
+        """Drop the value, it is reloaded on the next `get`."""
+        self._entry = None
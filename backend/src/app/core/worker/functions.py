@@ -1,8 +1,37 @@
 import asyncio
 import logging
+import os
+import time
+from datetime import UTC, date, datetime, timedelta
+from pathlib import Path
 
 import uvloop
+from arq import Retry
+from arq.connections import ArqRedis
 from arq.worker import Worker
+from redis.asyncio import ConnectionPool, Redis
+from redis.exceptions import RedisError
+from sqlalchemy import func, select, union_all
+from sqlalchemy.exc import SQLAlchemyError
+
+from ...crud.crud_booking import SOLD_BOOKING_STATUSES, crud_bookings, transition_due_bookings
+from ...crud.crud_booking_archive import archive_due_bookings
+from ...crud.crud_booking_daily_rollup import recompute_daily_rollup
+from ...models.booking import Booking
+from ...models.booking_archive import BookingArchive
+from ...models.booking_audit import BookingAudit
+from ...models.room import Room
+from ...schemas.booking import BookingRead
+from ..config import settings
+from ..db import partitions
+from ..db.database import local_session
+from ..utils import booking_jobs, cache, occupancy
+from ..utils.image_storage import LocalImageStorage, get_image_storage
+
+try:
+    from PIL import Image
+except ImportError:  # pragma: no cover - Pillow is only needed by the worker
+    Image = None
 
 asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
 
@@ -15,10 +44,281 @@ async def sample_background_task(ctx: Worker, name: str) -> str:
     return f"Task {name} is complete!"
 
 
+def _resize_image(original: Path, target: Path, width: int) -> bool:
+    with Image.open(original) as image:
+        if image.width <= width:
+            return False
+
+        height = round(image.height * width / image.width)
+        resized = image.resize((width, height), Image.LANCZOS)
+        tmp = target.with_suffix(".tmp")
+        resized.save(tmp, format="WEBP", quality=80, method=4)
+        os.replace(tmp, target)
+        return True
+
+
+async def generate_image_variants(ctx: Worker, digest: str) -> list[str]:
+    storage = get_image_storage()
+    if not isinstance(storage, LocalImageStorage):
+        return []
+
+    if Image is None:
+        logging.warning("Pillow is not installed, skipping image variants")
+        return []
+
+    originals = sorted(storage.directory(digest).glob("original.*"))
+    if not originals:
+        logging.warning(f"Image {digest} not found, skipping variants")
+        return []
+
+    generated = []
+    for width in storage.widths_for(originals[0]):
+        target = storage.directory(digest) / storage.variant_name(width)
+        if target.exists():
+            continue
+        if await asyncio.to_thread(_resize_image, originals[0], target, width):
+            generated.append(target.name)
+
+    return generated
+
+
+# -------- booking side effects --------
+def _retry(ctx: Worker) -> Retry:
+    """Back off linearly between attempts; arq gives up after the function's `max_tries`."""
+    return Retry(defer=ctx["job_try"] * 5)
+
+
+async def send_booking_notification(ctx: Worker, booking_id: int, event: str) -> bool:
+    try:
+        async with local_session() as db:
+            booking = await crud_bookings.get(db=db, schema_to_select=BookingRead, id=booking_id)
+    except SQLAlchemyError as e:
+        logging.warning(f"Could not load booking {booking_id} for notification: {e}")
+        raise _retry(ctx)
+
+    if booking is None:
+        logging.warning(f"Booking {booking_id} not found, skipping {event} notification")
+        return False
+
+    # no mail transport is configured yet, the notification is only logged
+    logging.info(
+        f"Booking {event} notification for {booking['guest_email']}: room {booking['room_id']}, "
+        f"{booking['check_in']:%Y-%m-%d} to {booking['check_out']:%Y-%m-%d}"
+    )
+    return True
+
+
+async def refresh_room_availability(ctx: Worker, room_id: int, version: int | None = None) -> None:
+    """Rebuild the room's occupancy bitmap from Postgres, the only cached state a booking change makes stale.
+
+    Skipped when a later refresh of the room is queued (see `occupancy.enqueue_refresh`), which rebuilds it anyway.
+    """
+    try:
+        if await occupancy.refresh_superseded(ctx["redis"], room_id, version):
+            return
+        async with local_session() as db:
+            await occupancy.rebuild(db, [room_id])
+    except (RedisError, SQLAlchemyError) as e:
+        logging.warning(f"Could not refresh availability of room {room_id}: {e}")
+        raise _retry(ctx)
+
+
+async def record_booking_audit(
+    ctx: Worker, booking_id: int, action: str, status: str | None = None, details: dict | None = None
+) -> None:
+    try:
+        async with local_session() as db:
+            db.add(BookingAudit(booking_id=booking_id, action=action, status=status, details=details))
+            await db.commit()
+    except SQLAlchemyError as e:
+        logging.warning(f"Could not record {action} audit entry for booking {booking_id}: {e}")
+        raise _retry(ctx)
+
+
+async def refresh_booking_rollup(ctx: Worker, room_id: int, start: date, end: date, version: int | None = None) -> int:
+    """Recompute the room's rollup over `[start, end)`.
+
+    Skipped when a later refresh of the same range is queued (see `booking_jobs.enqueue_rollup_refresh`).
+    """
+    try:
+        if await booking_jobs.rollup_refresh_superseded(ctx["redis"], room_id, start, end, version):
+            return 0
+        async with local_session() as db:
+            return await recompute_daily_rollup(db, start, end, room_id)
+    except (RedisError, SQLAlchemyError) as e:
+        logging.warning(f"Could not refresh the rollup of room {room_id} from {start} to {end}: {e}")
+        raise _retry(ctx)
+
+
+# -------- analytics --------
+ROLLUP_REBUILD_CHUNK_DAYS = 31
+
+
+async def rebuild_booking_rollup(ctx: Worker, start: date | None = None, end: date | None = None) -> int:
+    """Rebuild `booking_daily_rollup` over `[start, end)`, by default every day a sold booking covers, archived or not.
+
+    The range is recomputed one chunk of `ROLLUP_REBUILD_CHUNK_DAYS` at a time, each in its own transaction.
+    """
+    started = time.perf_counter()
+    if start is None or end is None:
+        async with local_session() as db:
+            stays = union_all(
+                select(Booking.check_in, Booking.check_out).where(Booking.status.in_(SOLD_BOOKING_STATUSES)),
+                select(BookingArchive.check_in, BookingArchive.check_out).where(
+                    BookingArchive.status.in_(SOLD_BOOKING_STATUSES)
+                ),
+            ).subquery()
+            first_check_in, last_check_out = (
+                await db.execute(select(func.min(stays.c.check_in), func.max(stays.c.check_out)))
+            ).one()
+        if first_check_in is None:
+            return 0
+        start = start or first_check_in.astimezone(UTC).date()
+        end = end or last_check_out.astimezone(UTC).date() + timedelta(days=1)
+
+    written, chunk_start = 0, start
+    while chunk_start < end:
+        chunk_end = min(chunk_start + timedelta(days=ROLLUP_REBUILD_CHUNK_DAYS), end)
+        async with local_session() as db:
+            written += await recompute_daily_rollup(db, chunk_start, chunk_end)
+        chunk_start = chunk_end
+
+    logging.info(
+        f"Rebuilt the booking rollup from {start} to {end}: {written} rows "
+        f"in {(time.perf_counter() - started) * 1e3:.1f} ms"
+    )
+    return written
+
+
+# -------- scheduled jobs --------
+async def _transition_in_batches(
+    redis: ArqRedis, from_statuses: tuple[str, ...], to_status: str, due_column: str, cutoff: datetime
+) -> tuple[int, int]:
+    transitioned, batches = 0, 0
+    while batches < settings.BOOKING_TRANSITION_MAX_BATCHES:
+        started = time.perf_counter()
+        async with local_session() as db:
+            rows = await transition_due_bookings(
+                db, from_statuses, to_status, due_column, cutoff, settings.BOOKING_TRANSITION_BATCH_SIZE
+            )
+        # the same audit, availability and rollup refreshes as a `POST /booking/{id}/status`
+        await asyncio.gather(
+            *(
+                booking_jobs.enqueue_side_effects(redis, id, [(room_id, check_in, check_out)], "updated", to_status)
+                for id, room_id, check_in, check_out in rows
+            )
+        )
+
+        batches += 1
+        transitioned += len(rows)
+        elapsed = (time.perf_counter() - started) * 1e3
+        logging.info(
+            f"{to_status}: batch {batches} moved {len(rows)} bookings in {elapsed:.1f} ms ({transitioned} so far)"
+        )
+        if len(rows) < settings.BOOKING_TRANSITION_BATCH_SIZE:
+            break
+
+    return transitioned, batches
+
+
+async def auto_transition_bookings(ctx: Worker) -> dict[str, int]:
+    """Move past-due bookings out of `OPEN_BOOKING_STATUSES`, the set the overlap checks scan.
+
+    - Without check-in tracking, `booked` bookings past their check-out become `checked_out`.
+    - With `BOOKING_TRACK_CHECK_IN`, `checked_in` ones past check-out become `checked_out`, and `booked` ones
+      never checked in `BOOKING_NO_SHOW_GRACE_HOURS` after check-in become `no_show`.
+
+    Work is done in bounded batches (one short transaction each) and the run's metrics are stored in the
+    `booking_transitions:last_run` Redis hash.
+    """
+    started = time.perf_counter()
+    now = datetime.now(UTC)
+    metrics = {"checked_out": 0, "no_show": 0, "batches": 0}
+
+    if settings.BOOKING_TRACK_CHECK_IN:
+        no_show_cutoff = now - timedelta(hours=settings.BOOKING_NO_SHOW_GRACE_HOURS)
+        metrics["no_show"], batches = await _transition_in_batches(
+            ctx["redis"], ("booked",), "no_show", "check_in", no_show_cutoff
+        )
+        metrics["batches"] += batches
+        from_statuses: tuple[str, ...] = ("checked_in",)
+    else:
+        from_statuses = ("booked",)
+
+    metrics["checked_out"], batches = await _transition_in_batches(
+        ctx["redis"], from_statuses, "checked_out", "check_out", now
+    )
+    metrics["batches"] += batches
+    metrics["duration_ms"] = round((time.perf_counter() - started) * 1e3)
+
+    await ctx["redis"].hset("booking_transitions:last_run", mapping={**metrics, "finished_at": now.isoformat()})
+    logging.info(f"Booking transitions done: {metrics}")
+    return metrics
+
+
+async def rebuild_room_occupancy(ctx: Worker) -> int:
+    """Rebuild every room's occupancy bitmap, which also moves their horizon forward as days pass."""
+    started = time.perf_counter()
+    async with local_session() as db:
+        room_ids = list((await db.execute(select(Room.id).where(Room.is_deleted.is_(False)))).scalars())
+        await occupancy.rebuild(db, room_ids)
+
+    logging.info(f"Rebuilt the occupancy of {len(room_ids)} rooms in {(time.perf_counter() - started) * 1e3:.1f} ms")
+    return len(room_ids)
+
+
+async def maintain_booking_partitions(ctx: Worker) -> dict[str, list[str]]:
+    """Create the monthly `booking` partitions `BOOKING_PARTITION_MONTHS_AHEAD` months ahead, and detach to the
+    archive schema those older than `BOOKING_PARTITION_RETENTION_MONTHS` (when set)."""
+    current = partitions.month_start(datetime.now(UTC))
+    async with local_session() as db:
+        created = await partitions.ensure_partitions(
+            db, current, partitions.add_months(current, settings.BOOKING_PARTITION_MONTHS_AHEAD)
+        )
+        detached = []
+        if settings.BOOKING_PARTITION_RETENTION_MONTHS > 0:
+            detached = await partitions.detach_partitions(
+                db, partitions.add_months(current, -settings.BOOKING_PARTITION_RETENTION_MONTHS)
+            )
+
+    logging.info(f"Booking partitions: created {created or 'none'}, detached {detached or 'none'}")
+    return {"created": created, "detached": detached}
+
+
+async def archive_old_bookings(ctx: Worker) -> dict[str, int]:
+    """Move bookings checked out more than `BOOKING_ARCHIVE_AFTER_DAYS` ago from `booking` to `booking_archive`.
+
+    Work is done in bounded batches (one short transaction each), at most `BOOKING_ARCHIVE_MAX_BATCHES` per run;
+    what is left is picked up by the next run.
+    """
+    if settings.BOOKING_ARCHIVE_AFTER_DAYS <= 0:
+        return {"archived": 0, "batches": 0}
+
+    started = time.perf_counter()
+    cutoff = datetime.now(UTC) - timedelta(days=settings.BOOKING_ARCHIVE_AFTER_DAYS)
+    archived, batches = 0, 0
+    while batches < settings.BOOKING_ARCHIVE_MAX_BATCHES:
+        async with local_session() as db:
+            ids = await archive_due_bookings(db, cutoff, settings.BOOKING_ARCHIVE_BATCH_SIZE)
+        batches += 1
+        archived += len(ids)
+        if len(ids) < settings.BOOKING_ARCHIVE_BATCH_SIZE:
+            break
+
+    logging.info(
+        f"Archived {archived} bookings checked out before {cutoff:%Y-%m-%d} in {batches} batches, "
+        f"{(time.perf_counter() - started) * 1e3:.1f} ms"
+    )
+    return {"archived": archived, "batches": batches}
+
+
 # -------- base functions --------
 async def startup(ctx: Worker) -> None:
+    cache.pool = ConnectionPool.from_url(settings.REDIS_CACHE_URL)
+    cache.client = Redis.from_pool(cache.pool)  # type: ignore
     logging.info("Worker Started")
 
 
 async def shutdown(ctx: Worker) -> None:
+    await cache.client.aclose()  # type: ignore
     logging.info("Worker end")
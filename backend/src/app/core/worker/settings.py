@@ -1,14 +1,46 @@
+from arq import cron
 from arq.connections import RedisSettings
+from arq.worker import func
 
 from ...core.config import settings
-from .functions import sample_background_task, shutdown, startup
+from .functions import (
+    archive_old_bookings,
+    auto_transition_bookings,
+    generate_image_variants,
+    maintain_booking_partitions,
+    rebuild_booking_rollup,
+    rebuild_room_occupancy,
+    record_booking_audit,
+    refresh_booking_rollup,
+    refresh_room_availability,
+    sample_background_task,
+    send_booking_notification,
+    shutdown,
+    startup,
+)
 
 REDIS_QUEUE_HOST = settings.REDIS_QUEUE_HOST
 REDIS_QUEUE_PORT = settings.REDIS_QUEUE_PORT
 
 
 class WorkerSettings:
-    functions = [sample_background_task]
+    functions = [
+        sample_background_task,
+        generate_image_variants,
+        # results are kept for a day so the `_job_id` dedup key also stops late client retries
+        func(send_booking_notification, max_tries=5, keep_result=86400),
+        # no result is kept: while a refresh is queued further ones are coalesced, once it ran a new one can be queued
+        func(refresh_room_availability, max_tries=5, keep_result=0),
+        func(record_booking_audit, max_tries=5),
+        func(refresh_booking_rollup, max_tries=5, keep_result=0),
+        func(rebuild_booking_rollup, timeout=3600, keep_result=0),
+    ]
+    cron_jobs = [
+        cron(auto_transition_bookings, minute={0, 15, 30, 45}, unique=True, timeout=600),
+        cron(rebuild_room_occupancy, hour={0}, minute={5}, unique=True, run_at_startup=True, timeout=600),
+        cron(maintain_booking_partitions, hour={1}, minute={0}, unique=True, run_at_startup=True, timeout=600),
+        cron(archive_old_bookings, hour={2}, minute={0}, unique=True, timeout=1800),
+    ]
     redis_settings = RedisSettings(host=REDIS_QUEUE_HOST, port=REDIS_QUEUE_PORT)
     on_startup = startup
     on_shutdown = shutdown
@@ -1,7 +1,280 @@
+from collections.abc import AsyncIterator, Sequence
+from datetime import UTC, datetime, time, timedelta
+from typing import Any
+
 from fastcrud import FastCRUD
+from sqlalchemy import func, select, text, update
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from ..core.config import settings
 from ..models.booking import Booking
-from ..schemas.booking import BookingCreate, BookingDelete, BookingRead, BookingUpdate, BookingUpdateInternal
+from ..models.room import Room
+from ..models.user import User
+from ..schemas.booking import BookingCreateInternal, BookingDelete, BookingUpdate, BookingUpdateInternal
+
+# bookings that still hold their room: the set overlap checks scan
+OPEN_BOOKING_STATUSES = ("booked", "checked_in")
+# bookings whose nights count as sold; cancelled and no-show bookings never held their room
+SOLD_BOOKING_STATUSES = (*OPEN_BOOKING_STATUSES, "checked_out")
+# status -> the statuses a booking can move to it from; every status change goes through this table
+BOOKING_TRANSITIONS: dict[str, tuple[str, ...]] = {
+    "checked_in": ("booked",),
+    "checked_out": ("booked", "checked_in"),
+    "cancelled": ("booked",),
+    "no_show": ("booked",),
+}
+
+
+def night_bounds(check_in: datetime, check_out: datetime) -> tuple[datetime, datetime]:
+    """Return the UTC midnights starting the first night of a stay and ending its last one.
+
+    A stay occupies the nights from its check-in day up to, not including, its check-out day (see
+    `occupancy.nights`), so a room can be checked out and checked in again on the same day.
+    """
+    first = datetime.combine(check_in.astimezone(UTC).date(), time(), tzinfo=UTC)
+    end = datetime.combine(check_out.astimezone(UTC).date(), time(), tzinfo=UTC)
+    return first, max(end, first + timedelta(days=1))
+
+
+def open_overlap_filters(room_id: int, check_in: datetime, check_out: datetime) -> dict[str, Any]:
+    """Return the `crud_bookings` filters matching the open bookings of a room sharing a night with a stay.
+
+    A booking shares a night with the stay when it checks in before the stay's last night ends and checks out
+    after the day of its first night, the rule of the occupancy bitmaps. No booking is longer than
+    `BOOKING_MAX_NIGHTS`, so an overlapping one checks in at most that long before `check_in`: the lower bound
+    lets Postgres prune every older `booking` partition.
+    """
+    first, end = night_bounds(check_in, check_out)
+    return {
+        "room_id": room_id,
+        "check_in__gte": first - timedelta(days=settings.BOOKING_MAX_NIGHTS + 1),
+        "check_in__lt": end,
+        "check_out__gte": first + timedelta(days=1),
+        "status__in": OPEN_BOOKING_STATUSES,
+        "is_deleted": False,
+    }
+
+
+CRUDBooking = FastCRUD[Booking, BookingCreateInternal, BookingUpdate, BookingUpdateInternal, BookingDelete]
+crud_bookings = CRUDBooking(Booking)
+
+
+def _allowed_from(to_status: str, from_statuses: tuple[str, ...] | None) -> tuple[str, ...]:
+    allowed = BOOKING_TRANSITIONS.get(to_status, ())
+    if from_statuses is None:
+        from_statuses = allowed
+    if not from_statuses or not set(from_statuses) <= set(allowed):
+        raise ValueError(f"Bookings can not move from {from_statuses} to {to_status}")
+    return from_statuses
+
+
+async def transition_booking(
+    db: AsyncSession, id: int, to_status: str, from_statuses: tuple[str, ...] | None = None
+) -> dict | None:
+    """Move one booking to `to_status` if its current status allows it, in a single statement.
+
+    The row is locked and read in a CTE, updated in a second one only if its status is in `from_statuses`
+    (by default every status `BOOKING_TRANSITIONS` allows), and both are joined in the result, so a concurrent
+    change waits for the lock and is then seen instead of being overwritten.
+
+    Returns
+    -------
+    dict | None
+        None if the booking does not exist, else its `previous_status`, `room_id`, `check_in`, `check_out`,
+        and whether it was `transitioned`.
+    """
+    from_statuses = _allowed_from(to_status, from_statuses)
+    target = (
+        select(Booking.id, Booking.status, Booking.room_id, Booking.check_in, Booking.check_out)
+        .where(Booking.id == id, Booking.is_deleted.is_(False))
+        .with_for_update()
+        .cte("target")
+    )
+    moved = (
+        update(Booking)
+        .where(Booking.id == target.c.id, target.c.status.in_(from_statuses))
+        .values(status=to_status, updated_at=func.now())
+        .returning(Booking.id)
+        .cte("moved")
+    )
+    stmt = select(
+        target.c.status.label("previous_status"),
+        target.c.room_id,
+        target.c.check_in,
+        target.c.check_out,
+        moved.c.id.is_not(None).label("transitioned"),
+    ).select_from(target.outerjoin(moved, moved.c.id == target.c.id))
+
+    row = (await db.execute(stmt)).mappings().first()
+    await db.commit()
+    return dict(row) if row is not None else None
+
+
+async def transition_due_bookings(
+    db: AsyncSession,
+    from_statuses: tuple[str, ...],
+    to_status: str,
+    due_column: str,
+    cutoff: datetime,
+    batch_size: int,
+) -> list[tuple[int, int, datetime, datetime]]:
+    """Move one bounded batch of bookings whose `due_column` is before `cutoff` to `to_status`.
+
+    Like `transition_booking`, only moves allowed by `BOOKING_TRANSITIONS` can be asked for.
+    Postgres has no `UPDATE ... LIMIT`, so the batch is picked by an index-driven `SELECT ... ORDER BY ... LIMIT`
+    subquery with `FOR UPDATE SKIP LOCKED`, which never waits on rows a request is currently updating.
+    The status guard is repeated in the outer `WHERE` so a row changed concurrently is left alone. Soft deleted
+    bookings are never transitioned.
+
+    Returns
+    -------
+    list[tuple[int, int, datetime, datetime]]
+        The `(id, room_id, check_in, check_out)` of the transitioned bookings, fewer than `batch_size` once
+        nothing is left.
+    """
+    from_statuses = _allowed_from(to_status, from_statuses)
+    column = getattr(Booking, due_column)
+    batch = (
+        select(Booking.id)
+        .where(Booking.status.in_(from_statuses), column < cutoff, Booking.is_deleted.is_(False))
+        .order_by(column)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    stmt = (
+        update(Booking)
+        .where(Booking.id.in_(batch), Booking.status.in_(from_statuses))
+        .values(status=to_status, updated_at=func.now())
+        .returning(Booking.id, Booking.room_id, Booking.check_in, Booking.check_out)
+        .execution_options(synchronize_session=False)
+    )
+    result = await db.execute(stmt)
+    rows = [(row.id, row.room_id, row.check_in, row.check_out) for row in result]
+    await db.commit()
+    return rows
+
+
+async def get_open_stays(
+    db: AsyncSession, room_ids: list[int] | None, start: datetime, end: datetime
+) -> list[tuple[int, datetime, datetime]]:
+    """Return `(room_id, check_in, check_out)` of the open bookings overlapping `[start, end)`, in one query.
+
+    With `room_ids=None` every room is scanned.
+    """
+    stmt = select(Booking.room_id, Booking.check_in, Booking.check_out).where(
+        Booking.status.in_(OPEN_BOOKING_STATUSES),
+        Booking.is_deleted.is_(False),
+        Booking.check_in < end,
+        Booking.check_out >= start,
+    )
+    if room_ids is not None:
+        stmt = stmt.where(Booking.room_id.in_(room_ids))
+
+    result = await db.execute(stmt)
+    return [(row.room_id, row.check_in, row.check_out) for row in result]
+
+
+async def get_bookings_in_range(
+    db: AsyncSession, start: datetime, end: datetime, statuses: tuple[str, ...]
+) -> list[tuple[int, int, datetime, datetime, str]]:
+    """Return `(id, room_id, check_in, check_out, status)` of every booking in `statuses` overlapping `[start, end)`."""
+    stmt = (
+        select(Booking.id, Booking.room_id, Booking.check_in, Booking.check_out, Booking.status)
+        .where(
+            Booking.status.in_(statuses),
+            Booking.is_deleted.is_(False),
+            Booking.check_in < end,
+            Booking.check_out >= start,
+        )
+        .order_by(Booking.room_id, Booking.check_in)
+    )
+    result = await db.execute(stmt)
+    return [tuple(row) for row in result]
+
+
+# the columns of `BookingRead`, in the order exports list them
+EXPORT_COLUMNS = (
+    "id", "user_id", "room_id", "check_in", "check_out", "status", "total_price", "number_of_guests",
+    "guest_name", "guest_email", "guest_contact_number", "created_at", "updated_at", "deleted_at",
+)
+
+
+async def stream_bookings(
+    db: AsyncSession, start: datetime | None, end: datetime | None, partition_size: int
+) -> AsyncIterator[Sequence[tuple]]:
+    """Yield the bookings checking in within `[start, end)`, ordered by id, `partition_size` rows at a time.
+
+    Rows come from a server-side cursor (`AsyncSession.stream` with `yield_per`), so memory does not grow
+    with the number of rows; there is no OFFSET and no COUNT.
+    """
+    stmt = (
+        select(*(getattr(Booking, column) for column in EXPORT_COLUMNS))
+        .where(Booking.is_deleted.is_(False))
+        .order_by(Booking.id)
+    )
+    if start is not None:
+        stmt = stmt.where(Booking.check_in >= start)
+    if end is not None:
+        stmt = stmt.where(Booking.check_in < end)
+
+    result = await db.stream(stmt.execution_options(yield_per=partition_size))
+    async for partition in result.partitions():
+        yield partition
+
+
+_FIND_OVERLAPPING = text(
+    """
+    SELECT candidate.idx
+    FROM unnest(
+        CAST(:idx AS integer[]),
+        CAST(:room_ids AS integer[]),
+        CAST(:firsts AS timestamptz[]),
+        CAST(:ends AS timestamptz[])
+    ) AS candidate(idx, room_id, first_night, end_night)
+    WHERE EXISTS (
+        SELECT 1 FROM booking
+        WHERE booking.room_id = candidate.room_id
+          AND booking.status = ANY(CAST(:statuses AS varchar[]))
+          AND NOT booking.is_deleted
+          AND booking.check_in < candidate.end_night
+          AND booking.check_out >= candidate.first_night + interval '1 day'
+    )
+    """
+)
+
+
+async def find_overlapping(db: AsyncSession, stays: list[tuple[int, datetime, datetime]]) -> set[int]:
+    """Return the positions in `stays` (`(room_id, check_in, check_out)`) that overlap an open booking.
+
+    All the stays are checked with a single query, with the nights rule of `open_overlap_filters`.
+    """
+    if not stays:
+        return set()
+
+    room_ids = [room_id for room_id, _, _ in stays]
+    bounds = [night_bounds(check_in, check_out) for _, check_in, check_out in stays]
+    firsts, ends = [first for first, _ in bounds], [end for _, end in bounds]
+    result = await db.execute(
+        _FIND_OVERLAPPING,
+        {
+            "idx": list(range(len(stays))),
+            "room_ids": room_ids,
+            "firsts": firsts,
+            "ends": ends,
+            "statuses": list(OPEN_BOOKING_STATUSES),
+        },
+    )
+    return set(result.scalars())
+
 
-CRUDBooking = FastCRUD[Booking, BookingCreate, BookingUpdate, BookingUpdateInternal, BookingDelete]
-crud_bookings = CRUDBooking(Booking)
\ No newline at end of file
+async def get_missing_references(
+    db: AsyncSession, user_ids: set[int], room_ids: set[int]
+) -> tuple[set[int], set[int]]:
+    """Return the user ids and room ids that do not exist (or are deleted rooms), out of the given ones."""
+    users = set((await db.execute(select(User.id).where(User.id.in_(user_ids)))).scalars()) if user_ids else set()
+    rooms = set()
+    if room_ids:
+        live_rooms = select(Room.id).where(Room.id.in_(room_ids), Room.is_deleted.is_(False))
+        rooms = set((await db.execute(live_rooms)).scalars())
+    return user_ids - users, room_ids - rooms
@@ -0,0 +1,104 @@
+from datetime import datetime
+from typing import Any
+
+from pydantic import BaseModel
+from sqlalchemy import Select, func, null, select, text, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models.booking import Booking
+from ..models.booking_archive import BookingArchive
+from ..schemas.booking import BookingArchiveRead
+
+ARCHIVED_COLUMNS = ", ".join(column.name for column in BookingArchive.__table__.columns if column.name != "archived_at")
+
+# `ix_booking_checked_out_check_out` picks the oldest checked-out bookings; the status is inlined rather than bound
+# so prepared (generic) plans can still use the partial index. The `check_in` bound is implied by the `check_out`
+# one, it only lets Postgres prune the partitions of later months.
+_ARCHIVE_BATCH = text(
+    f"""
+    WITH due AS (
+        SELECT id, check_in FROM booking
+        WHERE status = 'checked_out' AND NOT is_deleted AND check_out < :cutoff AND check_in < :cutoff
+        ORDER BY check_out
+        LIMIT :batch_size
+        FOR UPDATE SKIP LOCKED
+    ), moved AS (
+        DELETE FROM booking USING due
+        WHERE booking.id = due.id AND booking.check_in = due.check_in
+        RETURNING booking.*
+    )
+    INSERT INTO booking_archive ({ARCHIVED_COLUMNS})
+    SELECT {ARCHIVED_COLUMNS} FROM moved
+    RETURNING id
+    """
+)
+
+
+async def archive_due_bookings(db: AsyncSession, cutoff: datetime, batch_size: int) -> list[int]:
+    """Move one bounded batch of bookings checked out before `cutoff` from `booking` to `booking_archive`.
+
+    Rows are deleted and inserted by the same statement, so a booking is always in exactly one of the tables,
+    and `FOR UPDATE SKIP LOCKED` never waits on a booking a request is changing.
+
+    Returns
+    -------
+    list[int]
+        The ids of the archived bookings, fewer than `batch_size` once nothing is left.
+    """
+    result = await db.execute(_ARCHIVE_BATCH, {"cutoff": cutoff, "batch_size": batch_size})
+    ids = list(result.scalars())
+    await db.commit()
+    return ids
+
+
+def _select_read(model: type[Booking] | type[BookingArchive]) -> Select:
+    """Select the `BookingArchiveRead` fields of `model`, NULL for those it does not have."""
+    columns = model.__table__.columns
+    return select(
+        *(columns[name] if name in columns else null().label(name) for name in BookingArchiveRead.model_fields)
+    )
+
+
+def _with_archive(**filters: Any) -> Any:
+    """The live bookings and the archived ones matching `filters`, as one subquery of `BookingArchiveRead` rows."""
+    live = _select_read(Booking).filter_by(is_deleted=False, **filters)
+    archived = _select_read(BookingArchive).filter_by(**filters)
+    return union_all(live, archived).subquery("bookings")
+
+
+def _columns(bookings: Any, schema_to_select: type[BaseModel]) -> list:
+    return [bookings.c[name] for name in schema_to_select.model_fields]
+
+
+async def get_booking_with_archive(
+    db: AsyncSession, id: int, schema_to_select: type[BaseModel] = BookingArchiveRead
+) -> dict | None:
+    """Return the fields of `schema_to_select` (a subset of `BookingArchiveRead`) of the booking `id`, whether it
+    is live or archived."""
+    bookings = _with_archive(id=id)
+    row = (await db.execute(select(*_columns(bookings, schema_to_select)).limit(1))).mappings().first()
+    return dict(row) if row is not None else None
+
+
+async def get_user_bookings_with_archive(
+    db: AsyncSession,
+    user_id: int,
+    offset: int,
+    limit: int,
+    schema_to_select: type[BaseModel] = BookingArchiveRead,
+) -> dict[str, Any]:
+    """Return a page of the user's live and archived bookings, newest first, in `FastCRUD.get_multi`'s shape.
+
+    Both sides are read through their `(user_id, check_in DESC)` index, so Postgres merges the two ordered scans
+    rather than sorting the user's whole history. Rows only carry the fields of `schema_to_select`.
+    """
+    bookings = _with_archive(user_id=user_id)
+    page = (
+        select(*_columns(bookings, schema_to_select))
+        .order_by(bookings.c.check_in.desc(), bookings.c.id.desc())
+        .offset(offset)
+        .limit(limit)
+    )
+    data = [dict(row) for row in (await db.execute(page)).mappings()]
+    total_count = (await db.execute(select(func.count()).select_from(bookings))).scalar_one()
+    return {"data": data, "total_count": total_count}
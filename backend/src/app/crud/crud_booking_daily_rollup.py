@@ -0,0 +1,87 @@
+from datetime import UTC, date, datetime, time
+
+from sqlalchemy import bindparam, delete, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models.booking_daily_rollup import BookingDailyRollup
+from .crud_booking import SOLD_BOOKING_STATUSES
+
+# every sold booking (live or archived) overlapping the range is expanded into its nights (the check-in day up to,
+# not including, the check-out day, at least one) and its total price is spread evenly over them
+_INSERT_ROLLUP = text(
+    """
+    INSERT INTO booking_daily_rollup (room_id, day, nights_sold, revenue)
+    SELECT b.room_id, night::date, count(*), sum(b.total_price / b.nights)
+    FROM (
+        SELECT
+            room_id,
+            total_price,
+            (check_in AT TIME ZONE 'UTC')::date AS first_night,
+            greatest((check_out AT TIME ZONE 'UTC')::date - (check_in AT TIME ZONE 'UTC')::date, 1) AS nights
+        FROM (
+            SELECT room_id, total_price, check_in, check_out, status FROM booking WHERE NOT is_deleted
+            UNION ALL
+            SELECT room_id, total_price, check_in, check_out, status FROM booking_archive
+        ) AS stays
+        WHERE status IN :statuses
+          AND check_in < :end_at
+          AND check_out >= :start_at
+          AND (CAST(:room_id AS integer) IS NULL OR room_id = :room_id)
+    ) AS b
+    CROSS JOIN LATERAL generate_series(b.first_night, b.first_night + b.nights - 1, interval '1 day') AS night
+    WHERE night::date >= :start AND night::date < :end
+    GROUP BY b.room_id, night::date
+    ON CONFLICT (room_id, day) DO UPDATE
+    SET nights_sold = excluded.nights_sold, revenue = excluded.revenue
+    """
+).bindparams(bindparam("statuses", expanding=True))
+
+
+def _midnight(day: date) -> datetime:
+    return datetime.combine(day, time(), tzinfo=UTC)
+
+
+async def recompute_daily_rollup(db: AsyncSession, start: date, end: date, room_id: int | None = None) -> int:
+    """Recompute the rollup rows of `[start, end)` from `booking` and `booking_archive`, for one room or
+    (`room_id=None`) all of them.
+
+    Days left without a sold night are removed, so the same call serves incremental refreshes after a booking
+    change and bulk rebuilds. Runs in one transaction.
+
+    Returns
+    -------
+    int
+        The number of rollup rows written.
+    """
+    stmt = delete(BookingDailyRollup).where(BookingDailyRollup.day >= start, BookingDailyRollup.day < end)
+    if room_id is not None:
+        stmt = stmt.where(BookingDailyRollup.room_id == room_id)
+    await db.execute(stmt)
+
+    result = await db.execute(
+        _INSERT_ROLLUP,
+        {
+            "statuses": list(SOLD_BOOKING_STATUSES),
+            "start_at": _midnight(start),
+            "end_at": _midnight(end),
+            "start": start,
+            "end": end,
+            "room_id": room_id,
+        },
+    )
+    await db.commit()
+    return result.rowcount
+
+
+async def get_daily_rollup(
+    db: AsyncSession, start: date, end: date, room_ids: list[int] | None = None
+) -> list[tuple[int, date, int, float]]:
+    """Return `(room_id, day, nights_sold, revenue)` of the rollup rows in `[start, end)`."""
+    stmt = select(
+        BookingDailyRollup.room_id, BookingDailyRollup.day, BookingDailyRollup.nights_sold, BookingDailyRollup.revenue
+    ).where(BookingDailyRollup.day >= start, BookingDailyRollup.day < end)
+    if room_ids is not None:
+        stmt = stmt.where(BookingDailyRollup.room_id.in_(room_ids))
+
+    result = await db.execute(stmt)
+    return [tuple(row) for row in result]
@@ -0,0 +1,17 @@
+from fastcrud import FastCRUD
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models.rate_plan import RatePlan
+from ..schemas.rate_plan import RatePlanCreate, RatePlanRead, RatePlanUpdate, RatePlanUpdateInternal
+
+CRUDRatePlan = FastCRUD[RatePlan, RatePlanCreate, RatePlanUpdate, RatePlanUpdateInternal, RatePlanRead]
+crud_rate_plans = CRUDRatePlan(RatePlan)
+
+
+async def get_pricing_rules(db: AsyncSession) -> list[dict]:
+    """Return the pricing rules of every rate plan, in one query."""
+    result = await db.execute(
+        select(RatePlan.room_id, RatePlan.weekday_multipliers, RatePlan.seasons, RatePlan.length_of_stay)
+    )
+    return [dict(row) for row in result.mappings()]
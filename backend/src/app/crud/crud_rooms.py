@@ -1,7 +1,22 @@
+from typing import Any
+
 from fastcrud import FastCRUD
+from pydantic import BaseModel
+from sqlalchemy import ColumnElement, Float, cast, func, literal, null, select, union_all
+from sqlalchemy.dialects.postgresql import array
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..models.room import Room, RoomFeature, RoomBadge
-from ..schemas.room import RoomCreate, RoomDelete, RoomUpdate, RoomUpdateInternal, RoomFeatureDetail, RoomBadgeDetail, RoomFeatureBase, RoomBadgeBase
+from ..models.room import ROOM_SEARCH_CONFIG, Room, RoomBadge, RoomFeature
+from ..schemas.room import (
+    RoomBadgeBase,
+    RoomBadgeDetail,
+    RoomCreate,
+    RoomDelete,
+    RoomFeatureBase,
+    RoomFeatureDetail,
+    RoomUpdate,
+    RoomUpdateInternal,
+)
 
 CRUDRoom = FastCRUD[Room, RoomCreate, RoomUpdate, RoomUpdateInternal, RoomDelete]
 crud_rooms = CRUDRoom(Room)
@@ -10,4 +25,148 @@ CRUDRoomFeature = FastCRUD[RoomFeature, RoomFeatureBase, RoomFeatureBase, RoomFe
 crud_room_features = CRUDRoomFeature(RoomFeature)
 
 CRUDRoomBadge = FastCRUD[RoomBadge, RoomBadgeBase, RoomBadgeBase, RoomBadgeBase, RoomBadgeDetail]
-crud_room_badges = CRUDRoomBadge(RoomBadge)
\ No newline at end of file
+crud_room_badges = CRUDRoomBadge(RoomBadge)
+
+
+async def get_existing_names(db: AsyncSession, names: set[str]) -> set[str]:
+    """Return which of `names` are already taken by a room, in one query."""
+    if not names:
+        return set()
+    return set((await db.execute(select(Room.name).where(Room.name.in_(names)))).scalars())
+
+
+async def get_prices(db: AsyncSession, room_ids: list[int]) -> dict[int, float]:
+    """Return `Room.price` of the given rooms, missing and deleted rooms are left out."""
+    result = await db.execute(select(Room.id, Room.price).where(Room.id.in_(room_ids), Room.is_deleted.is_(False)))
+    return dict(result.tuples().all())
+
+
+def room_filters(
+    min_price: float | None = None,
+    max_price: float | None = None,
+    feature_ids: list[int] | None = None,
+    badge_ids: list[int] | None = None,
+) -> list[ColumnElement[bool]]:
+    """Build the `WHERE` clauses of the room filters, for live rooms.
+
+    A room matches when its price is within `[min_price, max_price]` and it has every one of `feature_ids` and
+    `badge_ids` (array containment, served by the GIN indexes of the two columns). Empty or None filters are left
+    out, so the clauses can be combined with any other query on `room`.
+    """
+    # `NOT is_deleted`, spelled like the predicate of the partial indexes
+    clauses: list[ColumnElement[bool]] = [~Room.is_deleted]
+    if min_price is not None:
+        clauses.append(Room.price >= min_price)
+    if max_price is not None:
+        clauses.append(Room.price <= max_price)
+    if feature_ids:
+        clauses.append(Room.feature_ids.bool_op("@>")(array(sorted(set(feature_ids)))))
+    if badge_ids:
+        clauses.append(Room.badge_ids.bool_op("@>")(array(sorted(set(badge_ids)))))
+    return clauses
+
+
+def _columns(schema_to_select: type[BaseModel]) -> list:
+    return [Room.__table__.columns[name] for name in schema_to_select.model_fields]
+
+
+async def get_filtered_rooms(
+    db: AsyncSession, filters: list[ColumnElement[bool]], offset: int, limit: int, schema_to_select: type[BaseModel]
+) -> dict[str, Any]:
+    """Return a page of the rooms matching `filters` (see `room_filters`) ordered by id, in one query.
+
+    The total is computed by a window over the same scan, in `FastCRUD.get_multi`'s shape.
+    """
+    stmt = (
+        select(*_columns(schema_to_select), func.count().over().label("_total_count"))
+        .where(*filters)
+        .order_by(Room.id)
+        .offset(offset)
+        .limit(limit)
+    )
+    return await _page(db, stmt, offset, filters)
+
+
+def room_search(q: str) -> tuple[ColumnElement[bool], ColumnElement[float]]:
+    """Build the `WHERE` clause matching rooms to a search query `q`, and the rank to order the matches by.
+
+    A room matches when its name or description matches `q` as a web search query (`websearch_to_tsquery`,
+    stemmed, name weighted above description, served by `ix_room_live_search_vector`), or when `q` is close to
+    a word of its name (`pg_trgm` word similarity, which tolerates typos, served by `ix_room_live_name_trgm`).
+    The rank adds up the full-text rank and the name similarity.
+    """
+    query = func.websearch_to_tsquery(ROOM_SEARCH_CONFIG, q)
+    match = Room.search_vector.bool_op("@@")(query) | Room.name.bool_op("%>")(q)
+    rank = func.ts_rank_cd(Room.search_vector, query) + func.word_similarity(q, Room.name)
+    return match, rank
+
+
+async def search_rooms(
+    db: AsyncSession,
+    q: str,
+    filters: list[ColumnElement[bool]],
+    offset: int,
+    limit: int,
+    schema_to_select: type[BaseModel],
+) -> dict[str, Any]:
+    """Return a page of the rooms matching `q` (see `room_search`) and `filters`, best match first, in one query."""
+    match, rank = room_search(q)
+    stmt = (
+        select(*_columns(schema_to_select), func.count().over().label("_total_count"))
+        .where(*filters, match)
+        .order_by(rank.desc(), Room.id)
+        .offset(offset)
+        .limit(limit)
+    )
+    return await _page(db, stmt, offset, [*filters, match])
+
+
+async def get_room_facets(
+    db: AsyncSession, filters: list[ColumnElement[bool]], price_bucket: float
+) -> dict[str, Any]:
+    """Count the rooms matching `filters` (see `room_filters`) by feature, badge and price bucket, in one query.
+
+    The matching rooms are scanned once into a CTE, which feeds one `GROUP BY` per facet (`unnest` of the id
+    arrays for features and badges) and the total.
+
+    Returns
+    -------
+    dict[str, Any]
+        `{"total", "features", "badges", "prices"}`: features and badges as `{"id", "count"}` by id, prices as
+        `{"min", "max", "count"}` by bucket, buckets of `price_bucket` starting at 0 and only non-empty ones.
+    """
+    bucket = func.floor(Room.price / price_bucket).label("bucket")
+    matched = select(bucket, Room.feature_ids, Room.badge_ids).where(*filters).cte("matched")
+    feature_id = func.unnest(matched.c.feature_ids).column_valued("feature_id")
+    badge_id = func.unnest(matched.c.badge_ids).column_valued("badge_id")
+
+    stmt = union_all(
+        select(literal("total"), cast(null(), Float), func.count()).select_from(matched),
+        select(literal("feature"), cast(feature_id, Float), func.count()).select_from(matched).group_by(feature_id),
+        select(literal("badge"), cast(badge_id, Float), func.count()).select_from(matched).group_by(badge_id),
+        select(literal("price"), matched.c.bucket, func.count()).select_from(matched).group_by(matched.c.bucket),
+    )
+
+    facets: dict[str, Any] = {"total": 0, "features": [], "badges": [], "prices": []}
+    for facet, value, count in sorted((await db.execute(stmt)).tuples(), key=lambda row: (row[0], row[1] or 0)):
+        if facet == "total":
+            facets["total"] = count
+        elif facet == "price":
+            facets["prices"].append({"min": value * price_bucket, "max": (value + 1) * price_bucket, "count": count})
+        else:
+            facets[f"{facet}s"].append({"id": int(value), "count": count})
+    return facets
+
+
+async def _page(db: AsyncSession, stmt: Any, offset: int, where: list[ColumnElement[bool]]) -> dict[str, Any]:
+    rows = [dict(row) for row in (await db.execute(stmt)).mappings()]
+    if rows:
+        total_count = rows[0]["_total_count"]
+        for row in rows:
+            del row["_total_count"]
+    elif offset:
+        # past the last page the window has no row to report the total on
+        total_count = (await db.execute(select(func.count()).select_from(Room).where(*where))).scalar_one()
+    else:
+        total_count = 0
+    return {"data": rows, "total_count": total_count}
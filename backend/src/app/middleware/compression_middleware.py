@@ -0,0 +1,83 @@
+from fastapi import FastAPI, Request, Response
+from starlette.datastructures import MutableHeaders
+from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
+
+from ..core.utils.compression import compress, is_compressible, negotiate_encoding
+
+
+class CompressionMiddleware(BaseHTTPMiddleware):
+    """Middleware to gzip/brotli-compress responses negotiated through `Accept-Encoding`.
+
+    Parameters
+    ----------
+    app: FastAPI
+        The FastAPI application instance.
+    minimum_size: int, optional
+        Responses with a smaller `Content-Length` are sent as is. Defaults to 1024 bytes.
+    gzip_level: int, optional
+        The zlib compression level used for gzip. Defaults to 6.
+    brotli_quality: int, optional
+        The brotli quality used when brotli is installed. Defaults to 4.
+
+    Methods
+    -------
+    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
+        Process the request and compress the response body when it is worth it.
+
+    Note
+    ----
+        - Responses that already carry a `Content-Encoding` (e.g. precompressed entries served by the
+          `cache` decorator) are passed through untouched.
+        - Streaming responses without a `Content-Length` are never buffered.
+    """
+
+    def __init__(
+        self, app: FastAPI, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4
+    ) -> None:
+        super().__init__(app)
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    def _should_compress(self, response: Response) -> bool:
+        if "content-encoding" in response.headers:
+            return False
+
+        if not is_compressible(response.headers.get("content-type")):
+            return False
+
+        content_length = response.headers.get("content-length")
+        if content_length is None:
+            return False
+
+        return int(content_length) >= self.minimum_size
+
+    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
+        """Process the request and compress the response body when it is worth it.
+
+        Parameters
+        ----------
+        request: Request
+            The incoming request.
+        call_next: RequestResponseEndpoint
+            The next middleware or route handler in the processing chain.
+
+        Returns
+        -------
+        Response
+            The compressed response, or the original one if no encoding applies.
+        """
+        encoding = negotiate_encoding(request.headers.get("Accept-Encoding"))
+        response: Response = await call_next(request)
+        if encoding is None or not self._should_compress(response):
+            return response
+
+        body = b"".join([chunk async for chunk in response.body_iterator])  # type: ignore
+        compressed = compress(body, encoding, gzip_level=self.gzip_level, brotli_quality=self.brotli_quality)
+
+        headers = MutableHeaders(raw=list(response.raw_headers))
+        headers["Content-Encoding"] = encoding
+        headers["Content-Length"] = str(len(compressed))
+        headers.add_vary_header("Accept-Encoding")
+
+        return Response(content=compressed, status_code=response.status_code, headers=headers)
@@ -0,0 +1,178 @@
+import asyncio
+import hashlib
+import time
+from collections.abc import AsyncIterator
+
+import orjson
+from fastapi import FastAPI, Request, Response
+from redis.exceptions import RedisError
+from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
+
+from ..core.logger import logging
+from ..core.responses import ORJSONResponse
+from ..core.utils import cache
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENT_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+IDEMPOTENCY_KEY_MAX_LENGTH = 255
+
+
+async def _replay_body(body: bytes) -> AsyncIterator[bytes]:
+    yield body
+
+
+class IdempotencyMiddleware(BaseHTTPMiddleware):
+    """Middleware to make mutating requests carrying an `Idempotency-Key` header safe to retry.
+
+    The first request with a given key claims it in Redis (`SET NX`) and runs; its final response is stored
+    together with a hash of the request. Retries with the same key replay the stored response without reaching
+    the endpoint (nor Postgres), and retries arriving while the first request is still running wait for it.
+
+    Parameters
+    ----------
+    app: FastAPI
+        The FastAPI application instance.
+    ttl: int, optional
+        How long (in seconds) a key and its response are kept. Defaults to 86400 seconds.
+    lock_ttl: int, optional
+        How long (in seconds) an in-flight claim lasts if its request never completes. Defaults to 60 seconds.
+    wait_timeout: float, optional
+        How long (in seconds) a duplicate waits for the in-flight request before giving up. Defaults to 10 seconds.
+    poll_interval: float, optional
+        How often (in seconds) a waiting duplicate checks for the response. Defaults to 0.05 seconds.
+
+    Note
+    ----
+        - Keys are scoped by the `Authorization` header, so two users can not collide on the same key.
+        - Reusing a key for a different request (method, path, query or body) is rejected with a 422.
+        - A duplicate still waiting after `wait_timeout` gets a 409, and can be retried.
+        - 5xx responses are not stored, the key is released so the request can be retried.
+        - Without a Redis client, or if Redis fails, requests are processed normally.
+    """
+
+    def __init__(
+        self,
+        app: FastAPI,
+        ttl: int = 86400,
+        lock_ttl: int = 60,
+        wait_timeout: float = 10.0,
+        poll_interval: float = 0.05,
+    ) -> None:
+        super().__init__(app)
+        self.ttl = ttl
+        self.lock_ttl = lock_ttl
+        self.wait_timeout = wait_timeout
+        self.poll_interval = poll_interval
+
+    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
+        """Process the request at most once per `Idempotency-Key`.
+
+        Parameters
+        ----------
+        request: Request
+            The incoming request.
+        call_next: RequestResponseEndpoint
+            The next middleware or route handler in the processing chain.
+
+        Returns
+        -------
+        Response
+            The endpoint's response, or the stored one (with `Idempotent-Replayed: true`) for a retry.
+        """
+        key = request.headers.get("idempotency-key")
+        if key is None or request.method not in IDEMPOTENT_METHODS or cache.client is None:
+            return await call_next(request)
+
+        if not key or len(key) > IDEMPOTENCY_KEY_MAX_LENGTH:
+            return ORJSONResponse({"detail": "Invalid Idempotency-Key"}, status_code=400)
+
+        body = await request.body()
+        fingerprint = hashlib.sha256(
+            b"\0".join([request.method.encode(), request.url.path.encode(), request.url.query.encode(), body])
+        ).hexdigest()
+        scope = hashlib.sha256(request.headers.get("authorization", "").encode()).hexdigest()[:16]
+        lock_key = f"idempotency:{scope}:{key}"
+        response_key = f"{lock_key}:response"
+
+        deadline = time.monotonic() + self.wait_timeout
+        while True:
+            try:
+                claimed = await cache.client.set(lock_key, fingerprint, nx=True, ex=self.lock_ttl)
+                if not claimed:
+                    stored = await cache.client.hgetall(response_key)
+                    owner = None if stored else await cache.client.get(lock_key)
+            except RedisError as e:
+                logger.warning(f"Idempotency store unavailable, processing the request as is: {e}")
+                return await call_next(request)
+
+            if claimed:
+                return await self._process(request, call_next, fingerprint, lock_key, response_key)
+
+            if stored:
+                if stored[b"fingerprint"].decode() != fingerprint:
+                    return self._mismatch()
+                return self._replay(stored)
+
+            if owner is not None and owner.decode() != fingerprint:
+                return self._mismatch()
+
+            if time.monotonic() >= deadline:
+                return ORJSONResponse(
+                    {"detail": "A request with this Idempotency-Key is still in progress"}, status_code=409
+                )
+            # the owner is still running (or just failed and released the key): check again shortly
+            await asyncio.sleep(self.poll_interval)
+
+    async def _process(
+        self, request: Request, call_next: RequestResponseEndpoint, fingerprint: str, lock_key: str, response_key: str
+    ) -> Response:
+        try:
+            response = await call_next(request)
+            body = b"".join([chunk async for chunk in response.body_iterator])  # type: ignore[attr-defined]
+        except BaseException:
+            await self._release(lock_key)
+            raise
+
+        if response.status_code >= 500:
+            await self._release(lock_key)
+        else:
+            headers = [(name.decode("latin-1"), value.decode("latin-1")) for name, value in response.raw_headers]
+            try:
+                async with cache.client.pipeline(transaction=True) as pipe:  # type: ignore[union-attr]
+                    pipe.hset(
+                        response_key,
+                        mapping={
+                            "fingerprint": fingerprint,
+                            "status": response.status_code,
+                            "headers": orjson.dumps(headers),
+                            "body": body,
+                        },
+                    )
+                    pipe.expire(response_key, self.ttl)
+                    pipe.set(lock_key, fingerprint, ex=self.ttl)
+                    await pipe.execute()
+            except RedisError as e:
+                logger.warning(f"Could not store the response for an idempotent request: {e}")
+                await self._release(lock_key)
+
+        response.body_iterator = _replay_body(body)  # type: ignore[attr-defined]
+        return response
+
+    async def _release(self, lock_key: str) -> None:
+        try:
+            await cache.client.delete(lock_key)  # type: ignore[union-attr]
+        except RedisError as e:
+            logger.warning(f"Could not release an idempotency key, it expires in {self.lock_ttl}s: {e}")
+
+    def _replay(self, stored: dict[bytes, bytes]) -> Response:
+        response = Response(content=stored[b"body"], status_code=int(stored[b"status"]))
+        response.raw_headers = [
+            (name.encode("latin-1"), value.encode("latin-1")) for name, value in orjson.loads(stored[b"headers"])
+        ] + [(b"idempotent-replayed", b"true")]
+        return response
+
+    def _mismatch(self) -> Response:
+        return ORJSONResponse(
+            {"detail": "Idempotency-Key was already used for a different request"}, status_code=422
+        )
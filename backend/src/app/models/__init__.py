@@ -5,3 +5,7 @@ from ..core.db.database import Base
 from .user import User
 from .room import Room, RoomFeature, RoomBadge
 from .booking import Booking
+from .booking_archive import BookingArchive
+from .booking_audit import BookingAudit
+from .booking_daily_rollup import BookingDailyRollup
+from .rate_plan import RatePlan
@@ -1,20 +1,57 @@
 from typing import List, Optional
 from datetime import UTC, datetime
 
-from sqlalchemy import DateTime, String, Float, JSON, ARRAY, Integer, ForeignKey
+from sqlalchemy import DateTime, Float, ForeignKey, Index, Integer, String, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from ..core.db.database import Base
+from ..core.db.models import SoftDeleteMixin
 from .room import Room
 from .user import User
 
-class Booking(Base):
+class Booking(Base, SoftDeleteMixin):
     __tablename__ = "booking"
+    __table_args__ = (
+        # keep the scheduled status transitions index-driven, whatever the size of the history
+        Index(
+            "ix_booking_open_check_out",
+            "check_out",
+            postgresql_where=text("status IN ('booked', 'checked_in') AND NOT is_deleted"),
+        ),
+        Index("ix_booking_booked_check_in", "check_in", postgresql_where=text("status = 'booked' AND NOT is_deleted")),
+        # the worker's batches of checked-out bookings to move to `booking_archive`
+        Index(
+            "ix_booking_checked_out_check_out",
+            "check_out",
+            postgresql_where=text("status = 'checked_out' AND NOT is_deleted"),
+        ),
+        # overlap checks of `write_booking`/`update_booking` only ever look at open bookings of one room
+        Index(
+            "ix_booking_room_open_stay",
+            "room_id",
+            "check_in",
+            "check_out",
+            postgresql_where=text("status IN ('booked', 'checked_in') AND NOT is_deleted"),
+        ),
+        # `read_user_bookings`, newest first
+        Index("ix_booking_user_check_in", "user_id", text("check_in DESC"), postgresql_where=text("NOT is_deleted")),
+        # `read_room_bookings`
+        Index(
+            "ix_booking_room_status_check_out",
+            "room_id",
+            "status",
+            "check_out",
+            postgresql_where=text("NOT is_deleted"),
+        ),
+        # one partition per check-in month, see `core.db.partitions`
+        {"postgresql_partition_by": "RANGE (check_in)"},
+    )
 
-    id: Mapped[int] = mapped_column("id", autoincrement=True, nullable=False, unique=True, primary_key=True, init=False)
+    # unique through its sequence: a unique constraint on a partitioned table has to include `check_in`
+    id: Mapped[int] = mapped_column("id", autoincrement=True, nullable=False, primary_key=True, init=False)
     user_id: Mapped[int] = mapped_column(ForeignKey("user.id"), nullable=False)
     room_id: Mapped[int] = mapped_column(ForeignKey("room.id"), nullable=False)
-    check_in: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    check_in: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, primary_key=True)
     check_out: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
     
     user: Optional[Mapped[User]] = relationship("User", lazy="selectin", init=False)
@@ -29,8 +66,7 @@ class Booking(Base):
     guest_contact_number: Mapped[str] = mapped_column(String, nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default_factory=lambda: datetime.now(UTC))
     updated_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), default=None)
-    deleted_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), default=None)
         
-    # status can be booked, cancelled or checked_out
+    # status can be booked, checked_in, checked_out, no_show or cancelled
     status: Mapped[str] = mapped_column(String, nullable=False, default="booked")
     
@@ -0,0 +1,36 @@
+from datetime import UTC, datetime
+
+from sqlalchemy import DateTime, Float, Index, Integer, String, text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from ..core.db.database import Base
+
+
+class BookingArchive(Base):
+    """Checked-out bookings moved out of `booking` by the worker once past `BOOKING_ARCHIVE_AFTER_DAYS`."""
+
+    __tablename__ = "booking_archive"
+    __table_args__ = (
+        # `read_user_bookings?include_archived=true`, newest first
+        Index("ix_booking_archive_user_check_in", "user_id", text("check_in DESC")),
+        # rollup refreshes of recent days find nothing here without scanning the archive
+        Index("ix_booking_archive_check_out", "check_out"),
+    )
+
+    # the id the booking had in `booking`; no foreign keys on purpose: archived rows outlive users and rooms
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    user_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    room_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    check_in: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    check_out: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    guest_name: Mapped[str] = mapped_column(String, nullable=False)
+    guest_email: Mapped[str] = mapped_column(String, nullable=False)
+    number_of_guests: Mapped[int] = mapped_column(Integer, nullable=False)
+    total_price: Mapped[float] = mapped_column(Float, nullable=False)
+    guest_contact_number: Mapped[str] = mapped_column(String, nullable=False)
+    status: Mapped[str] = mapped_column(String, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    updated_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), default=None)
+    archived_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default_factory=lambda: datetime.now(UTC), server_default=text("now()")
+    )
@@ -0,0 +1,18 @@
+from datetime import UTC, datetime
+
+from sqlalchemy import JSON, DateTime, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from ..core.db.database import Base
+
+
+class BookingAudit(Base):
+    __tablename__ = "booking_audit"
+
+    id: Mapped[int] = mapped_column("id", autoincrement=True, nullable=False, unique=True, primary_key=True, init=False)
+    # no foreign key on purpose: audit entries outlive the booking rows they describe
+    booking_id: Mapped[int] = mapped_column(Integer, nullable=False, index=True)
+    action: Mapped[str] = mapped_column(String, nullable=False)  # created, updated, cancelled, deleted or restored
+    status: Mapped[str | None] = mapped_column(String, nullable=True, default=None)
+    details: Mapped[dict | None] = mapped_column(JSON, nullable=True, default=None)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default_factory=lambda: datetime.now(UTC))
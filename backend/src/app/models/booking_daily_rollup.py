@@ -0,0 +1,19 @@
+from datetime import date
+
+from sqlalchemy import Date, Float, Integer
+from sqlalchemy.orm import Mapped, mapped_column
+
+from ..core.db.database import Base
+
+
+class BookingDailyRollup(Base):
+    """Nights sold and revenue per room and day, derived from `booking` by the worker."""
+
+    __tablename__ = "booking_daily_rollup"
+
+    # no foreign key on purpose: the rollup is derived data, rebuildable from `booking` at any time
+    room_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    day: Mapped[date] = mapped_column(Date, primary_key=True, index=True)
+    nights_sold: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    # the booking's total price spread evenly over its nights
+    revenue: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
@@ -0,0 +1,29 @@
+from datetime import UTC, datetime
+
+from sqlalchemy import ARRAY, JSON, DateTime, Float, ForeignKey, Index, String, text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from ..core.db.database import Base
+
+
+class RatePlan(Base):
+    """Pricing rules applied on top of `Room.price`, see `core.utils.pricing`."""
+
+    __tablename__ = "rate_plan"
+    # one plan per room, plus at most one default plan (no room) for rooms without their own
+    __table_args__ = (Index("uq_rate_plan_room_id", text("coalesce(room_id, 0)"), unique=True),)
+
+    id: Mapped[int] = mapped_column("id", autoincrement=True, nullable=False, unique=True, primary_key=True, init=False)
+    name: Mapped[str] = mapped_column(String, nullable=False)
+    room_id: Mapped[int | None] = mapped_column(ForeignKey("room.id"), nullable=True, default=None)
+    # Monday first
+    weekday_multipliers: Mapped[list[float]] = mapped_column(
+        ARRAY(Float), nullable=False, default_factory=lambda: [1.0] * 7
+    )
+    # [{"start": "2024-07-01", "end": "2024-09-01", "multiplier": 1.2, "price": null}], later seasons win
+    seasons: Mapped[list[dict]] = mapped_column(JSON, nullable=False, default_factory=list)
+    # [{"min_nights": 7, "discount": 0.1}]
+    length_of_stay: Mapped[list[dict]] = mapped_column(JSON, nullable=False, default_factory=list)
+
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default_factory=lambda: datetime.now(UTC))
+    updated_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), default=None)
@@ -1,10 +1,19 @@
 from typing import List
 from datetime import UTC, datetime
 
-from sqlalchemy import DateTime, String, Float, JSON, ARRAY, Integer
+from sqlalchemy import ARRAY, Computed, DateTime, Float, Index, Integer, String, text
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from ..core.db.database import Base
+from ..core.db.models import SoftDeleteMixin
+
+# text search configuration of `Room.search_vector` and the queries matching it
+ROOM_SEARCH_CONFIG = "english"
+ROOM_SEARCH_VECTOR = (
+    f"setweight(to_tsvector('{ROOM_SEARCH_CONFIG}', coalesce(name, '')), 'A') || "
+    f"setweight(to_tsvector('{ROOM_SEARCH_CONFIG}', coalesce(description, '')), 'B')"
+)
 
 class RoomFeature(Base):
     __tablename__ = "room_feature"
@@ -18,8 +27,32 @@ class RoomBadge(Base):
     name: Mapped[str] = mapped_column(String, nullable=False, unique=True)
     description: Mapped[str] = mapped_column(String, nullable=False)
     
-class Room(Base):
+class Room(Base, SoftDeleteMixin):
     __tablename__ = "room"
+    __table_args__ = (
+        # room listings and the price filter only scan live rooms
+        Index("ix_room_live_id", "id", postgresql_where=text("NOT is_deleted")),
+        Index("ix_room_live_price", "price", postgresql_where=text("NOT is_deleted")),
+        # `feature_ids @> ...` / `badge_ids @> ...` of the room filters
+        Index(
+            "ix_room_live_feature_ids", "feature_ids", postgresql_using="gin", postgresql_where=text("NOT is_deleted")
+        ),
+        Index("ix_room_live_badge_ids", "badge_ids", postgresql_using="gin", postgresql_where=text("NOT is_deleted")),
+        # `GET /rooms/search`: full-text matches, and typo-tolerant name matches through `pg_trgm`
+        Index(
+            "ix_room_live_search_vector",
+            "search_vector",
+            postgresql_using="gin",
+            postgresql_where=text("NOT is_deleted"),
+        ),
+        Index(
+            "ix_room_live_name_trgm",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+            postgresql_where=text("NOT is_deleted"),
+        ),
+    )
 
     id: Mapped[int] = mapped_column("id", autoincrement=True, nullable=False, unique=True, primary_key=True, init=False)
     name: Mapped[str] = mapped_column(String, nullable=False, unique=True)
@@ -42,5 +75,9 @@ class Room(Base):
     
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default_factory=lambda: datetime.now(UTC))
     updated_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), default=None)
-    deleted_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), default=None)
+
+    # maintained by Postgres from the name (weight A) and the description (weight B), never loaded by default
+    search_vector: Mapped[str | None] = mapped_column(
+        TSVECTOR, Computed(ROOM_SEARCH_VECTOR, persisted=True), init=False, deferred=True
+    )
     
@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Annotated
+from typing import Annotated, Literal
 
 from pydantic import BaseModel, ConfigDict, EmailStr, Field
 
@@ -27,6 +27,10 @@ class BookingRead(BookingBase):
     updated_at: datetime | None
     deleted_at: datetime | None
     
+class BookingArchiveRead(BookingRead):
+    # set for bookings served from `booking_archive`, see `include_archived`
+    archived_at: datetime | None = None
+
 class BookingReadExternal(BookingRead):
     user: dict = {}
     room: dict = {}
@@ -34,6 +38,16 @@ class BookingReadExternal(BookingRead):
 class BookingCreate(BookingBase):
     # odmit user and room fields as they are not required when creating a booking
     model_config = ConfigDict(extra="forbid")
+
+    # ignored: the price is computed from the room's rate plan, see `POST /quote`
+    total_price: Annotated[float | None, Field(examples=[299], default=None)]
+    # a hold placed with `POST /room/{id}/hold`, converted into the booking
+    hold_id: Annotated[str | None, Field(examples=["5f0c6d3a9e2b4c1d8a7f6e5d4c3b2a19"], default=None)]
+
+
+class BookingCreateInternal(BookingBase):
+    # also the rows of `POST /bookings/import`, with the price they were sold at
+    model_config = ConfigDict(extra="forbid")
             
 class BookingUpdate(BaseModel):
     model_config = ConfigDict(extra="forbid")
@@ -42,19 +56,24 @@ class BookingUpdate(BaseModel):
     room_id: Annotated[int | None, Field(examples=[1], default=None)]
     check_in: Annotated[datetime | None, Field(examples=["2022-01-01T12:00:00Z"], default=None)]
     check_out: Annotated[datetime | None, Field(examples=["2022-01-02T12:00:00Z"], default=None)]
-    total_price: Annotated[float | None, Field(examples=[299], default=None)]
-    status: Annotated[str | None, Field(examples=["booked"], default=None)]
     
     guest_name: Annotated[str | None, Field(examples=["John Doe"], default=None)]
     guest_contact_number: Annotated[str, Field(examples=["+1234567890"], default=None)]
     guest_email: Annotated[str | None, Field(examples=["abc@gmail.com"], default=None)]
     number_of_guests: Annotated[int | None, Field(examples=[1], default=None)]
     
+class BookingStatusUpdate(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    status: Annotated[Literal["checked_in", "checked_out", "cancelled", "no_show"], Field(examples=["checked_in"])]
+
+
 class BookingUpdateInternal(BookingUpdate):
     updated_at: datetime
     
 class BookingDelete(BaseModel):
     model_config = ConfigDict(extra="forbid")
     
+    is_deleted: bool
     deleted_at: datetime
     
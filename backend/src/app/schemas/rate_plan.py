@@ -0,0 +1,92 @@
+from datetime import date, datetime
+from typing import Annotated
+
+from pydantic import BaseModel, ConfigDict, Field, field_serializer, model_validator
+
+
+class Season(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    start: Annotated[date, Field(examples=["2024-07-01"])]
+    # the first day after the season
+    end: Annotated[date, Field(examples=["2024-09-01"])]
+    multiplier: Annotated[float, Field(examples=[1.2], gt=0, default=1.0)]
+    # a fixed nightly price replacing `Room.price` during the season, weekday multipliers still apply
+    price: Annotated[float | None, Field(examples=[None], gt=0, default=None)]
+
+    @model_validator(mode="after")
+    def check_dates(self) -> "Season":
+        if self.start >= self.end:
+            raise ValueError("A season should start before it ends")
+        return self
+
+    # seasons are stored in a JSON column
+    @field_serializer("start", "end")
+    def serialize_date(self, value: date) -> str:
+        return value.isoformat()
+
+
+class LengthOfStayDiscount(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    min_nights: Annotated[int, Field(examples=[7], ge=1)]
+    discount: Annotated[float, Field(examples=[0.1], ge=0, lt=1)]
+
+
+class RatePlanBase(BaseModel):
+    name: Annotated[str, Field(examples=["Summer 2024"])]
+    # None for the default plan of rooms without their own
+    room_id: Annotated[int | None, Field(examples=[1], default=None)]
+    weekday_multipliers: Annotated[
+        list[float], Field(examples=[[1, 1, 1, 1, 1.2, 1.3, 1.1]], min_length=7, max_length=7, default=[1.0] * 7)
+    ]
+    seasons: Annotated[list[Season], Field(default=[])]
+    length_of_stay: Annotated[list[LengthOfStayDiscount], Field(default=[])]
+
+
+class RatePlanRead(RatePlanBase):
+    id: int
+    created_at: datetime
+    updated_at: datetime | None
+
+
+class RatePlanCreate(RatePlanBase):
+    model_config = ConfigDict(extra="forbid")
+
+
+class RatePlanUpdate(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    name: Annotated[str | None, Field(examples=["Summer 2024"], default=None)]
+    weekday_multipliers: Annotated[
+        list[float] | None, Field(examples=[[1, 1, 1, 1, 1.2, 1.3, 1.1]], min_length=7, max_length=7, default=None)
+    ]
+    seasons: Annotated[list[Season] | None, Field(default=None)]
+    length_of_stay: Annotated[list[LengthOfStayDiscount] | None, Field(default=None)]
+
+
+class RatePlanUpdateInternal(RatePlanUpdate):
+    updated_at: datetime
+
+
+class QuoteRequest(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    room_ids: Annotated[list[int], Field(examples=[[1, 2, 3]], min_length=1)]
+    check_in: Annotated[datetime, Field(examples=["2022-01-01T12:00:00Z"])]
+    check_out: Annotated[datetime, Field(examples=["2022-01-02T12:00:00Z"])]
+
+
+class RoomQuote(BaseModel):
+    room_id: int
+    nightly: list[float]
+    subtotal: float
+    discount: float
+    total: float
+
+
+class QuoteRead(BaseModel):
+    check_in: datetime
+    check_out: datetime
+    nights: int
+    quotes: list[RoomQuote]
@@ -80,4 +80,18 @@ class RoomBadgeBase(BaseModel):
     description: Annotated[str, Field(examples=["A room with a view of the ocean"])]
     
 class RoomBadgeDetail(RoomBadgeBase):
-    id: int
\ No newline at end of file
+    id: int
+
+class RoomHoldCreate(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    check_in: Annotated[datetime, Field(examples=["2022-01-01T12:00:00Z"])]
+    check_out: Annotated[datetime, Field(examples=["2022-01-02T12:00:00Z"])]
+
+
+class RoomHoldRead(BaseModel):
+    hold_id: str
+    room_id: int
+    check_in: datetime
+    check_out: datetime
+    expires_at: datetime
@@ -0,0 +1,37 @@
+"""Add booking audit
+
+Revision ID: 055ec2d8bcf1
+Revises: dc3c14c45ddc
+Create Date: 2026-10-19 09:12:41.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '055ec2d8bcf1'
+down_revision: Union[str, None] = 'dc3c14c45ddc'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('booking_audit',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('booking_id', sa.Integer(), nullable=False),
+    sa.Column('action', sa.String(), nullable=False),
+    sa.Column('status', sa.String(), nullable=True),
+    sa.Column('details', sa.JSON(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('id')
+    )
+    op.create_index(op.f('ix_booking_audit_booking_id'), 'booking_audit', ['booking_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_booking_audit_booking_id'), table_name='booking_audit')
+    op.drop_table('booking_audit')
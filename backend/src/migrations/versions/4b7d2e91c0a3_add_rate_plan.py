@@ -0,0 +1,40 @@
+"""Add rate plan
+
+Revision ID: 4b7d2e91c0a3
+Revises: e0cc56b91bec
+Create Date: 2026-10-19 14:02:37.415921
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4b7d2e91c0a3'
+down_revision: Union[str, None] = 'e0cc56b91bec'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('rate_plan',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('room_id', sa.Integer(), nullable=True),
+    sa.Column('weekday_multipliers', sa.ARRAY(sa.Float()), nullable=False),
+    sa.Column('seasons', sa.JSON(), nullable=False),
+    sa.Column('length_of_stay', sa.JSON(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['room_id'], ['room.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('id')
+    )
+    op.create_index('uq_rate_plan_room_id', 'rate_plan', [sa.text('coalesce(room_id, 0)')], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('uq_rate_plan_room_id', table_name='rate_plan')
+    op.drop_table('rate_plan')
@@ -0,0 +1,60 @@
+"""Add booking archive
+
+Revision ID: 5f3b8e2c7a61
+Revises: a3d8c6f1e5b9
+Create Date: 2026-10-19 19:12:44.802315
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5f3b8e2c7a61'
+down_revision: Union[str, None] = 'a3d8c6f1e5b9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('booking_archive',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('room_id', sa.Integer(), nullable=False),
+    sa.Column('check_in', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('check_out', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('guest_name', sa.String(), nullable=False),
+    sa.Column('guest_email', sa.String(), nullable=False),
+    sa.Column('number_of_guests', sa.Integer(), nullable=False),
+    sa.Column('total_price', sa.Float(), nullable=False),
+    sa.Column('guest_contact_number', sa.String(), nullable=False),
+    sa.Column('status', sa.String(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('archived_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(
+        'ix_booking_archive_user_check_in', 'booking_archive', ['user_id', sa.text('check_in DESC')], unique=False
+    )
+    op.create_index('ix_booking_archive_check_out', 'booking_archive', ['check_out'], unique=False)
+    op.create_index(
+        'ix_booking_checked_out_check_out', 'booking', ['check_out'], unique=False,
+        postgresql_where=sa.text("status = 'checked_out' AND NOT is_deleted"),
+    )
+
+
+def downgrade() -> None:
+    # archived bookings go back to `booking` first, so nothing is lost
+    op.execute(
+        "INSERT INTO booking (id, user_id, room_id, check_in, check_out, guest_name, guest_email, number_of_guests, "
+        "total_price, guest_contact_number, status, created_at, updated_at) "
+        "SELECT id, user_id, room_id, check_in, check_out, guest_name, guest_email, number_of_guests, "
+        "total_price, guest_contact_number, status, created_at, updated_at FROM booking_archive"
+    )
+    op.drop_index('ix_booking_checked_out_check_out', table_name='booking')
+    op.drop_index('ix_booking_archive_check_out', table_name='booking_archive')
+    op.drop_index('ix_booking_archive_user_check_in', table_name='booking_archive')
+    op.drop_table('booking_archive')
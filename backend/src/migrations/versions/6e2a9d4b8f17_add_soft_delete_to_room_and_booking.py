@@ -0,0 +1,64 @@
+"""Add soft delete to room and booking
+
+Revision ID: 6e2a9d4b8f17
+Revises: 9c1f5a7e3d20
+Create Date: 2026-10-19 16:27:09.663102
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6e2a9d4b8f17'
+down_revision: Union[str, None] = '9c1f5a7e3d20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    for table in ('room', 'booking'):
+        op.add_column(table, sa.Column('is_deleted', sa.Boolean(), server_default=sa.text('false'), nullable=False))
+        # rows deleted so far only got a deleted_at
+        op.execute(f"UPDATE {table} SET is_deleted = true WHERE deleted_at IS NOT NULL")
+
+    op.create_index('ix_room_live_id', 'room', ['id'], unique=False, postgresql_where=sa.text('NOT is_deleted'))
+    op.create_index('ix_room_live_price', 'room', ['price'], unique=False, postgresql_where=sa.text('NOT is_deleted'))
+
+    # the booking indexes of the hot queries skip tombstones
+    op.drop_index('ix_booking_room_open_stay', table_name='booking')
+    op.drop_index('ix_booking_user_check_in', table_name='booking')
+    op.drop_index('ix_booking_room_status_check_out', table_name='booking')
+    op.create_index(
+        'ix_booking_room_open_stay', 'booking', ['room_id', 'check_in', 'check_out'], unique=False,
+        postgresql_where=sa.text("status IN ('booked', 'checked_in') AND NOT is_deleted"),
+    )
+    op.create_index(
+        'ix_booking_user_check_in', 'booking', ['user_id', sa.text('check_in DESC')], unique=False,
+        postgresql_where=sa.text('NOT is_deleted'),
+    )
+    op.create_index(
+        'ix_booking_room_status_check_out', 'booking', ['room_id', 'status', 'check_out'], unique=False,
+        postgresql_where=sa.text('NOT is_deleted'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_booking_room_status_check_out', table_name='booking')
+    op.drop_index('ix_booking_user_check_in', table_name='booking')
+    op.drop_index('ix_booking_room_open_stay', table_name='booking')
+    op.create_index(
+        'ix_booking_room_open_stay', 'booking', ['room_id', 'check_in', 'check_out'], unique=False,
+        postgresql_where=sa.text("status IN ('booked', 'checked_in')"),
+    )
+    op.create_index('ix_booking_user_check_in', 'booking', ['user_id', sa.text('check_in DESC')], unique=False)
+    op.create_index(
+        'ix_booking_room_status_check_out', 'booking', ['room_id', 'status', 'check_out'], unique=False
+    )
+
+    op.drop_index('ix_room_live_price', table_name='room')
+    op.drop_index('ix_room_live_id', table_name='room')
+    op.drop_column('booking', 'is_deleted')
+    op.drop_column('room', 'is_deleted')
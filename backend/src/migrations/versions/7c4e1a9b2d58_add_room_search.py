@@ -0,0 +1,56 @@
+"""Add room search
+
+Revision ID: 7c4e1a9b2d58
+Revises: 5f3b8e2c7a61
+Create Date: 2026-10-19 20:31:05.274610
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c4e1a9b2d58'
+down_revision: Union[str, None] = '5f3b8e2c7a61'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SEARCH_VECTOR = (
+    "setweight(to_tsvector('english', coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'B')"
+)
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.add_column(
+        'room',
+        sa.Column('search_vector', postgresql.TSVECTOR(), sa.Computed(SEARCH_VECTOR, persisted=True), nullable=True),
+    )
+    op.create_index(
+        'ix_room_live_search_vector', 'room', ['search_vector'], unique=False, postgresql_using='gin',
+        postgresql_where=sa.text('NOT is_deleted'),
+    )
+    op.create_index(
+        'ix_room_live_name_trgm', 'room', ['name'], unique=False, postgresql_using='gin',
+        postgresql_ops={'name': 'gin_trgm_ops'}, postgresql_where=sa.text('NOT is_deleted'),
+    )
+    op.create_index(
+        'ix_room_live_feature_ids', 'room', ['feature_ids'], unique=False, postgresql_using='gin',
+        postgresql_where=sa.text('NOT is_deleted'),
+    )
+    op.create_index(
+        'ix_room_live_badge_ids', 'room', ['badge_ids'], unique=False, postgresql_using='gin',
+        postgresql_where=sa.text('NOT is_deleted'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_room_live_badge_ids', table_name='room')
+    op.drop_index('ix_room_live_feature_ids', table_name='room')
+    op.drop_index('ix_room_live_name_trgm', table_name='room')
+    op.drop_index('ix_room_live_search_vector', table_name='room')
+    op.drop_column('room', 'search_vector')
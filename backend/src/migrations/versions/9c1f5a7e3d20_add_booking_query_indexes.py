@@ -0,0 +1,35 @@
+"""Add booking query indexes
+
+Revision ID: 9c1f5a7e3d20
+Revises: 4b7d2e91c0a3
+Create Date: 2026-10-19 15:11:48.207356
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c1f5a7e3d20'
+down_revision: Union[str, None] = '4b7d2e91c0a3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_booking_room_open_stay', 'booking', ['room_id', 'check_in', 'check_out'], unique=False,
+        postgresql_where=sa.text("status IN ('booked', 'checked_in')"),
+    )
+    op.create_index('ix_booking_user_check_in', 'booking', ['user_id', sa.text('check_in DESC')], unique=False)
+    op.create_index(
+        'ix_booking_room_status_check_out', 'booking', ['room_id', 'status', 'check_out'], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_booking_room_status_check_out', table_name='booking')
+    op.drop_index('ix_booking_user_check_in', table_name='booking')
+    op.drop_index('ix_booking_room_open_stay', table_name='booking')
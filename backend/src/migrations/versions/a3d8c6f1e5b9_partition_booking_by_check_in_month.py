@@ -0,0 +1,120 @@
+"""Partition booking by check_in month
+
+Revision ID: a3d8c6f1e5b9
+Revises: 6e2a9d4b8f17
+Create Date: 2026-10-19 17:40:52.118374
+
+"""
+from datetime import UTC, date, datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3d8c6f1e5b9'
+down_revision: Union[str, None] = '6e2a9d4b8f17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# partitions are created up front this many months past the current one, the worker keeps going from there
+MONTHS_AHEAD = 24
+
+COLUMNS = """
+    id integer NOT NULL DEFAULT nextval('booking_id_seq'::regclass),
+    user_id integer NOT NULL,
+    room_id integer NOT NULL,
+    check_in timestamp with time zone NOT NULL,
+    check_out timestamp with time zone NOT NULL,
+    guest_name varchar NOT NULL,
+    guest_email varchar NOT NULL,
+    number_of_guests integer NOT NULL,
+    total_price double precision NOT NULL,
+    guest_contact_number varchar NOT NULL,
+    created_at timestamp with time zone NOT NULL,
+    updated_at timestamp with time zone,
+    status varchar NOT NULL,
+    deleted_at timestamp with time zone,
+    is_deleted boolean NOT NULL DEFAULT false
+"""
+COLUMN_NAMES = (
+    "id, user_id, room_id, check_in, check_out, guest_name, guest_email, number_of_guests, total_price, "
+    "guest_contact_number, created_at, updated_at, status, deleted_at, is_deleted"
+)
+
+
+def _add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _create_indexes() -> None:
+    op.create_index(
+        'ix_booking_open_check_out', 'booking', ['check_out'], unique=False,
+        postgresql_where=sa.text("status IN ('booked', 'checked_in')"),
+    )
+    op.create_index(
+        'ix_booking_booked_check_in', 'booking', ['check_in'], unique=False,
+        postgresql_where=sa.text("status = 'booked'"),
+    )
+    op.create_index(
+        'ix_booking_room_open_stay', 'booking', ['room_id', 'check_in', 'check_out'], unique=False,
+        postgresql_where=sa.text("status IN ('booked', 'checked_in') AND NOT is_deleted"),
+    )
+    op.create_index(
+        'ix_booking_user_check_in', 'booking', ['user_id', sa.text('check_in DESC')], unique=False,
+        postgresql_where=sa.text('NOT is_deleted'),
+    )
+    op.create_index(
+        'ix_booking_room_status_check_out', 'booking', ['room_id', 'status', 'check_out'], unique=False,
+        postgresql_where=sa.text('NOT is_deleted'),
+    )
+
+
+def _swap(new_table: str) -> None:
+    # the sequence would be dropped with the table owning it
+    op.execute("ALTER SEQUENCE booking_id_seq OWNED BY NONE")
+    op.execute(f"INSERT INTO {new_table} ({COLUMN_NAMES}) SELECT {COLUMN_NAMES} FROM booking")
+    op.execute("DROP TABLE booking")
+    op.execute(f"ALTER TABLE {new_table} RENAME TO booking")
+    op.execute("ALTER SEQUENCE booking_id_seq OWNED BY booking.id")
+    op.create_foreign_key('booking_user_id_fkey', 'booking', 'user', ['user_id'], ['id'])
+    op.create_foreign_key('booking_room_id_fkey', 'booking', 'room', ['room_id'], ['id'])
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+    op.execute("CREATE SCHEMA IF NOT EXISTS archive")
+    op.execute(f"CREATE TABLE booking_partitioned ({COLUMNS}) PARTITION BY RANGE (check_in)")
+
+    first, last = op.get_bind().execute(sa.text("SELECT min(check_in), max(check_in) FROM booking")).one()
+    current = datetime.now(UTC).date().replace(day=1)
+    month = min(first.astimezone(UTC).date().replace(day=1), current) if first else current
+    last = max(last.astimezone(UTC).date().replace(day=1), current) if last else current
+    last = max(last, _add_months(current, MONTHS_AHEAD))
+    while month <= last:
+        name = f"booking_p{month:%Y_%m}"
+        # same as `core.db.partitions.create_partition_sql`
+        op.execute(
+            f"""
+            CREATE TABLE {name} PARTITION OF booking_partitioned (
+                CONSTRAINT {name}_no_overlap EXCLUDE USING gist (room_id WITH =, tstzrange(check_in, check_out) WITH &&)
+                WHERE (status IN ('booked', 'checked_in') AND NOT is_deleted)
+            ) FOR VALUES FROM ('{month} 00:00:00+00') TO ('{_add_months(month, 1)} 00:00:00+00')
+            """
+        )
+        month = _add_months(month, 1)
+
+    _swap('booking_partitioned')
+    op.create_primary_key('booking_pkey', 'booking', ['id', 'check_in'])
+    _create_indexes()
+
+
+def downgrade() -> None:
+    # partitions detached to the archive schema are left there
+    op.execute(f"CREATE TABLE booking_plain ({COLUMNS})")
+    _swap('booking_plain')
+    op.create_primary_key('booking_pkey', 'booking', ['id'])
+    op.create_unique_constraint('booking_id_key', 'booking', ['id'])
+    _create_indexes()
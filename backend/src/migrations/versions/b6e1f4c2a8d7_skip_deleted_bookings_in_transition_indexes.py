@@ -0,0 +1,42 @@
+"""Skip deleted bookings in the transition indexes
+
+Revision ID: b6e1f4c2a8d7
+Revises: 7c4e1a9b2d58
+Create Date: 2026-10-19 23:08:41.516230
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6e1f4c2a8d7'
+down_revision: Union[str, None] = '7c4e1a9b2d58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _create_transition_indexes(live: str) -> None:
+    op.create_index(
+        'ix_booking_open_check_out', 'booking', ['check_out'], unique=False,
+        postgresql_where=sa.text(f"status IN ('booked', 'checked_in'){live}"),
+    )
+    op.create_index(
+        'ix_booking_booked_check_in', 'booking', ['check_in'], unique=False,
+        postgresql_where=sa.text(f"status = 'booked'{live}"),
+    )
+
+
+def upgrade() -> None:
+    # the scheduled transitions leave soft deleted bookings alone
+    op.drop_index('ix_booking_booked_check_in', table_name='booking')
+    op.drop_index('ix_booking_open_check_out', table_name='booking')
+    _create_transition_indexes(' AND NOT is_deleted')
+
+
+def downgrade() -> None:
+    op.drop_index('ix_booking_booked_check_in', table_name='booking')
+    op.drop_index('ix_booking_open_check_out', table_name='booking')
+    _create_transition_indexes('')
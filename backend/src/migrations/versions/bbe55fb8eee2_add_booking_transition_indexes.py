@@ -0,0 +1,34 @@
+"""Add booking transition indexes
+
+Revision ID: bbe55fb8eee2
+Revises: 055ec2d8bcf1
+Create Date: 2026-10-19 10:02:13.540981
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'bbe55fb8eee2'
+down_revision: Union[str, None] = '055ec2d8bcf1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_booking_open_check_out', 'booking', ['check_out'], unique=False,
+        postgresql_where=sa.text("status IN ('booked', 'checked_in')"),
+    )
+    op.create_index(
+        'ix_booking_booked_check_in', 'booking', ['check_in'], unique=False,
+        postgresql_where=sa.text("status = 'booked'"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_booking_booked_check_in', table_name='booking')
+    op.drop_index('ix_booking_open_check_out', table_name='booking')
@@ -0,0 +1,34 @@
+"""Add booking daily rollup
+
+Revision ID: e0cc56b91bec
+Revises: bbe55fb8eee2
+Create Date: 2026-10-19 11:24:05.812337
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e0cc56b91bec'
+down_revision: Union[str, None] = 'bbe55fb8eee2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('booking_daily_rollup',
+    sa.Column('room_id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('nights_sold', sa.Integer(), nullable=False),
+    sa.Column('revenue', sa.Float(), nullable=False),
+    sa.PrimaryKeyConstraint('room_id', 'day')
+    )
+    op.create_index(op.f('ix_booking_daily_rollup_day'), 'booking_daily_rollup', ['day'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_booking_daily_rollup_day'), table_name='booking_daily_rollup')
+    op.drop_table('booking_daily_rollup')
@@ -1,8 +1,11 @@
+import uuid as uuid_pkg
+from fnmatch import fnmatchcase
 from typing import Any, Callable, Generator
 
 import pytest
 from faker import Faker
 from fastapi.testclient import TestClient
+from redis.exceptions import ResponseError
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.orm.session import Session
@@ -37,3 +40,142 @@ def db() -> Generator[Session, Any, None]:
 
 def override_dependency(dependency: Callable[..., Any], mocked_response: Any) -> None:
     app.dependency_overrides[dependency] = lambda: mocked_response
+
+
+def _encode(value: Any) -> bytes:
+    return value if isinstance(value, bytes) else str(value).encode()
+
+
+class InMemoryRedis:
+    """The Redis commands the app uses, kept in a dict with Redis' bytes values (expiry is ignored)."""
+
+    def __init__(self) -> None:
+        self.data: dict[str, Any] = {}
+
+    async def set(self, key: str, value: Any, nx: bool = False, ex: int | None = None) -> bool:
+        if nx and key in self.data:
+            return False
+        self.data[key] = _encode(value)
+        return True
+
+    async def get(self, key: str) -> bytes | None:
+        return self.data.get(key)
+
+    async def incr(self, key: str) -> int:
+        value = int(self.data.get(key, 0)) + 1
+        self.data[key] = _encode(value)
+        return value
+
+    def _hash(self, key: str) -> dict[bytes, bytes]:
+        fields = self.data.get(key, {})
+        if not isinstance(fields, dict):
+            raise ResponseError("WRONGTYPE Operation against a key holding the wrong kind of value")
+        return fields
+
+    async def hset(self, key: str, field: Any = None, value: Any = None, mapping: dict | None = None) -> None:
+        fields = self.data[key] = self._hash(key)
+        if field is not None:
+            fields[_encode(field)] = _encode(value)
+        for name, item in (mapping or {}).items():
+            fields[_encode(name)] = _encode(item)
+
+    async def hget(self, key: str, field: Any) -> bytes | None:
+        return self._hash(key).get(_encode(field))
+
+    async def hmget(self, key: str, fields: list) -> list[bytes | None]:
+        return [await self.hget(key, field) for field in fields]
+
+    async def hgetall(self, key: str) -> dict[bytes, bytes]:
+        return dict(self._hash(key))
+
+    async def hincrby(self, key: str, field: Any, amount: int = 1) -> int:
+        value = int(await self.hget(key, field) or 0) + amount
+        await self.hset(key, field, value)
+        return value
+
+    async def delete(self, *keys: str) -> None:
+        for key in keys:
+            self.data.pop(key, None)
+
+    async def expire(self, key: str, ttl: int, nx: bool = False) -> None:
+        pass
+
+    async def scan(self, cursor: int, match: str = "*", count: int | None = None) -> tuple[int, list[str]]:
+        return 0, [key for key in self.data if fnmatchcase(key, match)]
+
+    def pipeline(self, transaction: bool = True) -> "InMemoryPipeline":
+        return InMemoryPipeline(self)
+
+
+class InMemoryPipeline:
+    """Queues `InMemoryRedis` commands and runs them in order on `execute`."""
+
+    def __init__(self, redis: InMemoryRedis) -> None:
+        self.redis = redis
+        self.commands: list[tuple[str, tuple, dict]] = []
+
+    async def __aenter__(self) -> "InMemoryPipeline":
+        return self
+
+    async def __aexit__(self, *args: object) -> None:
+        pass
+
+    def __getattr__(self, name: str) -> Callable[..., None]:
+        getattr(self.redis, name)
+        return lambda *args, **kwargs: self.commands.append((name, args, kwargs))
+
+    async def execute(self) -> list:
+        results = [await getattr(self.redis, name)(*args, **kwargs) for name, args, kwargs in self.commands]
+        self.commands = []
+        return results
+
+
+class InMemoryQueue(InMemoryRedis):
+    """An arq pool recording the jobs it queues, dropping a job whose id is already queued as arq does."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.jobs: dict[str, tuple] = {}
+
+    async def enqueue_job(self, function: str, *args: Any, _job_id: str | None = None, **kwargs: Any) -> str | None:
+        if _job_id in self.jobs:
+            return None
+        job_id = _job_id or uuid_pkg.uuid4().hex
+        self.jobs[job_id] = (function, *args)
+        return job_id
+
+
+class FakeSession:
+    """An `AsyncSession` stand-in recording the statements it executes and answering each with `rows`."""
+
+    def __init__(self, rows: list | None = None, count: int = 0) -> None:
+        self.rows, self.count, self.statements, self.commits = rows or [], count, [], 0
+
+    async def execute(self, stmt: object) -> "FakeSession":
+        self.statements.append(stmt)
+        return self
+
+    async def scalar(self, stmt: object) -> int:
+        self.statements.append(stmt)
+        return self.count
+
+    def mappings(self) -> "FakeSession":
+        return self
+
+    def tuples(self) -> "FakeSession":
+        return self
+
+    def __iter__(self) -> Any:
+        return iter(self.rows)
+
+    def all(self) -> list:
+        return self.rows
+
+    def first(self) -> Any:
+        return self.rows[0] if self.rows else None
+
+    def scalar_one(self) -> int:
+        return self.count
+
+    async def commit(self) -> None:
+        self.commits += 1
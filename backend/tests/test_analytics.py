@@ -0,0 +1,72 @@
+from datetime import date
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.app.api.dependencies import get_current_superuser
+from src.app.core.utils import queue
+from src.app.core.utils.analytics import kpis, period_starts
+from src.app.main import app
+from tests.conftest import InMemoryQueue
+
+
+def test_period_starts_align_weeks_and_months() -> None:
+    assert period_starts(date(2024, 1, 30), date(2024, 3, 2), "month") == [
+        date(2024, 1, 30),
+        date(2024, 2, 1),
+        date(2024, 3, 1),
+    ]
+    # 2024-01-03 is a Wednesday
+    assert period_starts(date(2024, 1, 3), date(2024, 1, 16), "week") == [
+        date(2024, 1, 3),
+        date(2024, 1, 8),
+        date(2024, 1, 15),
+    ]
+    assert period_starts(date(2024, 12, 20), date(2025, 1, 2), "month") == [date(2024, 12, 20), date(2025, 1, 1)]
+
+
+def test_kpis_occupancy_adr_revpar() -> None:
+    # 2 rooms over 4 days: room 1 sold 3 nights at 100, room 2 sold 1 night at 200
+    days = [date(2024, 5, 1), date(2024, 5, 2), date(2024, 5, 3), date(2024, 5, 2)]
+    nights_sold = [1, 1, 1, 1]
+    revenue = [100.0, 100.0, 100.0, 200.0]
+
+    [total] = kpis(date(2024, 5, 1), date(2024, 5, 5), "total", days, nights_sold, revenue, room_count=2)
+    assert total["nights_sold"] == 4
+    assert total["available_nights"] == 8
+    assert total["occupancy"] == 0.5
+    assert total["adr"] == 125.0
+    assert total["revpar"] == 62.5
+
+    daily = kpis(date(2024, 5, 1), date(2024, 5, 5), "day", days, nights_sold, revenue, room_count=2)
+    assert [day["occupancy"] for day in daily] == [0.5, 1.0, 0.5, 0.0]
+    assert [day["adr"] for day in daily] == [100.0, 150.0, 100.0, 0.0]
+    assert daily[-1]["end"] == date(2024, 5, 5)
+
+
+def test_kpis_without_rows() -> None:
+    [total] = kpis(date(2024, 5, 1), date(2024, 5, 8), "total", [], [], [], room_count=0)
+    assert (total["occupancy"], total["adr"], total["revpar"]) == (0.0, 0.0, 0.0)
+
+
+def test_rollup_rebuilds_of_different_ranges_are_all_queued(monkeypatch: pytest.MonkeyPatch) -> None:
+    async def superuser() -> dict:
+        return {"id": 1, "is_superuser": True}
+
+    pool = InMemoryQueue()
+    monkeypatch.setattr(queue, "pool", pool)
+    monkeypatch.setitem(app.dependency_overrides, get_current_superuser, superuser)
+    client = TestClient(app)
+    may = client.post("/api/v1/analytics/rollup/rebuild", params={"start": "2024-05-01", "end": "2024-06-01"})
+    june = client.post("/api/v1/analytics/rollup/rebuild", params={"start": "2024-06-01", "end": "2024-07-01"})
+    again = client.post("/api/v1/analytics/rollup/rebuild", params={"start": "2024-05-01", "end": "2024-06-01"})
+    everything = client.post("/api/v1/analytics/rollup/rebuild")
+
+    assert {response.status_code for response in (may, june, again, everything)} == {202}
+    assert may.json() == again.json() == {"id": "booking_rollup:rebuild:2024-05-01:2024-06-01"}
+    assert everything.json() == {"id": "booking_rollup:rebuild:first:last"}
+    assert list(pool.jobs.values()) == [
+        ("rebuild_booking_rollup", date(2024, 5, 1), date(2024, 6, 1)),
+        ("rebuild_booking_rollup", date(2024, 6, 1), date(2024, 7, 1)),
+        ("rebuild_booking_rollup", None, None),
+    ]
@@ -0,0 +1,60 @@
+import asyncio
+
+import orjson
+import pytest
+
+from src.app.api.dependencies import batch_ids, select_fields
+from src.app.api.v1 import rooms as rooms_api
+from src.app.core.exceptions.http_exceptions import BadRequestException
+from src.app.core.utils.batch import BATCH_MAX_IDS, in_request_order, unique_ids
+from src.app.schemas.user import UserRead
+
+
+def test_unique_ids_keep_the_first_occurrence() -> None:
+    assert unique_ids([3, 1, 3, 2, 1]) == [3, 1, 2]
+
+
+@pytest.mark.parametrize("ids", [[], list(range(BATCH_MAX_IDS + 1))])
+def test_batch_ids_are_bounded(ids: list[int]) -> None:
+    with pytest.raises(BadRequestException):
+        batch_ids(ids)
+
+
+def test_in_request_order_reports_missing_ids() -> None:
+    rows = [{"id": 1, "name": "a"}, {"id": 3, "name": "c"}]
+    assert in_request_order(rows, [3, 2, 1, 4]) == {
+        "data": [{"id": 3, "name": "c"}, {"id": 1, "name": "a"}],
+        "missing_ids": [2, 4],
+    }
+
+
+def test_batch_reads_always_select_the_id() -> None:
+    assert list(select_fields("email,name", UserRead, "id").model_fields) == ["id", "name", "email"]
+    assert select_fields(None, UserRead, "id") is UserRead
+
+
+def test_rooms_batch_resolves_with_one_query_per_kind(monkeypatch: pytest.MonkeyPatch) -> None:
+    calls: list[tuple] = []
+
+    class Crud:
+        def __init__(self, kind: str, rows: list[dict]) -> None:
+            self.kind, self.rows = kind, rows
+
+        async def get_multi(self, db: object, schema_to_select: object, limit: None, id__in: list[int], **kw) -> dict:
+            calls.append((self.kind, list(schema_to_select.model_fields), id__in))
+            return {"data": [row for row in self.rows if row["id"] in id__in]}
+
+    rooms = [{"id": 1, "name": "a", "badge_ids": [7]}, {"id": 2, "name": "b", "badge_ids": [7, 8]}]
+    monkeypatch.setattr(rooms_api, "crud_rooms", Crud("rooms", rooms))
+    monkeypatch.setattr(rooms_api, "crud_room_badges", Crud("badges", [{"id": 7}, {"id": 8}]))
+
+    response = asyncio.run(rooms_api.read_rooms_batch(None, None, [2, 5, 1], "name,badges"))
+    assert orjson.loads(response.body) == {
+        "data": [
+            {"id": 2, "name": "b", "badges": [{"id": 7}, {"id": 8}]},
+            {"id": 1, "name": "a", "badges": [{"id": 7}]},
+        ],
+        "missing_ids": [5],
+    }
+    assert [(kind, ids) for kind, _, ids in calls] == [("rooms", [2, 5, 1]), ("badges", [7, 8])]
+    assert calls[0][1] == ["id", "name", "badge_ids"]
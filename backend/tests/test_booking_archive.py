@@ -0,0 +1,71 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from src.app.core.config import settings
+from src.app.core.worker import functions
+from src.app.crud.crud_booking_archive import _ARCHIVE_BATCH, ARCHIVED_COLUMNS, _with_archive
+from src.app.models import Booking, BookingArchive
+from src.app.schemas.booking import BookingArchiveRead
+
+
+def test_archive_keeps_every_booking_column() -> None:
+    archived = set(ARCHIVED_COLUMNS.split(", "))
+    assert archived <= set(Booking.__table__.columns.keys())
+    assert set(Booking.__table__.columns.keys()) - archived == {"deleted_at", "is_deleted"}
+
+
+def test_archive_batch_uses_the_partial_index() -> None:
+    index = next(index for index in Booking.__table__.indexes if index.name == "ix_booking_checked_out_check_out")
+    assert str(index.dialect_options["postgresql"]["where"]) in _ARCHIVE_BATCH.text
+    assert "FOR UPDATE SKIP LOCKED" in _ARCHIVE_BATCH.text
+
+
+def test_reads_with_archive_have_the_same_shape_on_both_sides() -> None:
+    union = _with_archive(user_id=1).element
+    live, archived = union.selects
+    for select in (live, archived):
+        assert [column.name for column in select.selected_columns] == list(BookingArchiveRead.model_fields)
+
+    sql = str(union.compile(dialect=postgresql.dialect()))
+    live_sql, archived_sql = sql.split("UNION ALL")
+    assert "NULL AS archived_at" in live_sql and "booking.is_deleted = false" in live_sql
+    assert "NULL AS deleted_at" in archived_sql and "is_deleted" not in archived_sql
+    assert BookingArchive.__tablename__ in archived_sql
+
+
+@pytest.fixture
+def archive_batches(monkeypatch: pytest.MonkeyPatch) -> list[int]:
+    batches = [3, 3, 1]
+    calls: list[int] = []
+
+    @asynccontextmanager
+    async def session():
+        yield None
+
+    async def archive(db: object, cutoff: object, batch_size: int) -> list[int]:
+        calls.append(batch_size)
+        return list(range(batches[len(calls) - 1]))
+
+    monkeypatch.setattr(functions, "local_session", session)
+    monkeypatch.setattr(functions, "archive_due_bookings", archive)
+    monkeypatch.setattr(settings, "BOOKING_ARCHIVE_BATCH_SIZE", 3)
+    return calls
+
+
+def test_archive_job_runs_batches_until_one_is_short(archive_batches: list[int]) -> None:
+    assert asyncio.run(functions.archive_old_bookings({})) == {"archived": 7, "batches": 3}
+    assert archive_batches == [3, 3, 3]
+
+
+def test_archive_job_stops_at_max_batches(monkeypatch: pytest.MonkeyPatch, archive_batches: list[int]) -> None:
+    monkeypatch.setattr(settings, "BOOKING_ARCHIVE_MAX_BATCHES", 2)
+    assert asyncio.run(functions.archive_old_bookings({})) == {"archived": 6, "batches": 2}
+
+
+def test_archive_job_can_be_disabled(monkeypatch: pytest.MonkeyPatch, archive_batches: list[int]) -> None:
+    monkeypatch.setattr(settings, "BOOKING_ARCHIVE_AFTER_DAYS", 0)
+    assert asyncio.run(functions.archive_old_bookings({})) == {"archived": 0, "batches": 0}
+    assert archive_batches == []
@@ -0,0 +1,20 @@
+from datetime import UTC, datetime, time, timedelta
+
+import pytest
+
+from src.app.api.v1.booking import _check_stay
+from src.app.core.config import settings
+from src.app.core.db.partitions import add_months, month_start
+from src.app.core.exceptions.http_exceptions import BadRequestException
+
+MONTHS_AHEAD = settings.BOOKING_PARTITION_MONTHS_AHEAD
+
+
+@pytest.mark.parametrize("months", [-1, 0, MONTHS_AHEAD - 1, MONTHS_AHEAD])
+def test_stays_are_bounded_to_the_attached_partitions(months: int) -> None:
+    check_in = datetime.combine(add_months(month_start(datetime.now(UTC)), months), time(14), tzinfo=UTC)
+    if 0 <= months < MONTHS_AHEAD:
+        _check_stay(check_in, check_in + timedelta(days=2))
+    else:
+        with pytest.raises(BadRequestException):
+            _check_stay(check_in, check_in + timedelta(days=2))
@@ -0,0 +1,161 @@
+"""EXPLAIN the booking queries of the hot endpoints against a seeded table, so their plans can't silently regress.
+
+Needs the Postgres database of `conftest` with the migrations applied. Everything seeded is rolled back.
+"""
+import asyncio
+from collections.abc import Generator, Iterator
+from datetime import UTC, date, datetime
+
+import orjson
+import pytest
+from sqlalchemy import Connection, Select, text
+from sqlalchemy.dialects import postgresql
+
+from src.app.core.db.partitions import add_months, create_partition_sql, partition_name
+from src.app.crud.crud_booking import crud_bookings, open_overlap_filters
+from src.app.schemas.booking import BookingRead
+from tests.conftest import sync_engine
+
+USERS = 2_000
+ROOMS = 300
+BOOKINGS = 300_000
+# bookings check in over ~5.5 years from 2020-01-01 (2 * BOOKINGS / ROOMS days)
+SEEDED_MONTHS = [add_months(date(2020, 1, 1), i) for i in range(66)]
+
+
+@pytest.fixture(scope="module")
+def seeded() -> Generator[Connection, None, None]:
+    with sync_engine.connect() as conn:
+        transaction = conn.begin()
+        for month in SEEDED_MONTHS:
+            conn.execute(text(create_partition_sql(month)))
+        conn.execute(
+            text(
+                """
+                INSERT INTO "user" (name, username, email, hashed_password, phone_number, role, profile_image_url,
+                                    uuid, created_at, is_deleted, is_superuser)
+                SELECT 'Plan ' || i, 'plan_' || i, 'plan_' || i || '@example.com', 'x', 'p' || i, 'customer', '',
+                       gen_random_uuid(), now(), false, false
+                FROM generate_series(1, :users) AS i
+                """
+            ),
+            {"users": USERS},
+        )
+        conn.execute(
+            text(
+                """
+                INSERT INTO room (name, description, image_2d, price, status, feature_ids, badge_ids, created_at)
+                SELECT 'plan room ' || i, '', '', 100, 'available', '{}', '{}', now()
+                FROM generate_series(1, :rooms) AS i
+                """
+            ),
+            {"rooms": ROOMS},
+        )
+        # mostly history, as in production: ~3% of bookings are still open. Each room's stays follow each other
+        # (room i % ROOMS, checking in 2 * (i / ROOMS) days in), so open stays never trip the exclusion constraint
+        conn.execute(
+            text(
+                """
+                INSERT INTO booking (user_id, room_id, check_in, check_out, guest_name, guest_email, number_of_guests,
+                                     total_price, guest_contact_number, created_at, status)
+                SELECT u.id, r.id, stay.check_in, stay.check_in + interval '2 days', 'guest', 'guest@example.com', 1,
+                       200, '+1', now(), CASE WHEN i % 33 = 0 THEN 'booked' WHEN i % 17 = 0 THEN 'cancelled'
+                                              ELSE 'checked_out' END
+                FROM generate_series(1, :bookings) AS i
+                CROSS JOIN LATERAL (
+                    SELECT timestamptz '2020-01-01 00:00:00+00' + (i / :rooms) * 2 * interval '1 day' AS check_in
+                ) AS stay
+                JOIN (SELECT id, row_number() OVER (ORDER BY id) - 1 AS n FROM "user" WHERE username LIKE 'plan\\_%')
+                    AS u ON u.n = i % :users
+                JOIN (SELECT id, row_number() OVER (ORDER BY id) - 1 AS n FROM room WHERE name LIKE 'plan room %')
+                    AS r ON r.n = i % :rooms
+                """
+            ),
+            {"bookings": BOOKINGS, "users": USERS, "rooms": ROOMS},
+        )
+        conn.execute(text("ANALYZE booking"))
+        yield conn
+        transaction.rollback()
+
+
+def _plan(conn: Connection, stmt: Select) -> dict:
+    sql = stmt.compile(dialect=postgresql.psycopg.dialect(), compile_kwargs={"literal_binds": True})
+    return orjson.loads(conn.execute(text(f"EXPLAIN (FORMAT JSON) {sql}")).scalar_one())[0]["Plan"]
+
+
+def _nodes(plan: dict) -> Iterator[dict]:
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from _nodes(child)
+
+
+def _assert_index_scan(conn: Connection, plan: dict, index: str) -> None:
+    # scans run on the partitions, through their copies of the index
+    partition_indexes = set(
+        conn.execute(
+            text("SELECT inhrelid::regclass::text FROM pg_inherits WHERE inhparent = CAST(:index AS regclass)"),
+            {"index": index},
+        ).scalars()
+    )
+    nodes = list(_nodes(plan))
+    # empty partitions (months ahead) may well be seq scanned, the seeded ones never
+    seeded = {partition_name(month) for month in SEEDED_MONTHS}
+    seq_scans = [node for node in nodes if node["Node Type"] == "Seq Scan" and node.get("Relation Name") in seeded]
+    assert not seq_scans, orjson.dumps(plan).decode()
+    assert {node.get("Index Name") for node in nodes} & (partition_indexes | {index}), orjson.dumps(plan).decode()
+
+
+def _ids(conn: Connection, sql: str) -> tuple[int, int]:
+    return conn.execute(text(sql)).one()
+
+
+def test_overlap_check_uses_the_open_stay_index(seeded: Connection) -> None:
+    room_id, _ = _ids(seeded, "SELECT min(room_id), 0 FROM booking")
+    # as in `write_booking` and `update_booking`
+    stmt = asyncio.run(
+        crud_bookings.select(
+            **open_overlap_filters(room_id, datetime(2024, 6, 1, tzinfo=UTC), datetime(2024, 6, 3, tzinfo=UTC))
+        )
+    ).limit(1)
+    plan = _plan(seeded, stmt)
+    _assert_index_scan(seeded, plan, "ix_booking_room_open_stay")
+    # the check-in bound prunes every partition older than the longest stay
+    scanned = {node["Relation Name"] for node in _nodes(plan) if "Relation Name" in node}
+    assert len(scanned) <= 5, scanned
+
+
+def test_user_bookings_use_the_user_check_in_index(seeded: Connection) -> None:
+    user_id, _ = _ids(seeded, "SELECT min(user_id), 0 FROM booking")
+    # as in `read_user_bookings`
+    stmt = asyncio.run(
+        crud_bookings.select(
+            schema_to_select=BookingRead,
+            sort_columns=["check_in"],
+            sort_orders="desc",
+            is_deleted=False,
+            user_id=user_id,
+        )
+    ).limit(10)
+    plan = _plan(seeded, stmt)
+    _assert_index_scan(seeded, plan, "ix_booking_user_check_in")
+    # each partition's index returns rows newest first, partitions are merged rather than sorted
+    assert "Sort" not in {node["Node Type"] for node in _nodes(plan)}
+
+
+def test_room_bookings_use_the_room_status_check_out_index(seeded: Connection) -> None:
+    room_id, _ = _ids(seeded, "SELECT min(room_id), 0 FROM booking")
+    # as in `read_room_bookings`
+    stmt = asyncio.run(
+        crud_bookings.select(
+            schema_to_select=BookingRead,
+            sort_columns=["check_out"],
+            sort_orders="asc",
+            is_deleted=False,
+            room_id=room_id,
+            status="booked",
+            check_out__gte=datetime(2024, 5, 1, tzinfo=UTC),
+            check_out__lte=datetime(2024, 7, 1, tzinfo=UTC),
+        )
+    ).limit(10)
+    _assert_index_scan(seeded, _plan(seeded, stmt), "ix_booking_room_status_check_out")
+
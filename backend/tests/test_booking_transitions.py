@@ -0,0 +1,241 @@
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import UTC, date, datetime, timedelta
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from src.app.api.v1 import booking as booking_api
+from src.app.core.config import settings
+from src.app.core.exceptions.http_exceptions import CustomException, NotFoundException
+from src.app.core.utils import booking_jobs
+from src.app.core.worker import functions
+from src.app.crud.crud_booking import transition_booking, transition_due_bookings
+from src.app.schemas.booking import BookingStatusUpdate, BookingUpdate
+from tests.conftest import FakeSession, InMemoryQueue
+
+STAY = {"room_id": 3, "check_in": datetime(2024, 3, 10, tzinfo=UTC), "check_out": datetime(2024, 3, 12, tzinfo=UTC)}
+
+
+@pytest.fixture
+def side_effects(monkeypatch: pytest.MonkeyPatch) -> list[tuple]:
+    calls: list[tuple] = []
+
+    async def update_occupancy(*args: object) -> None:
+        calls.append(("occupancy", *args))
+
+    async def enqueue(*args: object, **kwargs: object) -> None:
+        calls.append(("enqueue", *args, kwargs.get("notify")))
+
+    monkeypatch.setattr(booking_api, "_update_occupancy", update_occupancy)
+    monkeypatch.setattr(booking_api, "_enqueue_booking_side_effects", enqueue)
+    return calls
+
+
+def _transition(monkeypatch: pytest.MonkeyPatch, result: dict | None) -> None:
+    async def transition(db: object, id: int, to_status: str) -> dict | None:
+        return result
+
+    monkeypatch.setattr(booking_api, "transition_booking", transition)
+
+
+@pytest.mark.parametrize(
+    "previous_status, transitioned, message",
+    [
+        ("booked", True, "Booking cancelled successfully"),
+        ("cancelled", False, "Booking already cancelled"),
+        ("checked_out", False, "Booking already checked out"),
+        ("checked_in", False, "Booking is checked_in, it can not be cancelled"),
+    ],
+)
+def test_cancel_maps_the_transition_outcome(
+    monkeypatch: pytest.MonkeyPatch, side_effects: list, previous_status: str, transitioned: bool, message: str
+) -> None:
+    _transition(monkeypatch, {**STAY, "previous_status": previous_status, "transitioned": transitioned})
+    assert asyncio.run(booking_api.cancel_booking(None, 1, None)) == {"message": message}
+    if transitioned:
+        assert side_effects[0] == ("occupancy", 3, STAY["check_in"], STAY["check_out"], False)
+        assert side_effects[1][-1] == "cancelled"
+    else:
+        assert side_effects == []
+
+
+def test_cancel_missing_booking(monkeypatch: pytest.MonkeyPatch, side_effects: list) -> None:
+    _transition(monkeypatch, None)
+    with pytest.raises(NotFoundException):
+        asyncio.run(booking_api.cancel_booking(None, 1, None))
+
+
+def test_status_update_rejects_a_disallowed_move(monkeypatch: pytest.MonkeyPatch, side_effects: list) -> None:
+    _transition(monkeypatch, {**STAY, "previous_status": "checked_out", "transitioned": False})
+    with pytest.raises(CustomException) as e:
+        asyncio.run(booking_api.update_booking_status(None, 1, BookingStatusUpdate(status="checked_in"), None))
+    assert e.value.status_code == 409
+
+
+def test_check_in_keeps_the_room_occupied(monkeypatch: pytest.MonkeyPatch, side_effects: list) -> None:
+    _transition(monkeypatch, {**STAY, "previous_status": "booked", "transitioned": True})
+    response = asyncio.run(booking_api.update_booking_status(None, 1, BookingStatusUpdate(status="checked_in"), None))
+    assert response["previous_status"] == "booked"
+    assert [call[0] for call in side_effects] == ["enqueue"]
+
+
+def test_only_allowed_transitions_can_be_asked_for() -> None:
+    with pytest.raises(ValueError):
+        asyncio.run(transition_booking(None, 1, "booked"))
+    with pytest.raises(ValueError):
+        asyncio.run(transition_due_bookings(None, ("cancelled",), "checked_out", "check_out", datetime.now(UTC), 10))
+
+
+@pytest.fixture
+def stored_booking(monkeypatch: pytest.MonkeyPatch) -> tuple[dict, list[dict]]:
+    """A booked two night stay, and the values `crud_bookings.update` is called with."""
+    check_in = datetime.now(UTC).replace(hour=14, minute=0, second=0, microsecond=0) + timedelta(days=7)
+    booking = {"id": 1, "status": "booked", "room_id": 3, "check_in": check_in}
+    booking["check_out"] = check_in + timedelta(days=2)
+    updates: list[dict] = []
+
+    async def get(db: object, schema_to_select: object, **kwargs: object) -> dict:
+        return booking
+
+    async def exists(db: object, **kwargs: object) -> bool:
+        assert kwargs["id__ne"] == 1
+        return False
+
+    async def update(db: object, id: int, object: dict) -> None:
+        updates.append(object)
+
+    async def quote(db: object, room_ids: list[int], check_in: datetime, check_out: datetime) -> dict:
+        return {room_id: {"total": 100.0 * (check_out - check_in).days} for room_id in room_ids}
+
+    monkeypatch.setattr(booking_api.crud_bookings, "get", get)
+    monkeypatch.setattr(booking_api.crud_bookings, "exists", exists)
+    monkeypatch.setattr(booking_api.crud_bookings, "update", update)
+    monkeypatch.setattr(booking_api.pricing, "quote", quote)
+    return booking, updates
+
+
+def test_update_reprices_a_changed_stay(stored_booking: tuple[dict, list[dict]], side_effects: list) -> None:
+    booking, updates = stored_booking
+    values = BookingUpdate(check_out=booking["check_out"] + timedelta(days=1), guest_name="Jane Doe")
+    asyncio.run(booking_api.update_booking(None, 1, values, None))
+
+    assert updates == [{"check_out": values.check_out, "guest_name": "Jane Doe", "total_price": 300.0}]
+
+
+def test_update_keeps_the_price_of_an_unchanged_stay(
+    stored_booking: tuple[dict, list[dict]], side_effects: list
+) -> None:
+    _, updates = stored_booking
+    asyncio.run(booking_api.update_booking(None, 1, BookingUpdate(guest_name="Jane Doe"), None))
+
+    assert updates == [{"guest_name": "Jane Doe"}]
+
+
+@pytest.mark.parametrize("field, value", [("total_price", 1), ("status", "checked_out")])
+def test_update_does_not_take_a_price_or_status(field: str, value: object) -> None:
+    with pytest.raises(ValueError):
+        BookingUpdate(**{field: value})
+
+
+def test_transition_is_one_guarded_update() -> None:
+    db = FakeSession([{**STAY, "previous_status": "checked_in", "transitioned": False}])
+    result = asyncio.run(transition_booking(db, 7, "checked_out"))
+
+    assert result == {**STAY, "previous_status": "checked_in", "transitioned": False}
+    assert len(db.statements) == 1 and db.commits == 1
+    sql = " ".join(
+        str(db.statements[0].compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True})).split()
+    )
+    # the row is locked before its status is read, and only updated from a status the move is allowed from
+    assert "WHERE booking.id = 7 AND booking.is_deleted IS false FOR UPDATE" in sql
+    assert "UPDATE booking SET updated_at=now(), status='checked_out' FROM target" in sql
+    assert "WHERE booking.id = target.id AND target.status IN ('booked', 'checked_in') RETURNING booking.id" in sql
+    assert "FROM target LEFT OUTER JOIN moved ON moved.id = target.id" in sql
+
+
+@pytest.fixture
+def due_bookings(monkeypatch: pytest.MonkeyPatch) -> list[tuple]:
+    check_in = datetime(2024, 3, 10, 14, tzinfo=UTC)
+    batches = [
+        [(1, 3, check_in, check_in + timedelta(days=2)), (2, 4, check_in, check_in + timedelta(days=1))],
+        [(5, 3, check_in + timedelta(days=2), check_in + timedelta(days=3))],
+    ]
+    calls: list[tuple] = []
+
+    @asynccontextmanager
+    async def session():
+        yield None
+
+    async def transition(db: object, from_statuses: tuple, to_status: str, *args: object) -> list[tuple]:
+        calls.append((from_statuses, to_status))
+        return batches[len(calls) - 1] if len(calls) <= len(batches) else []
+
+    monkeypatch.setattr(functions, "local_session", session)
+    monkeypatch.setattr(functions, "transition_due_bookings", transition)
+    monkeypatch.setattr(settings, "BOOKING_TRACK_CHECK_IN", False)
+    monkeypatch.setattr(settings, "BOOKING_TRANSITION_BATCH_SIZE", 2)
+    return calls
+
+
+def test_auto_transitions_queue_the_side_effects_of_every_booking(due_bookings: list[tuple]) -> None:
+    queue = InMemoryQueue()
+    metrics = asyncio.run(functions.auto_transition_bookings({"redis": queue}))
+
+    assert metrics["checked_out"] == 3 and metrics["batches"] == 2
+    assert due_bookings == [(("booked",), "checked_out")] * 2
+    assert sorted(job for job in queue.jobs.values() if job[0] == "record_booking_audit") == [
+        ("record_booking_audit", id, "updated", "checked_out") for id in (1, 2, 5)
+    ]
+    assert sorted(job for job in queue.jobs.values() if job[0] == "refresh_room_availability") == [
+        ("refresh_room_availability", 3, 1),
+        ("refresh_room_availability", 3, 2),
+        ("refresh_room_availability", 4, 1),
+    ]
+    assert sorted(job for job in queue.jobs.values() if job[0] == "refresh_booking_rollup") == [
+        ("refresh_booking_rollup", 3, date(2024, 3, 10), date(2024, 3, 12), 1),
+        ("refresh_booking_rollup", 3, date(2024, 3, 12), date(2024, 3, 13), 1),
+        ("refresh_booking_rollup", 4, date(2024, 3, 10), date(2024, 3, 11), 1),
+    ]
+    assert not any(job[0] == "send_booking_notification" for job in queue.jobs.values())
+
+
+def test_rollup_refreshes_queue_every_change_and_skip_superseded_jobs(monkeypatch: pytest.MonkeyPatch) -> None:
+    recomputed = []
+
+    async def recompute_daily_rollup(db: object, start: date, end: date, room_id: int) -> int:
+        recomputed.append((room_id, start, end))
+        return 1
+
+    @asynccontextmanager
+    async def session():
+        yield None
+
+    monkeypatch.setattr(functions, "local_session", session)
+    monkeypatch.setattr(functions, "recompute_daily_rollup", recompute_daily_rollup)
+    queue = InMemoryQueue()
+    stay = (3, datetime(2024, 3, 10, 14), datetime(2024, 3, 12, 11))
+
+    async def run() -> None:
+        # the second change is committed while the first refresh is still queued or running
+        await booking_jobs.enqueue_side_effects(queue, 1, [stay], "updated")
+        await booking_jobs.enqueue_side_effects(queue, 1, [stay], "updated")
+        for job in [job for job in queue.jobs.values() if job[0] == "refresh_booking_rollup"]:
+            await functions.refresh_booking_rollup({"redis": queue}, *job[1:])
+
+    asyncio.run(run())
+    assert sorted(id for id in queue.jobs if id.startswith("booking_rollup:")) == [
+        "booking_rollup:3:2024-03-10:2024-03-12:1",
+        "booking_rollup:3:2024-03-10:2024-03-12:2",
+    ]
+    assert recomputed == [(3, date(2024, 3, 10), date(2024, 3, 12))]
+
+
+def test_auto_transitions_with_nothing_due_queue_nothing(monkeypatch: pytest.MonkeyPatch, due_bookings: list) -> None:
+    async def transition(*args: object) -> list[tuple]:
+        return []
+
+    monkeypatch.setattr(functions, "transition_due_bookings", transition)
+    queue = InMemoryQueue()
+    assert asyncio.run(functions.auto_transition_bookings({"redis": queue}))["checked_out"] == 0
+    assert queue.jobs == {}
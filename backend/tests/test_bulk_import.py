@@ -0,0 +1,77 @@
+import asyncio
+from datetime import UTC, datetime
+
+from src.app.api.v1.booking import _overlaps_within_batch
+from src.app.core.utils.bulk_import import ImportReport, iter_batches, iter_records
+from src.app.schemas.booking import BookingCreateInternal
+from src.app.schemas.room import RoomCreate
+
+ROOMS_CSV = (
+    b"name,description,price,feature_ids,badge_ids\r\n"
+    b'Suite,"Sea view,\nlarge balcony",299,1;2,\r\n'
+    b"Single,Small room,not-a-price,,3\r\n"
+    b"Broken,row\r\n"
+    b"Double,Garden view,150,,"
+)
+
+
+async def _chunks(data: bytes, size: int):
+    for i in range(0, len(data), size):
+        yield data[i : i + size]
+
+
+def _import(data: bytes, format: str, schema, chunk_size: int = 7) -> tuple[list, ImportReport]:
+    async def run() -> tuple[list, ImportReport]:
+        report = ImportReport()
+        records = iter_records(_chunks(data, chunk_size), format, schema)
+        batches = [batch async for batch in iter_batches(records, schema, report, size=2)]
+        return batches, report
+
+    return asyncio.run(run())
+
+
+def test_csv_rooms_are_validated_in_batches() -> None:
+    batches, report = _import(ROOMS_CSV, "csv", RoomCreate)
+
+    rows = [(row, room) for batch in batches for row, room in batch]
+    assert [row for row, _ in rows] == [2, 6]
+    assert rows[0][1].description == "Sea view,\nlarge balcony"
+    assert rows[0][1].feature_ids == [1, 2]
+    assert rows[0][1].badge_ids == []
+    assert rows[1][1].name == "Double"
+
+    assert report.failed == 2
+    assert [error["row"] for error in report.errors] == [4, 5]
+    assert report.errors[0]["errors"][0].startswith("price:")
+    assert report.errors[1]["errors"] == ["Expected 5 columns, got 2"]
+
+
+def test_ndjson_bookings_report_bad_lines() -> None:
+    data = (
+        b'{"user_id": 1, "room_id": 2, "check_in": "2024-01-01T14:00:00Z", "check_out": "2024-01-03T11:00:00Z",'
+        b' "total_price": 200, "status": "booked", "guest_name": "John Doe", "guest_contact_number": "+1234",'
+        b' "guest_email": "abc@gmail.com", "number_of_guests": 2}\n'
+        b"\n"
+        b"{not json\n"
+        b'{"user_id": 1, "id": 5}\n'
+    )
+    batches, report = _import(data, "ndjson", BookingCreateInternal, chunk_size=16)
+
+    assert [row for batch in batches for row, _ in batch] == [1]
+    assert [error["row"] for error in report.errors] == [3, 4]
+    assert report.errors[0]["errors"][0].startswith("Invalid JSON")
+    assert any(message.startswith("id:") for message in report.errors[1]["errors"])
+
+
+def test_overlaps_within_batch_keep_the_earliest_stay() -> None:
+    def at(day: int, hour: int) -> datetime:
+        return datetime(2024, 1, day, hour, tzinfo=UTC)
+
+    stays = [
+        (1, at(5, 14), at(7, 11)),
+        (1, at(1, 14), at(3, 11)),
+        (2, at(2, 14), at(6, 11)),
+        (1, at(2, 14), at(4, 11)),
+        (1, at(3, 14), at(5, 11)),
+    ]
+    assert _overlaps_within_batch(stays) == {3}
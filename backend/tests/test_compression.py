@@ -0,0 +1,49 @@
+import gzip
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.app.core.utils.compression import negotiate_encoding
+from src.app.middleware.compression_middleware import CompressionMiddleware
+
+app = FastAPI()
+app.add_middleware(CompressionMiddleware, minimum_size=500)
+
+
+@app.get("/large")
+async def large() -> dict:
+    return {"description": "Experience luxury with a breathtaking view " * 50}
+
+
+@app.get("/small")
+async def small() -> dict:
+    return {"id": 1}
+
+
+def test_negotiate_encoding() -> None:
+    assert negotiate_encoding(None) is None
+    assert negotiate_encoding("identity") is None
+    assert negotiate_encoding("gzip, deflate") == "gzip"
+    assert negotiate_encoding("gzip;q=0") is None
+    assert negotiate_encoding("*") in ("br", "gzip")
+
+
+def test_compresses_above_threshold() -> None:
+    client = TestClient(app)
+
+    response = client.get("/large", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert response.json()["description"].startswith("Experience luxury")
+
+    raw = client.get("/large", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in raw.headers
+    assert len(raw.content) > len(gzip.compress(raw.content))
+
+
+def test_skips_below_threshold() -> None:
+    client = TestClient(app)
+
+    response = client.get("/small", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+    assert response.json() == {"id": 1}
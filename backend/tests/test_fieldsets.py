@@ -0,0 +1,159 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from src.app.api.dependencies import select_fields
+from src.app.api.v1 import rooms as rooms_api
+from src.app.core.db.database import async_get_db
+from src.app.core.exceptions.http_exceptions import BadRequestException
+from src.app.core.utils import cache
+from src.app.core.utils.fieldsets import narrow_schema, parse_fields
+from src.app.main import app
+from src.app.schemas.room import RoomRead
+from src.app.schemas.user import UserRead
+from tests.conftest import InMemoryRedis
+
+
+def test_parse_fields_keeps_schema_order() -> None:
+    assert parse_fields(None, RoomRead) is None
+    assert parse_fields(" price,id,, name,id ", RoomRead) == ["id", "name", "price"]
+
+
+@pytest.mark.parametrize("fields", ["id,password", ",", ""])
+def test_parse_fields_rejects_unknown_or_empty(fields: str) -> None:
+    with pytest.raises(ValueError):
+        parse_fields(fields, UserRead)
+
+
+def test_narrowed_schemas_are_cached() -> None:
+    schema = narrow_schema(RoomRead, ["id", "name"])
+    assert list(schema.model_fields) == ["id", "name"]
+    assert narrow_schema(RoomRead, ["id", "name"]) is schema
+    assert narrow_schema(RoomRead, None) is RoomRead
+    assert narrow_schema(RoomRead, list(RoomRead.model_fields)) is RoomRead
+
+
+def test_select_fields_is_a_bad_request() -> None:
+    with pytest.raises(BadRequestException):
+        select_fields("hashed_password", UserRead)
+
+
+def test_room_fieldset_only_selects_requested_columns() -> None:
+    fieldset = rooms_api.RoomFieldset("id,name,price,image_2d")
+    assert list(fieldset.schema_to_select.model_fields) == ["id", "name", "image_2d", "price"]
+    assert not fieldset.features and not fieldset.badges and not fieldset.hidden
+
+
+def test_room_fieldset_without_fields_is_unchanged() -> None:
+    fieldset = rooms_api.RoomFieldset(None)
+    assert fieldset.schema_to_select is RoomRead
+    assert fieldset.features and fieldset.badges and not fieldset.hidden
+
+
+def test_room_fieldset_hydrates_in_one_query(monkeypatch: pytest.MonkeyPatch) -> None:
+    calls = []
+
+    class Features:
+        async def get_multi(self, db: object, schema_to_select: object, limit: None, id__in: list[int]) -> dict:
+            calls.append(id__in)
+            return {"data": [{"id": id, "name": f"feature {id}"} for id in id__in if id != 9]}
+
+    monkeypatch.setattr(rooms_api, "crud_room_features", Features())
+    fieldset = rooms_api.RoomFieldset("name,features", "badge_ids")
+    assert set(fieldset.schema_to_select.model_fields) == {"name", "feature_ids", "badge_ids"}
+
+    rooms = [
+        {"name": "a", "feature_ids": [2, 1, 2], "badge_ids": [1]},
+        {"name": "b", "feature_ids": [9, 3], "badge_ids": []},
+    ]
+    assert asyncio.run(fieldset.apply(None, rooms)) == [
+        {"name": "a", "features": [{"id": 1, "name": "feature 1"}, {"id": 2, "name": "feature 2"}]},
+        {"name": "b", "features": [{"id": 3, "name": "feature 3"}]},
+    ]
+    assert calls == [[1, 2, 3, 9]]
+
+
+def test_room_fieldset_rejects_unknown_fields() -> None:
+    with pytest.raises(BadRequestException):
+        rooms_api.RoomFieldset("id,secret")
+
+
+@pytest.fixture
+def room_pages(monkeypatch: pytest.MonkeyPatch) -> list[tuple]:
+    """Serve `GET /rooms` from a fake `crud_rooms` and an in-memory cache, returning the `get_multi` calls."""
+    calls: list[tuple] = []
+
+    class Rooms:
+        async def get_multi(self, db: object, offset: int, limit: int, schema_to_select: object, **kw) -> dict:
+            calls.append((offset, limit, list(schema_to_select.model_fields), kw))
+            # a column outside the requested fields, dropped by the response model
+            return {"data": [{"id": 11, "name": "Ocean Suite " * 200, "price": 10.0}], "total_count": 1}
+
+    async def no_db() -> None:
+        return None
+
+    monkeypatch.setattr(rooms_api, "crud_rooms", Rooms())
+    monkeypatch.setattr(cache, "client", InMemoryRedis())
+    monkeypatch.setitem(app.dependency_overrides, async_get_db, no_db)
+    return calls
+
+
+def test_get_rooms_route(room_pages: list[tuple]) -> None:
+    response = TestClient(app).get("/api/v1/rooms", params={"page": 2, "items_per_page": 5, "fields": "id,name"})
+
+    assert response.status_code == 200
+    assert response.json()["data"] == [{"id": 11, "name": "Ocean Suite " * 200}]
+    assert room_pages == [(5, 5, ["id", "name"], {"is_deleted": False})]
+
+
+def test_room_pages_are_cached_precompressed_until_a_room_write(room_pages: list[tuple]) -> None:
+    client = TestClient(app)
+    params = {"fields": "id,name"}
+    first = client.get("/api/v1/rooms", params=params, headers={"Accept-Encoding": "gzip"})
+    second = client.get("/api/v1/rooms", params=params, headers={"Accept-Encoding": "gzip"})
+    other_fields = client.get("/api/v1/rooms", params={"fields": "id"})
+
+    assert first.json() == second.json()
+    assert second.headers["content-encoding"] == "gzip"
+    assert len(room_pages) == 2
+    [key] = [key for key in cache.client.data if key.endswith(":id,name")]
+    assert set(cache.client.data[key]) == {b"identity", b"gzip"}
+    assert b"price" not in cache.client.data[key][b"identity"]
+
+    asyncio.run(rooms_api._invalidate_room_caches())
+    client.get("/api/v1/rooms", params=params)
+    assert len(room_pages) == 3
+    assert other_fields.status_code == 200
+
+
+class DownRedis(InMemoryRedis):
+    async def hmget(self, key: str, fields: list) -> list:
+        raise RedisConnectionError("Redis is down")
+
+    def pipeline(self, transaction: bool = True) -> object:
+        raise RedisConnectionError("Redis is down")
+
+
+@pytest.mark.parametrize("client", [None, DownRedis()])
+def test_room_pages_are_read_from_postgres_without_redis(
+    room_pages: list[tuple], monkeypatch: pytest.MonkeyPatch, client: InMemoryRedis | None
+) -> None:
+    monkeypatch.setattr(cache, "client", client)
+    responses = [TestClient(app).get("/api/v1/rooms", params={"fields": "id,name"}) for _ in range(2)]
+
+    assert [response.status_code for response in responses] == [200, 200]
+    assert responses[0].json()["data"] == [{"id": 11, "name": "Ocean Suite " * 200}]
+    assert len(room_pages) == 2
+
+
+def test_room_pages_replace_entries_of_the_old_string_format(room_pages: list[tuple]) -> None:
+    key = "rooms:page_1:items_per_page:10:fields:id,name"
+    cache.client.data[key] = b'{"data": [], "total_count": 0}'
+
+    response = TestClient(app).get("/api/v1/rooms", params={"fields": "id,name"})
+
+    assert response.status_code == 200
+    assert response.json()["total_count"] == 1
+    assert b"identity" in cache.client.data[key]
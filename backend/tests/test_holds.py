@@ -0,0 +1,96 @@
+import asyncio
+from datetime import UTC, datetime
+
+import pytest
+
+from src.app.api.v1.booking import _check_holds
+from src.app.core.exceptions.http_exceptions import BadRequestException, UnauthorizedException
+from src.app.core.utils import holds
+from src.app.core.utils.occupancy import nights
+from src.app.schemas.booking import BookingCreate
+
+
+def _at(day: int, hour: int) -> datetime:
+    return datetime(2024, 3, day, hour, tzinfo=UTC)
+
+
+def _booking(**values: object) -> BookingCreate:
+    data = {
+        "user_id": 7,
+        "room_id": 3,
+        "check_in": _at(10, 14),
+        "check_out": _at(12, 11),
+        "total_price": 200,
+        "status": "booked",
+        "guest_name": "John Doe",
+        "guest_contact_number": "+1234567890",
+        "guest_email": "abc@gmail.com",
+        "number_of_guests": 1,
+        "hold_id": "h1",
+    }
+    return BookingCreate(**{**data, **values})
+
+
+def _hold(**values: object) -> holds.Hold:
+    start, end = nights(_at(9, 14), _at(13, 11))
+    data = {"id": "h1", "room_id": 3, "start": start, "end": end, "expires_at_ms": 2**42, "owner": "7"}
+    return holds.Hold(**{**data, **values})
+
+
+def test_hold_covers_only_its_nights() -> None:
+    hold = _hold()
+    assert hold.covers(_at(10, 14), _at(12, 11))
+    assert hold.covers(_at(9, 15), _at(13, 10))
+    assert not hold.covers(_at(8, 14), _at(10, 11))
+    assert not hold.covers(_at(12, 14), _at(14, 11))
+
+
+def test_parse_keeps_owner_with_colons() -> None:
+    hold = holds._parse("h2", 5, b"100:102:1700000000000:user:42")
+    assert (hold.start, hold.end, hold.expires_at_ms, hold.owner) == (100, 102, 1700000000000, "user:42")
+
+
+@pytest.mark.parametrize(
+    "hold",
+    [None, _hold(room_id=4), _hold(owner="8"), _hold(end=nights(_at(9, 14), _at(11, 11))[1])],
+)
+def test_booking_rejects_a_hold_that_does_not_match(monkeypatch: pytest.MonkeyPatch, hold: holds.Hold | None) -> None:
+    async def get(hold_id: str) -> holds.Hold | None:
+        return hold
+
+    monkeypatch.setattr(holds, "get", get)
+    with pytest.raises(BadRequestException):
+        asyncio.run(_check_holds(_booking(), owner="7"))
+
+
+def test_booking_returns_its_matching_hold(monkeypatch: pytest.MonkeyPatch) -> None:
+    async def get(hold_id: str) -> holds.Hold:
+        return _hold()
+
+    monkeypatch.setattr(holds, "get", get)
+    assert asyncio.run(_check_holds(_booking(), owner="7")) == _hold()
+
+
+def test_booking_a_hold_takes_the_owner_from_the_signed_in_user(monkeypatch: pytest.MonkeyPatch) -> None:
+    async def get(hold_id: str) -> holds.Hold:
+        return _hold()
+
+    monkeypatch.setattr(holds, "get", get)
+    # the hold of user 7, claimed by user 8 with `user_id` 7 in the body
+    with pytest.raises(BadRequestException):
+        asyncio.run(_check_holds(_booking(), owner="8"))
+    with pytest.raises(UnauthorizedException):
+        asyncio.run(_check_holds(_booking(), owner=None))
+
+
+def test_own_holds_do_not_block_a_booking(monkeypatch: pytest.MonkeyPatch) -> None:
+    owners = []
+
+    async def conflicting(room_id: int, check_in: datetime, check_out: datetime, owner: str | None = None) -> None:
+        owners.append(owner)
+        return None
+
+    monkeypatch.setattr(holds, "conflicting", conflicting)
+    assert asyncio.run(_check_holds(_booking(hold_id=None), owner="7")) is None
+    assert asyncio.run(_check_holds(_booking(hold_id=None), owner=None)) is None
+    assert owners == ["7", None]
@@ -0,0 +1,66 @@
+import asyncio
+
+import httpx
+from fastapi import FastAPI
+
+from src.app.core.utils import cache
+from src.app.middleware.idempotency_middleware import IdempotencyMiddleware
+from tests.conftest import InMemoryRedis
+
+calls: list[dict] = []
+
+app = FastAPI()
+app.add_middleware(IdempotencyMiddleware, wait_timeout=2.0, poll_interval=0.01)
+
+
+@app.post("/booking", status_code=201)
+async def write_booking(booking: dict) -> dict:
+    calls.append(booking)
+    await asyncio.sleep(0.2)
+    return {"id": len(calls), **booking}
+
+
+async def _post(client: httpx.AsyncClient, key: str, body: dict) -> httpx.Response:
+    return await client.post("/booking", json=body, headers={"Idempotency-Key": key})
+
+
+async def _scenario() -> tuple[list[httpx.Response], httpx.Response, httpx.Response]:
+    cache.client = InMemoryRedis()  # type: ignore[assignment]
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            concurrent = await asyncio.gather(*(_post(client, "abc", {"room_id": 1}) for _ in range(3)))
+            retry = await _post(client, "abc", {"room_id": 1})
+            mismatch = await _post(client, "abc", {"room_id": 2})
+    finally:
+        cache.client = None
+    return concurrent, retry, mismatch
+
+
+def test_duplicates_wait_and_replay_without_running_twice() -> None:
+    calls.clear()
+    concurrent, retry, mismatch = asyncio.run(_scenario())
+
+    assert len(calls) == 1
+    for response in [*concurrent, retry]:
+        assert response.status_code == 201
+        assert response.json() == {"id": 1, "room_id": 1}
+    assert sum(response.headers.get("idempotent-replayed") == "true" for response in concurrent) == 2
+    assert retry.headers["idempotent-replayed"] == "true"
+
+    assert mismatch.status_code == 422
+
+
+def test_requests_without_key_are_not_deduplicated() -> None:
+    calls.clear()
+
+    async def post_twice() -> None:
+        cache.client = InMemoryRedis()  # type: ignore[assignment]
+        try:
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+                await client.post("/booking", json={"room_id": 1})
+                await client.post("/booking", json={"room_id": 1})
+        finally:
+            cache.client = None
+
+    asyncio.run(post_twice())
+    assert len(calls) == 2
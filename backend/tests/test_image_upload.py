@@ -0,0 +1,121 @@
+import asyncio
+import io
+import time
+from pathlib import Path
+
+import httpx
+import pytest
+from fastapi import FastAPI, UploadFile
+from fastapi.testclient import TestClient
+from starlette.datastructures import Headers
+
+from src.app.api.v1.image import router as image_router
+from src.app.core.utils import http_client
+from src.app.core.utils.image_storage import LocalImageStorage, get_image_storage
+
+UPSTREAM_DELAY = 0.5
+
+app = FastAPI()
+app.include_router(image_router)
+
+
+@app.get("/ping")
+async def ping() -> dict:
+    return {"pong": True}
+
+
+def mock_upstream() -> tuple[httpx.MockTransport, list[bytes]]:
+    """A local stand-in for imgbb: slow to answer, records the bodies it receives."""
+    received: list[bytes] = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        received.append(await request.aread())
+        await asyncio.sleep(UPSTREAM_DELAY)
+        return httpx.Response(200, json={"data": {"url": "https://i.ibb.co/mock/room.png"}})
+
+    return httpx.MockTransport(handler), received
+
+
+async def _upload_while_pinging() -> tuple[httpx.Response, float, float, list[bytes]]:
+    transport, received = mock_upstream()
+    http_client.client = httpx.AsyncClient(transport=transport)
+    http_client.upload_limiter = asyncio.Semaphore(2)
+
+    image = b"\x89PNG\r\n\x1a\n" + b"\x00" * 300_000
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        start = time.perf_counter()
+        upload = asyncio.create_task(
+            client.post("/images/upload", files={"image": ("room.png", image, "image/png")})
+        )
+        await asyncio.sleep(0.05)
+        ping = await client.get("/ping")
+        ping_elapsed = time.perf_counter() - start
+        assert ping.status_code == 200
+
+        response = await upload
+        upload_elapsed = time.perf_counter() - start
+
+    await http_client.client.aclose()
+    http_client.client = None
+    http_client.upload_limiter = None
+    return response, ping_elapsed, upload_elapsed, received
+
+
+def test_upload_does_not_block_event_loop() -> None:
+    response, ping_elapsed, upload_elapsed, received = asyncio.run(_upload_while_pinging())
+
+    assert response.status_code == 200
+    assert response.json()["url"] == "https://i.ibb.co/mock/room.png"
+    assert ping_elapsed < UPSTREAM_DELAY
+    assert upload_elapsed >= UPSTREAM_DELAY
+
+    assert len(received) == 1
+    assert b'filename="room.png"' in received[0]
+    assert b"\x00" * 300_000 in received[0]
+
+
+def test_upload_rejects_non_images() -> None:
+    async def post() -> httpx.Response:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            return await client.post("/images/upload", files={"image": ("notes.txt", b"hello", "text/plain")})
+
+    response = asyncio.run(post())
+    assert response.status_code == 400
+
+
+def test_local_storage_dedup_and_immutable_cache(tmp_path: Path) -> None:
+    storage = LocalImageStorage(str(tmp_path), "/images", [320])
+    app.dependency_overrides[get_image_storage] = lambda: storage
+    client = TestClient(app)
+
+    image = b"\x89PNG\r\n\x1a\n" + b"\x01" * 1024
+    first = client.post("/images/upload", files={"image": ("a.png", image, "image/png")}).json()
+    second = client.post("/images/upload", files={"image": ("b.png", image, "image/png")}).json()
+
+    assert first["url"] == second["url"]
+    # not a decodable image, so no variant is made nor announced
+    assert first["variants"] == {}
+    assert len(list(tmp_path.glob("*/*/original.*"))) == 1
+    assert not list((tmp_path / "tmp").iterdir())
+
+    response = client.get(first["url"])
+    missing = client.get(first["url"].rsplit("/", 1)[0] + "/w320.webp")
+    app.dependency_overrides = {}
+
+    assert response.status_code == 200
+    assert response.content == image
+    assert "immutable" in response.headers["cache-control"]
+    assert missing.status_code == 404
+
+
+def test_local_storage_only_announces_narrower_variants(tmp_path: Path) -> None:
+    Image = pytest.importorskip("PIL.Image")
+    buffer = io.BytesIO()
+    Image.new("RGB", (500, 20)).save(buffer, format="PNG")
+
+    storage = LocalImageStorage(str(tmp_path), "/images", [320, 500, 1280])
+    upload = UploadFile(io.BytesIO(buffer.getvalue()), headers=Headers({"content-type": "image/png"}))
+    stored = asyncio.run(storage.save(upload))
+
+    # the worker never upscales, so only the 320px variant ever exists
+    assert stored.variants == {"320": stored.url.rsplit("/", 1)[0] + "/w320.webp"}
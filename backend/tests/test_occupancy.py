@@ -0,0 +1,183 @@
+import asyncio
+import random
+from contextlib import asynccontextmanager
+from datetime import UTC, date, datetime, timedelta
+
+import numpy as np
+import pytest
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from src.app.core.utils import occupancy
+from src.app.core.utils.occupancy import (
+    EPOCH,
+    booking_grid,
+    busy_rows,
+    enqueue_refresh,
+    night_offset,
+    nights,
+    occupancy_bits,
+    refresh_superseded,
+    run_length_spans,
+)
+from src.app.core.worker import functions
+from src.app.crud.crud_booking import open_overlap_filters
+from tests.conftest import InMemoryQueue
+
+
+def _at(day: date, hour: int) -> datetime:
+    return datetime(day.year, day.month, day.day, hour, tzinfo=UTC)
+
+
+def test_nights_allow_same_day_turnover() -> None:
+    day = EPOCH + timedelta(days=100)
+    first = nights(_at(day, 14), _at(day + timedelta(days=2), 11))
+    second = nights(_at(day + timedelta(days=2), 14), _at(day + timedelta(days=3), 11))
+
+    assert first == (100, 102)
+    assert second == (102, 103)
+    # a same-day stay still occupies its night
+    assert nights(_at(day, 9), _at(day, 18)) == (100, 101)
+
+
+def test_occupancy_bits_use_redis_bit_order() -> None:
+    day = EPOCH + timedelta(days=9)
+    bits = occupancy_bits([(_at(day, 14), _at(day + timedelta(days=2), 11))], until=24)
+
+    # SETBIT key 9 1 and SETBIT key 10 1 on an empty 3 byte string
+    assert bits == bytes([0b00000000, 0b01100000, 0b00000000])
+
+
+def test_busy_rows_matches_naive_check() -> None:
+    rng = random.Random(7)
+    until = 400
+    rooms = []
+    for _ in range(50):
+        stays = []
+        for _ in range(rng.randint(0, 8)):
+            start = EPOCH + timedelta(days=rng.randint(0, until - 10))
+            stays.append((_at(start, 14), _at(start + timedelta(days=rng.randint(1, 7)), 11)))
+        rooms.append(stays)
+    bitmaps = [occupancy_bits(stays, until) for stays in rooms]
+
+    for _ in range(200):
+        start = rng.randint(0, until - 20)
+        end = start + rng.randint(1, 14)
+        chunks = [bitmap[start // 8 : (end - 1) // 8 + 1] for bitmap in bitmaps]
+        busy = busy_rows(chunks, start, end)
+
+        for row, stays in enumerate(rooms):
+            expected = any(s < end and e > start for s, e in (nights(*stay) for stay in stays))
+            assert bool(busy[row]) == expected
+
+
+def test_busy_rows_treats_missing_bytes_as_free() -> None:
+    start = night_offset(EPOCH + timedelta(days=30))
+    assert busy_rows([b"", b"\x00"], start, start + 12).tolist() == [False, False]
+
+
+def test_booking_grid_clips_and_run_length_encodes() -> None:
+    grid = booking_grid(
+        rows=np.array([0, 0, 2, 1]),
+        starts=np.array([-3, 4, 5, 10]),
+        ends=np.array([2, 6, 20, 12]),
+        values=np.array([11, 12, 13, 14]),
+        shape=(3, 8),
+    )
+
+    assert grid.tolist() == [
+        [11, 11, 0, 0, 12, 12, 0, 0],
+        [0, 0, 0, 0, 0, 0, 0, 0],
+        [0, 0, 0, 0, 0, 13, 13, 13],
+    ]
+    assert run_length_spans(grid) == [[(0, 2, 11), (4, 2, 12)], [], [(5, 3, 13)]]
+
+
+def test_run_length_spans_splits_back_to_back_bookings() -> None:
+    grid = np.array([[5, 5, 6, 6, 6, 0, 5]])
+    assert run_length_spans(grid) == [[(0, 2, 5), (2, 3, 6), (6, 1, 5)]]
+
+
+def test_open_overlap_filters_follow_the_nights_rule() -> None:
+    def shares_a_night(booking: tuple[datetime, datetime], filters: dict) -> bool:
+        check_in, check_out = booking
+        return check_in < filters["check_in__lt"] and check_out >= filters["check_out__gte"]
+
+    day = EPOCH + timedelta(days=100)
+    stay = (_at(day, 14), _at(day + timedelta(days=2), 11))
+    filters = open_overlap_filters(1, *stay)
+    bookings = [
+        (_at(day - timedelta(days=2), 14), _at(day, 11)),
+        (_at(day - timedelta(days=2), 14), _at(day + timedelta(days=1), 11)),
+        (_at(day + timedelta(days=1), 14), _at(day + timedelta(days=2), 11)),
+        (_at(day + timedelta(days=2), 14), _at(day + timedelta(days=3), 11)),
+        (_at(day - timedelta(days=1), 14), _at(day + timedelta(days=3), 11)),
+    ]
+
+    for booking in bookings:
+        start, end = nights(*booking)
+        first, last = nights(*stay)
+        assert shares_a_night(booking, filters) == (start < last and end > first)
+    assert [shares_a_night(booking, filters) for booking in bookings] == [False, True, True, False, True]
+
+
+def test_enqueue_refresh_queues_every_change_and_skips_superseded_jobs() -> None:
+    async def run() -> None:
+        queue = InMemoryQueue()
+        # a change committed while the first rebuild is still running must get its own job
+        assert await enqueue_refresh(queue, 4) == "room_availability:4:1"
+        assert await enqueue_refresh(queue, 4) == "room_availability:4:2"
+        assert await enqueue_refresh(queue, 5) == "room_availability:5:1"
+
+        assert await refresh_superseded(queue, 4, 1)
+        assert not await refresh_superseded(queue, 4, 2)
+        assert not await refresh_superseded(queue, 5, 1)
+        # jobs queued before versions existed always run
+        assert not await refresh_superseded(queue, 4, None)
+
+    asyncio.run(run())
+
+
+def test_refresh_job_rebuilds_only_the_latest_version(monkeypatch: pytest.MonkeyPatch) -> None:
+    rebuilt: list[list[int]] = []
+
+    @asynccontextmanager
+    async def session():
+        yield None
+
+    async def rebuild(db: object, room_ids: list[int]) -> int:
+        rebuilt.append(room_ids)
+        return 0
+
+    monkeypatch.setattr(functions, "local_session", session)
+    monkeypatch.setattr(occupancy, "rebuild", rebuild)
+
+    async def run() -> None:
+        queue = InMemoryQueue()
+        await enqueue_refresh(queue, 4)
+        await enqueue_refresh(queue, 4)
+        ctx = {"redis": queue}
+        await functions.refresh_room_availability(ctx, 4, 1)
+        await functions.refresh_room_availability(ctx, 4, 2)
+        await functions.refresh_room_availability(ctx, 4)
+
+    asyncio.run(run())
+    # the bitmap is the room's only cached state: the superseded job touches nothing, the others rebuild it
+    assert rebuilt == [[4], [4]]
+
+
+def test_check_falls_back_to_postgres_when_redis_fails(monkeypatch: pytest.MonkeyPatch) -> None:
+    class DownRedis(InMemoryQueue):
+        def pipeline(self, transaction: bool = True) -> object:
+            raise RedisConnectionError("Redis is down")
+
+    async def get_open_stays(db: object, room_ids: list[int], start: datetime, end: datetime) -> list[tuple]:
+        return [(4, start, start + timedelta(days=1))]
+
+    monkeypatch.setattr(occupancy.cache, "client", DownRedis())
+    monkeypatch.setattr(occupancy, "get_open_stays", get_open_stays)
+    day = datetime.now(UTC).date() + timedelta(days=10)
+    stay = (_at(day, 14), _at(day + timedelta(days=2), 11))
+    available, from_postgres = asyncio.run(occupancy.check(None, [4, 5], *stay))
+
+    assert available == {4: False, 5: True}
+    assert from_postgres == [4, 5]
@@ -0,0 +1,69 @@
+from datetime import UTC, date, datetime
+
+import numpy as np
+import pytest
+
+from src.app.core.utils.occupancy import nights
+from src.app.core.utils.pricing import FLAT_PLAN, compile_plan, price_nights
+from src.app.schemas.rate_plan import RatePlanCreate, Season
+
+
+def _stay(check_in: date, check_out: date) -> tuple[int, int]:
+    return nights(datetime.combine(check_in, datetime.min.time(), UTC), check_out)
+
+
+def test_flat_plan_charges_the_room_price_every_night() -> None:
+    stay = _stay(date(2024, 3, 1), date(2024, 3, 4))
+    nightly, discounts, totals = price_nights([100, 80.5], [FLAT_PLAN, FLAT_PLAN], *stay)
+    assert nightly.tolist() == [[100, 100, 100], [80.5, 80.5, 80.5]]
+    assert discounts.tolist() == [0, 0]
+    assert totals.tolist() == [300, 241.5]
+
+
+def test_weekday_season_and_length_of_stay_rules() -> None:
+    plan = compile_plan(
+        RatePlanCreate(
+            name="Summer",
+            # Friday and Saturday nights cost more
+            weekday_multipliers=[1, 1, 1, 1, 1.5, 1.5, 1],
+            seasons=[
+                {"start": "2024-07-01", "end": "2024-09-01", "multiplier": 2},
+                # later seasons win
+                {"start": "2024-07-04", "end": "2024-07-05", "price": 50},
+            ],
+            length_of_stay=[{"min_nights": 7, "discount": 0.2}, {"min_nights": 3, "discount": 0.1}],
+        ).model_dump()
+    )
+    # Saturday 2024-06-29 to Thursday 2024-07-04: Sat, Sun outside the season, then Mon to Wed in it
+    nightly, discounts, totals = price_nights([100], [plan], *_stay(date(2024, 6, 29), date(2024, 7, 4)))
+    assert nightly.tolist() == [[150, 100, 200, 200, 200]]
+    assert discounts.tolist() == [0.1]
+    assert totals.tolist() == [765]
+
+    nightly, discounts, _ = price_nights([100], [plan], *_stay(date(2024, 7, 4), date(2024, 7, 6)))
+    assert nightly.tolist() == [[50, 300]]
+    assert discounts.tolist() == [0]
+
+
+def test_rooms_sharing_a_plan_are_priced_together() -> None:
+    plan = compile_plan({"weekday_multipliers": [2] * 7})
+    nightly, _, totals = price_nights(
+        [10, 20, 30], [plan, FLAT_PLAN, plan], *_stay(date(2024, 1, 1), date(2024, 1, 3))
+    )
+    assert nightly.tolist() == [[20, 20], [20, 20], [60, 60]]
+    assert totals.tolist() == [40, 40, 120]
+
+
+def test_many_rooms_over_a_year() -> None:
+    plans = [compile_plan({"seasons": [{"start": "2024-06-01", "end": "2024-09-01", "multiplier": 1.5}]}), FLAT_PLAN]
+    base = np.arange(1, 5001, dtype=np.float64)
+    stay = _stay(date(2024, 1, 1), date(2025, 1, 1))
+    nightly, _, totals = price_nights(base, [plans[i % 2] for i in range(len(base))], *stay)
+    assert nightly.shape == (5000, 366)
+    assert totals[0] == pytest.approx(1 * (366 + 92 * 0.5))
+    assert totals[1] == pytest.approx(2 * 366)
+
+
+def test_season_should_end_after_it_starts() -> None:
+    with pytest.raises(ValueError):
+        Season(start=date(2024, 7, 1), end=date(2024, 7, 1))
@@ -0,0 +1,39 @@
+import uuid as uuid_pkg
+from datetime import UTC, datetime
+
+import orjson
+from pydantic import BaseModel
+
+from src.app.core.responses import ORJSONResponse
+from src.app.schemas.booking import BookingRead
+
+
+def test_orjson_response_matches_pydantic_json() -> None:
+    booking = BookingRead(
+        id=1,
+        user_id=1,
+        room_id=1,
+        check_in=datetime(2022, 1, 1, 12, tzinfo=UTC),
+        check_out=datetime(2022, 1, 2, 12, tzinfo=UTC),
+        total_price=299,
+        status="booked",
+        guest_name="John Doe",
+        guest_contact_number="+1234567890",
+        guest_email="abc@gmail.com",
+        number_of_guests=1,
+        created_at=datetime(2021, 12, 1, 8, 30, tzinfo=UTC),
+        updated_at=None,
+        deleted_at=None,
+    )
+
+    response = ORJSONResponse(booking.model_dump())
+    assert orjson.loads(response.body) == orjson.loads(booking.model_dump_json())
+
+
+def test_orjson_response_handles_uuid_and_models() -> None:
+    class Item(BaseModel):
+        uuid: uuid_pkg.UUID
+
+    value = uuid_pkg.uuid4()
+    response = ORJSONResponse({"item": Item(uuid=value), "ids": {1}})
+    assert orjson.loads(response.body) == {"item": {"uuid": str(value)}, "ids": [1]}
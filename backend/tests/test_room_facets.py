@@ -0,0 +1,77 @@
+import asyncio
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from src.app.api.v1 import rooms
+from src.app.core.utils import cache, room_facets
+from src.app.crud.crud_rooms import get_room_facets, room_filters
+from tests.conftest import FakeSession, InMemoryRedis
+
+ROWS = [("price", 2.0, 3), ("feature", 3.0, 1), ("total", None, 4), ("feature", 1.0, 4), ("price", 1.0, 1)]
+
+
+def test_filter_key_is_normalized() -> None:
+    assert room_facets.filter_key(10.0, None, [3, 1, 3], [], 50) == room_facets.filter_key(10.0, None, [1, 3], [], 50)
+    assert room_facets.filter_key(10.0, None, [1], [], 50) != room_facets.filter_key(10.0, None, [], [1], 50)
+
+
+def test_facets_are_counted_in_one_query() -> None:
+    db = FakeSession(ROWS)
+    facets = asyncio.run(get_room_facets(db, room_filters(feature_ids=[1]), 50))
+    assert facets == {
+        "total": 4,
+        "features": [{"id": 1, "count": 4}, {"id": 3, "count": 1}],
+        "badges": [],
+        "prices": [{"min": 50, "max": 100, "count": 1}, {"min": 100, "max": 150, "count": 3}],
+    }
+
+    [stmt] = db.statements
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+    assert sql.count("FROM room") == 1
+    assert "unnest(matched.feature_ids)" in sql and "unnest(matched.badge_ids)" in sql
+
+
+def test_facets_are_cached_until_a_room_write(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(cache, "client", InMemoryRedis())
+    db = FakeSession(ROWS)
+
+    def read(feature_ids: list[int]) -> dict:
+        response = asyncio.run(
+            rooms.read_room_facets(None, db, feature_ids=feature_ids, badge_ids=[], price_bucket=50)
+        )
+        return response.body
+
+    assert read([1, 3]) == read([3, 1])
+    assert len(db.statements) == 1
+
+    asyncio.run(rooms._invalidate_room_caches())
+    read([1, 3])
+    assert len(db.statements) == 2
+
+
+def test_counts_read_before_a_room_write_are_not_served(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(cache, "client", InMemoryRedis())
+
+    class RacingSession(FakeSession):
+        async def execute(self, stmt: object) -> FakeSession:
+            # a room is written while the first read counts
+            if not self.statements:
+                await rooms._invalidate_room_caches()
+            return await super().execute(stmt)
+
+    db = RacingSession(ROWS)
+    for _ in range(2):
+        asyncio.run(rooms.read_room_facets(None, db, feature_ids=[], badge_ids=[], price_bucket=50))
+    assert len(db.statements) == 2
+    asyncio.run(rooms.read_room_facets(None, db, feature_ids=[], badge_ids=[], price_bucket=50))
+    assert len(db.statements) == 2
+
+
+def test_facets_without_redis(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(cache, "client", None)
+    db = FakeSession(ROWS)
+    for _ in range(2):
+        asyncio.run(rooms.read_room_facets(None, db, feature_ids=[], badge_ids=[], price_bucket=50))
+    asyncio.run(rooms._invalidate_room_caches())
+    assert len(db.statements) == 2
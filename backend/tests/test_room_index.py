@@ -0,0 +1,101 @@
+import asyncio
+import random
+
+import orjson
+import pytest
+
+from src.app.api.v1 import rooms as rooms_api
+from src.app.core.config import settings
+from src.app.core.utils import room_index
+from src.app.core.utils.room_index import RoomIndex
+from src.app.core.utils.worker_cache import WorkerCache
+
+
+def _rooms(n: int, seed: int = 0) -> list[tuple[int, bool, float, list[int], list[int]]]:
+    rng = random.Random(seed)
+    return [
+        (
+            id,
+            rng.random() < 0.1,
+            float(rng.randint(50, 150)),
+            sorted(f for f in range(1, 6) if rng.random() < 0.4),
+            sorted(b for b in range(1, 4) if rng.random() < 0.3),
+        )
+        for id in range(1, 3 * n, 3)
+    ]
+
+
+def _expected(rooms: list, min_price: float | None, max_price: float | None, features: list, badges: list) -> list:
+    return [
+        id
+        for id, is_deleted, price, feature_ids, badge_ids in rooms
+        if not is_deleted
+        and (min_price is None or price >= min_price)
+        and (max_price is None or price <= max_price)
+        and set(features) <= set(feature_ids)
+        and set(badges) <= set(badge_ids)
+    ]
+
+
+@pytest.mark.parametrize(
+    "min_price, max_price, features, badges",
+    [(None, None, [], []), (80, 120, [], []), (None, 100, [2], []), (100, None, [1, 3], [2]), (0, 500, [9], [])],
+)
+def test_filter_matches_the_room_filters(min_price: float, max_price: float, features: list, badges: list) -> None:
+    rooms = _rooms(500)
+    index = RoomIndex(rooms)
+    assert index.filter(min_price, max_price, features, badges).tolist() == _expected(
+        rooms, min_price, max_price, features, badges
+    )
+
+
+def test_writes_are_applied_in_place() -> None:
+    rooms = _rooms(60)
+    index = RoomIndex(rooms)
+    last = rooms[-1][0]
+
+    # appended past the initial capacity, with a feature no room had
+    for id in range(last + 1, last + 11):
+        assert index.write(id, 500, [1, 7], [])
+    assert index.filter(450, None, [7]).tolist() == list(range(last + 1, last + 11))
+
+    first = next(room for room in rooms if not room[1])[0]
+    assert index.write(first, 10, [7], None)
+    assert index.filter(None, 20).tolist() == [first]
+    assert index.filter(None, None, [7])[0] == first
+
+    assert index.set_live(first, False)
+    assert first not in index.filter(None, None, [7]).tolist()
+    assert index.set_live(first, True)
+    assert first in index.filter(None, None, [7]).tolist()
+
+    # unknown rooms can only be appended in id order
+    assert not index.write(2, 100, [], [])
+    assert not index.set_live(2, False)
+
+
+def test_filter_rooms_reads_only_the_page_from_postgres(monkeypatch: pytest.MonkeyPatch) -> None:
+    rooms = _rooms(200)
+    expected = _expected(rooms, 80, 120, [2], [])
+    calls: list[list[int]] = []
+
+    class Crud:
+        async def get_multi(self, db: object, schema_to_select: object, limit: None, id__in: list, **kw) -> dict:
+            calls.append(id__in)
+            return {"data": [{"id": id, "name": f"Room {id}"} for id in reversed(id__in)]}
+
+    monkeypatch.setattr(settings, "ROOM_INDEX_ENABLED", True)
+    monkeypatch.setattr(room_index, "_index", WorkerCache())
+    room_index._index.set(RoomIndex(rooms))
+    monkeypatch.setattr(rooms_api, "crud_rooms", Crud())
+    filters = {"min_price": 80, "max_price": 120, "feature_ids": [2], "badge_ids": []}
+    response = asyncio.run(rooms_api.filter_rooms(None, None, page=2, items_per_page=5, fields="name", **filters))
+    body = orjson.loads(response.body)
+    assert calls == [expected[5:10]]
+    assert body["data"] == [{"name": f"Room {id}"} for id in expected[5:10]]
+    assert body["total_count"] == len(expected)
+
+    room_index.room_deleted(expected[5])
+    assert expected[5] not in room_index._index.value.filter(80, 120, [2]).tolist()
+    room_index.room_written(2, 100, [], [])
+    assert room_index._index.value is None
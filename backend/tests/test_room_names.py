@@ -0,0 +1,59 @@
+import asyncio
+
+import pytest
+
+from src.app.core.config import settings
+from src.app.core.utils import room_names
+from src.app.core.utils.room_names import RoomNameIndex
+from src.app.core.utils.worker_cache import WorkerCache
+from tests.conftest import FakeSession
+
+ROOMS = [(1, "Ocean Suite"), (2, "ocean view"), (3, "Garden Loft"), (4, "Oceanic Penthouse"), (5, "Lake House")]
+
+
+def _names(suggestions: list[dict]) -> list[str]:
+    return [suggestion["name"] for suggestion in suggestions]
+
+
+def test_suggest_is_a_case_insensitive_prefix_match() -> None:
+    index = RoomNameIndex(ROOMS, max_names=100)
+    assert _names(index.suggest("OCEAN", 10)) == ["Ocean Suite", "ocean view", "Oceanic Penthouse"]
+    assert index.suggest("ocean ", 10) == [{"id": 1, "name": "Ocean Suite"}, {"id": 2, "name": "ocean view"}]
+    assert _names(index.suggest("oc", 2)) == ["Ocean Suite", "ocean view"]
+    assert index.suggest("pool", 10) == []
+
+
+def test_writes_keep_the_index_sorted() -> None:
+    index = RoomNameIndex(ROOMS, max_names=100)
+    index.add(6, "Ocean Cabin")
+    index.add(3, "Ocean Garden")  # renamed
+    index.remove(1)
+    index.remove(42)
+    assert _names(index.suggest("o", 10)) == ["Ocean Cabin", "Ocean Garden", "ocean view", "Oceanic Penthouse"]
+    assert index.suggest("garden", 10) == []
+    assert len(index) == 5
+
+
+def test_index_is_capped() -> None:
+    index = RoomNameIndex(ROOMS, max_names=3)
+    assert index.truncated
+    assert _names(index.suggest("", 10)) == ["Garden Loft", "Lake House", "Ocean Suite"]
+    index.add(6, "Atrium")
+    index.add(7, "Zen Room")
+    assert _names(index.suggest("", 10)) == ["Atrium", "Garden Loft", "Lake House"]
+
+
+def test_index_is_loaded_once_per_ttl(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(room_names, "_index", WorkerCache())
+    db = FakeSession(ROOMS)
+    index = asyncio.run(room_names.get_index(db))
+    room_names.room_written(6, "Ocean Cabin")
+    room_names.room_deleted(1)
+    assert asyncio.run(room_names.get_index(db)) is index
+    assert _names(index.suggest("ocean", 10)) == ["Ocean Cabin", "ocean view", "Oceanic Penthouse"]
+    assert len(db.statements) == 1
+
+    monkeypatch.setattr(settings, "ROOM_SUGGEST_TTL", -1)
+    assert asyncio.run(room_names.get_index(db)) is not index
+    assert len(db.statements) == 2
+    room_names.invalidate()
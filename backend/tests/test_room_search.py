@@ -0,0 +1,53 @@
+import asyncio
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from src.app.crud import crud_rooms
+from src.app.crud.crud_rooms import get_filtered_rooms, room_filters, room_search
+from src.app.models import Room
+from src.app.schemas.room import RoomRead
+from tests.conftest import FakeSession
+
+
+def _sql(clause: object, literal_binds: bool = True) -> str:
+    return str(clause.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": literal_binds}))
+
+
+def test_room_filters_are_index_friendly() -> None:
+    clauses = [_sql(clause) for clause in room_filters(50, 200, [3, 1, 3], [])]
+    assert clauses == [
+        "NOT room.is_deleted",
+        "room.price >= 50",
+        "room.price <= 200",
+        "room.feature_ids @> ARRAY[1, 3]",
+    ]
+    live = {str(index.dialect_options["postgresql"]["where"]) for index in Room.__table__.indexes}
+    assert live == {"NOT is_deleted"}
+
+
+def test_room_search_matches_text_or_name_similarity() -> None:
+    match, rank = room_search("sea view")
+    assert _sql(match, literal_binds=False) == (
+        "(room.search_vector @@ websearch_to_tsquery(%(websearch_to_tsquery_1)s, %(websearch_to_tsquery_2)s)) "
+        "OR (room.name %%> %(name_1)s)"
+    )
+    assert "ts_rank_cd(room.search_vector" in _sql(rank, literal_binds=False)
+    assert "word_similarity(" in _sql(rank, literal_binds=False)
+
+
+def test_filtered_page_takes_the_total_from_the_window() -> None:
+    db = FakeSession([{"id": 1, "_total_count": 12}, {"id": 2, "_total_count": 12}])
+    assert asyncio.run(get_filtered_rooms(db, room_filters(), 0, 2, RoomRead)) == {
+        "data": [{"id": 1}, {"id": 2}],
+        "total_count": 12,
+    }
+    assert len(db.statements) == 1
+
+
+@pytest.mark.parametrize("offset, statements, total", [(0, 1, 0), (20, 2, 12)])
+def test_empty_page_total(offset: int, statements: int, total: int) -> None:
+    db = FakeSession([], count=12)
+    result = asyncio.run(crud_rooms.search_rooms(db, "ocean", room_filters(), offset, 10, RoomRead))
+    assert result == {"data": [], "total_count": total}
+    assert len(db.statements) == statements
@@ -0,0 +1,61 @@
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import UTC, date, datetime
+
+import pytest
+
+from src.app.core import setup
+from src.app.core.config import settings
+from src.app.core.db import partitions
+
+
+class FakeConnection:
+    def __init__(self) -> None:
+        self.statements: list[object] = []
+
+    async def execute(self, stmt: object) -> None:
+        self.statements.append(str(stmt))
+
+    async def run_sync(self, fn: object) -> None:
+        self.statements.append("create_all")
+
+
+@pytest.fixture
+def conn(monkeypatch: pytest.MonkeyPatch) -> FakeConnection:
+    conn = FakeConnection()
+
+    class Engine:
+        @asynccontextmanager
+        async def begin(self):
+            yield conn
+
+    @asynccontextmanager
+    async def session():
+        yield conn
+
+    async def ensure_partitions(db: FakeConnection, first: date, last: date) -> list[str]:
+        db.statements.append(("partitions", first, last))
+        return []
+
+    monkeypatch.setattr(setup, "engine", Engine())
+    monkeypatch.setattr(setup, "local_session", session)
+    monkeypatch.setattr(partitions, "ensure_partitions", ensure_partitions)
+    return conn
+
+
+def test_create_tables_creates_the_extensions_first(conn: FakeConnection) -> None:
+    asyncio.run(setup.create_tables())
+
+    assert conn.statements[:3] == [
+        "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+        "CREATE EXTENSION IF NOT EXISTS btree_gist",
+        "create_all",
+    ]
+
+
+def test_create_tables_creates_the_booking_partitions(conn: FakeConnection, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "BOOKING_PARTITION_MONTHS_AHEAD", 3)
+    asyncio.run(setup.create_tables())
+
+    current = partitions.month_start(datetime.now(UTC))
+    assert conn.statements[-1] == ("partitions", current, partitions.add_months(current, 3))
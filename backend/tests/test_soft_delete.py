@@ -0,0 +1,98 @@
+import asyncio
+import inspect
+from datetime import UTC, datetime
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from src.app.api.v1 import booking as booking_api
+from src.app.api.v1 import rooms as rooms_api
+from src.app.core.exceptions.http_exceptions import NotFoundException
+from src.app.core.utils import cache, room_index, room_names
+from src.app.core.utils.worker_cache import WorkerCache
+from src.app.crud.crud_booking import transition_due_bookings
+from src.app.models import Booking, Room
+from tests.conftest import FakeSession, InMemoryRedis
+
+
+def test_soft_delete_columns_are_keyword_only() -> None:
+    for model in (Room, Booking):
+        parameters = inspect.signature(model.__init__).parameters
+        assert parameters["is_deleted"].kind is inspect.Parameter.KEYWORD_ONLY
+        assert parameters["is_deleted"].default is False
+        assert parameters["deleted_at"].default is None
+
+
+def test_hot_indexes_skip_tombstones() -> None:
+    for model, names in (
+        (Room, {"ix_room_live_id", "ix_room_live_price"}),
+        (
+            Booking,
+            {
+                "ix_booking_room_open_stay",
+                "ix_booking_user_check_in",
+                "ix_booking_room_status_check_out",
+                "ix_booking_open_check_out",
+                "ix_booking_booked_check_in",
+            },
+        ),
+    ):
+        indexes = {index.name: index for index in model.__table__.indexes}
+        for name in names:
+            assert "NOT is_deleted" in str(indexes[name].dialect_options["postgresql"]["where"])
+
+
+def _sql(stmt: object) -> str:
+    return " ".join(str(stmt.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True})).split())
+
+
+@pytest.fixture
+def room_caches(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(cache, "client", InMemoryRedis())
+    monkeypatch.setattr(room_names, "_index", WorkerCache())
+    monkeypatch.setattr(room_index, "_index", WorkerCache())
+
+
+def test_delete_flags_the_room_instead_of_removing_it(room_caches: None) -> None:
+    db = FakeSession([SimpleNamespace(_mapping={"id": 7, "name": "Ocean Suite"})], count=1)
+    asyncio.run(rooms_api.erase_room(None, 7, db))
+
+    delete = db.statements[-1]
+    assert _sql(delete).startswith("UPDATE room SET")
+    assert delete.compile().params["is_deleted"] is True
+    assert delete.compile().params["deleted_at"] is not None
+    assert db.commits == 1
+
+
+def test_restore_clears_the_flag(room_caches: None) -> None:
+    db = FakeSession([SimpleNamespace(_mapping={"id": 7})], count=1)
+    asyncio.run(rooms_api.restore_room(None, 7, db))
+
+    exists, update = db.statements[0], db.statements[-1]
+    assert "room.is_deleted = true" in _sql(exists)
+    assert _sql(update).startswith("UPDATE room SET")
+    assert update.compile().params["is_deleted"] is False
+    assert update.compile().params["deleted_at"] is None
+
+
+def test_restore_of_a_live_room_is_not_found(room_caches: None) -> None:
+    with pytest.raises(NotFoundException):
+        asyncio.run(rooms_api.restore_room(None, 7, FakeSession()))
+
+
+def test_reads_skip_soft_deleted_rows() -> None:
+    for read, db in ((rooms_api.read_room, FakeSession()), (booking_api.read_booking, FakeSession())):
+        with pytest.raises(NotFoundException):
+            asyncio.run(read(None, 7, db))
+        assert "is_deleted = false" in _sql(db.statements[0])
+
+
+def test_scheduled_transitions_skip_soft_deleted_bookings() -> None:
+    db = FakeSession()
+    cutoff = datetime(2024, 3, 1, tzinfo=UTC)
+    asyncio.run(transition_due_bookings(db, ("booked", "checked_in"), "checked_out", "check_out", cutoff, 10))
+
+    batch = _sql(db.statements[0]).split("(SELECT")[1]
+    assert "booking.is_deleted IS false" in batch
+    assert "FOR UPDATE SKIP LOCKED" in batch